@@ -0,0 +1,159 @@
+import asyncio
+import re
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import get_settings
+
+# (route class, methods, path pattern); first match wins, everything else is "read".
+ROUTE_CLASSES: List[Tuple[str, frozenset, Pattern[str]]] = [
+    (
+        "auth",
+        frozenset({"POST"}),
+        re.compile(r"^/auth/(login|register|register-invited|forgot-password|reset-password)$"),
+    ),
+    # Streams a group's whole history; holds a connection until the last row is sent.
+    ("export", frozenset({"GET"}), re.compile(r"^/admin/export$")),
+    ("write", frozenset({"POST", "PUT", "PATCH", "DELETE"}), re.compile(r"^/")),
+]
+UNGATED_PATHS = re.compile(r"^/(health|uploads)/")
+
+ADMITTED, REJECTED, TIMED_OUT = "admitted", "rejected", "timed_out"
+# Queue full: this client should back off. Waited in vain: the server is saturated.
+SHED_STATUS = {REJECTED: 429, TIMED_OUT: 503}
+SHED_DETAIL = {
+    REJECTED: "Muitas requisições. Tente novamente em instantes.",
+    TIMED_OUT: "Servidor ocupado. Tente novamente em instantes.",
+}
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    if method == "OPTIONS" or UNGATED_PATHS.match(path):
+        return None
+    for name, methods, pattern in ROUTE_CLASSES:
+        if method in methods and pattern.match(path):
+            return name
+    return "read"
+
+
+class AdmissionGate:
+    """Concurrency limit with a bounded waiting queue for one route class."""
+
+    def __init__(self, name: str, limit: int, queue_size: int) -> None:
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def acquire(self, timeout: float) -> str:
+        """ADMITTED, or why not: REJECTED (queue full) or TIMED_OUT (no slot in time)."""
+        if not self._semaphore.locked():
+            # Free slot: acquire() returns without suspending.
+            await self._semaphore.acquire()
+            self.active += 1
+            return ADMITTED
+        if self.waiting >= self.queue_size:
+            self.rejected += 1
+            return REJECTED
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            return TIMED_OUT
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return ADMITTED
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+def parse_limits(raw: str) -> Dict[str, Tuple[int, int]]:
+    """Parse ``"auth=8:32,write=16:64"`` into ``{"auth": (8, 32), ...}``."""
+    limits: Dict[str, Tuple[int, int]] = {}
+    for item in raw.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, values = item.partition("=")
+        limit, _, queue_size = values.partition(":")
+        limits[name.strip()] = (int(limit), int(queue_size or 0))
+    return limits
+
+
+class AdmissionController:
+    def __init__(self) -> None:
+        self._gates: Optional[Dict[str, AdmissionGate]] = None
+
+    @property
+    def gates(self) -> Dict[str, AdmissionGate]:
+        if self._gates is None:
+            limits = parse_limits(get_settings().admission_limits)
+            self._gates = {
+                name: AdmissionGate(name, limit, queue_size)
+                for name, (limit, queue_size) in limits.items()
+            }
+        return self._gates
+
+    def occupancy(self) -> Dict[str, dict]:
+        return {name: gate.snapshot() for name, gate in self.gates.items()}
+
+
+admission = AdmissionController()
+
+
+class AdmissionMiddleware:
+    """Sheds load per route class with a fast 429/503 + Retry-After instead of queueing forever.
+
+    Heavy classes (bcrypt logins, roster writes) get their own limits so they cannot
+    take every threadpool slot away from cheap reads such as ``/auth/me``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify(scope["method"], scope["path"])
+        gate = admission.gates.get(route_class) if route_class else None
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        outcome = await gate.acquire(settings.admission_queue_timeout_seconds)
+        if outcome != ADMITTED:
+            response = JSONResponse(
+                {"detail": SHED_DETAIL[outcome]},
+                status_code=SHED_STATUS[outcome],
+                headers={"Retry-After": str(settings.admission_retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
@@ -0,0 +1,130 @@
+import gzip
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import get_settings
+
+try:  # brotli is optional; gzip is always available
+    import brotli
+except ImportError:  # pragma: no cover - depends on the deployment image
+    brotli = None
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/x-ndjson",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def supported_encodings() -> tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the best encoding the client accepts, preferring brotli over gzip."""
+    if not accept_encoding:
+        return None
+
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token.strip().lower()] = quality
+
+    for encoding in supported_encodings():
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > 0:
+            return encoding
+    return None
+
+
+def is_compressible_type(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.lower().startswith(COMPRESSIBLE_CONTENT_TYPES)
+
+
+def is_compressible(content_type: Optional[str], size: int) -> bool:
+    return size >= get_settings().compression_minimum_size and is_compressible_type(content_type)
+
+
+def add_vary_accept_encoding(headers: MutableHeaders) -> None:
+    vary = {token.strip().lower() for token in headers.get("vary", "").split(",")}
+    if "accept-encoding" not in vary and "*" not in vary:
+        headers.add_vary_header("Accept-Encoding")
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=get_settings().brotli_quality)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=get_settings().gzip_level)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class CompressionMiddleware:
+    """Compresses single-body responses whose content type is in the allow list.
+
+    Streaming responses and responses that already carry a ``Content-Encoding``
+    (e.g. precompressed cached snapshots) are passed through untouched. Every
+    response with a compressible content type gets ``Vary: Accept-Encoding``,
+    compressed or not, so shared caches never hand one client's variant to another.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if is_compressible_type(headers.get("content-type")):
+                    add_vary_accept_encoding(headers)
+                if encoding is None:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough or start_message is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type"), len(body))
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from pydantic import BaseSettings, Field
 
 
@@ -14,6 +16,38 @@ class Settings(BaseSettings):
     email_from: str | None = Field(default=None, env="EMAIL_FROM")
     frontend_base_url: str = Field(default="http://localhost:3000", env="FRONTEND_BASE_URL")
     invitation_expiration_hours: int = Field(default=72, env="INVITATION_EXPIRE_HOURS")
+    compression_minimum_size: int = Field(default=1024, env="COMPRESSION_MIN_SIZE")
+    gzip_level: int = Field(default=6, env="GZIP_LEVEL")
+    brotli_quality: int = Field(default=5, env="BROTLI_QUALITY")
+    snapshot_cache_size: int = Field(default=512, env="SNAPSHOT_CACHE_SIZE")
+    group_directory_max_age: int = Field(default=60, ge=1, env="GROUP_DIRECTORY_MAX_AGE")
+    server_bind: str = Field(default="0.0.0.0:8000", env="BIND")
+    web_concurrency: int | None = Field(default=None, env="WEB_CONCURRENCY")
+    workers_per_core: float = Field(default=1.0, env="WORKERS_PER_CORE")
+    max_workers: int | None = Field(default=None, env="MAX_WORKERS")
+    threadpool_size: int = Field(default=40, env="THREADPOOL_SIZE")
+    keepalive_seconds: int = Field(default=5, env="KEEP_ALIVE")
+    graceful_timeout_seconds: int = Field(default=30, env="GRACEFUL_TIMEOUT")
+    worker_timeout_seconds: int = Field(default=60, env="WORKER_TIMEOUT")
+    admission_limits: str = Field(default="auth=8:32,write=16:64,read=64:512,export=2:4", env="ADMISSION_LIMITS")
+    admission_queue_timeout_seconds: float = Field(default=2.0, env="ADMISSION_QUEUE_TIMEOUT")
+    admission_retry_after_seconds: int = Field(default=2, env="ADMISSION_RETRY_AFTER")
+    idempotency_ttl_hours: int = Field(default=24, env="IDEMPOTENCY_TTL_HOURS")
+    idempotency_lease_seconds: int = Field(default=60, env="IDEMPOTENCY_LEASE_SECONDS")
+    deadline_scheduler_enabled: bool = Field(default=True, env="DEADLINE_SCHEDULER")
+    deadline_resync_seconds: int = Field(default=60, env="DEADLINE_RESYNC_SECONDS")
+    reminders_enabled: bool = Field(default=True, env="REMINDERS")
+    reminder_deadline_offsets: str = Field(default="24h,2h", env="REMINDER_DEADLINE_OFFSETS")
+    reminder_kickoff_offsets: str = Field(default="3h", env="REMINDER_KICKOFF_OFFSETS")
+    reminder_interval_seconds: int = Field(default=60, env="REMINDER_INTERVAL_SECONDS")
+    reminder_batch_size: int = Field(default=100, env="REMINDER_BATCH_SIZE")
+    reminder_claim_minutes: int = Field(default=15, env="REMINDER_CLAIM_MINUTES")
+    archive_after_days: int = Field(default=90, ge=1, env="ARCHIVE_AFTER_DAYS")
+    archive_batch_size: int = Field(default=500, ge=1, env="ARCHIVE_BATCH_SIZE")
+    export_batch_size: int = Field(default=1000, ge=1, env="EXPORT_BATCH_SIZE")
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Parse the environment on first use instead of at import time."""
+    return Settings()
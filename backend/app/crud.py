@@ -1,14 +1,20 @@
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import secrets
 
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Integer, and_, case, cast, column, extract, func, insert, literal, null, or_, select, table, text, union, union_all
+from sqlalchemy.sql import Select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from . import models, schemas
 from .models import UserRole, UserStatus
-from .config import settings
+from .config import get_settings
 from .security import get_password_hash, verify_password
+from .snapshot_cache import group_directory
 
 
 # User helpers
@@ -28,6 +34,62 @@ def list_users(db: Session, *, group_id: Optional[int] = None) -> List[models.Us
     return query.order_by(models.User.name).all()
 
 
+def _like_escape(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_users(
+    db: Session,
+    group_id: int,
+    query_text: str,
+    *,
+    limit: int = 20,
+    offset: int = 0,
+) -> Tuple[List[models.User], Optional[int]]:
+    """Members whose name or e-mail contains ``query_text``; returns the page and the next offset.
+
+    Prefix matches come first, in ``search_name`` order straight off the
+    ``(group_id, search_name)`` index. Terms of three characters or more then add the
+    other substring matches in id order, found through the trigram index (FTS5
+    ``users_search`` on SQLite, ``pg_trgm`` on PostgreSQL). Neither tier sorts the
+    whole match set, so broad terms stay as cheap as rare ones.
+    """
+    term = models.normalize_search_text(query_text)
+    in_group = db.query(models.User).filter(models.User.group_id == group_id)
+    if not term:
+        users = in_group.order_by(models.User.search_name, models.User.id).offset(offset).limit(limit + 1).all()
+        return users[:limit], (offset + limit if len(users) > limit else None)
+
+    is_prefix = and_(models.User.search_name >= term, models.User.search_name < term + "\uffff")
+    prefix_count = db.query(func.count(models.User.id)).filter(models.User.group_id == group_id, is_prefix).scalar()
+    users: List[models.User] = []
+    if offset < prefix_count:
+        users = (
+            in_group.filter(is_prefix)
+            .order_by(models.User.search_name, models.User.id)
+            .offset(offset)
+            .limit(limit + 1)
+            .all()
+        )
+    if len(users) <= limit and len(term) >= 3:
+        substring = in_group.filter(~is_prefix)
+        if db.get_bind().dialect.name == "sqlite":
+            users_search = table("users_search", column("rowid", Integer))
+            phrase = '"' + term.replace('"', '""') + '"'
+            substring = (
+                substring.join(users_search, users_search.c.rowid == models.User.id)
+                .filter(text("users_search MATCH :phrase").bindparams(phrase=phrase))
+                # FTS5 yields rowids in order, so this needs no sort.
+                .order_by(users_search.c.rowid)
+            )
+        else:
+            substring = substring.filter(
+                models.User.search_name.like(f"%{_like_escape(term)}%", escape="\\")
+            ).order_by(models.User.id)
+        users += substring.offset(max(offset - prefix_count, 0)).limit(limit + 1 - len(users)).all()
+    return users[:limit], (offset + limit if len(users) > limit else None)
+
+
 def get_group_by_id(db: Session, group_id: int) -> Optional[models.Group]:
     return db.query(models.Group).filter(models.Group.id == group_id).first()
 
@@ -36,14 +98,16 @@ def get_group_by_name(db: Session, name: str) -> Optional[models.Group]:
     return db.query(models.Group).filter(models.Group.name == name).first()
 
 
-def create_group(db: Session, payload: schemas.GroupCreate) -> models.Group:
+def create_group(db: Session, payload: schemas.GroupCreate, *, group_id: Optional[int] = None) -> models.Group:
+    """``group_id`` comes from the shard catalog (``sharding.create_group``)."""
     if get_group_by_name(db, payload.name):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Já existe um grupo com esse nome")
 
-    group = models.Group(name=payload.name, description=payload.description)
+    group = models.Group(id=group_id, name=payload.name, description=payload.description)
     db.add(group)
     db.commit()
     db.refresh(group)
+    group_directory.clear()
     return group
 
 
@@ -51,6 +115,22 @@ def list_groups(db: Session) -> List[models.Group]:
     return db.query(models.Group).order_by(models.Group.name).all()
 
 
+def delete_group(db: Session, group: models.Group) -> None:
+    """Delete a group and everything in it with a few set-based statements.
+
+    Games, convocations, presences, series and invitations go through ON DELETE
+    CASCADE. ``users.group_id`` is RESTRICT, so members are deleted explicitly
+    first; superadmins are only detached.
+    """
+    db.query(models.User).filter(
+        models.User.group_id == group.id, models.User.role == UserRole.SUPERADMIN
+    ).update({models.User.group_id: None}, synchronize_session=False)
+    db.query(models.User).filter(models.User.group_id == group.id).delete(synchronize_session=False)
+    db.query(models.Group).filter(models.Group.id == group.id).delete(synchronize_session=False)
+    db.commit()
+    group_directory.clear()
+
+
 def create_user(
     db: Session,
     user: schemas.UserCreate,
@@ -59,6 +139,7 @@ def create_user(
     is_active: bool = True,
     confirmation_token: Optional[str] = None,
     preferred_position: Optional[str] = None,
+    password_hash: Optional[str] = None,
 ) -> models.User:
     group = None
     if role != models.UserRole.SUPERADMIN:
@@ -74,7 +155,7 @@ def create_user(
     db_user = models.User(
         name=user.name,
         email=user.email.lower(),
-        password_hash=get_password_hash(user.password),
+        password_hash=password_hash or get_password_hash(user.password),
         role=role,
         is_active=is_active,
         confirmation_token=confirmation_token,
@@ -202,7 +283,7 @@ def create_invitations(
         _expire_pending_invitations(db, email, group_id=group_id)
 
         token = generate_token()
-        expires_at = datetime.utcnow() + timedelta(hours=settings.invitation_expiration_hours)
+        expires_at = datetime.utcnow() + timedelta(hours=get_settings().invitation_expiration_hours)
         invitation = models.Invitation(
             name=item.name,
             email=email,
@@ -245,6 +326,155 @@ def list_invitations(
     return invitations
 
 
+def get_admin_dashboard(
+    db: Session,
+    group_id: int,
+    *,
+    games_limit: int = 10,
+    activity_limit: int = 15,
+) -> schemas.AdminDashboard:
+    """Everything the admin landing page shows, in four grouped read-only queries.
+
+    Unlike ``list_invitations`` nothing is written: invitations past their expiry
+    are counted as expired without flipping their status.
+    """
+    now = datetime.utcnow()
+
+    members_by_status = {
+        status_value.value: count
+        for status_value, count in db.query(models.User.status, func.count(models.User.id))
+        .filter(models.User.group_id == group_id)
+        .group_by(models.User.status)
+    }
+
+    invitation = models.Invitation
+    still_pending = and_(invitation.status == models.InvitationStatus.PENDING, invitation.expires_at >= now)
+    pending, accepted, expired = (
+        db.query(
+            func.sum(case((still_pending, 1), else_=0)),
+            func.sum(case((invitation.status == models.InvitationStatus.ACCEPTED, 1), else_=0)),
+            func.sum(case((and_(invitation.status != models.InvitationStatus.ACCEPTED, ~still_pending), 1), else_=0)),
+        )
+        .filter(invitation.group_id == group_id, invitation.role == UserRole.USER)
+        .one()
+    )
+
+    # The counts only aggregate these games; the outer filters are not pushed into them.
+    upcoming = (
+        select(models.Game.id)
+        .where(models.Game.group_id == group_id, models.Game.scheduled_at >= now)
+        .order_by(models.Game.scheduled_at)
+        .limit(games_limit)
+    )
+    presence_counts = (
+        select(
+            models.Presence.game_id,
+            func.sum(case((models.Presence.status == models.PresenceStatus.CONFIRMED, 1), else_=0)).label("confirmed"),
+            func.sum(case((models.Presence.status == models.PresenceStatus.WAITING, 1), else_=0)).label("waiting"),
+        )
+        .where(models.Presence.game_id.in_(upcoming))
+        .group_by(models.Presence.game_id)
+        .subquery()
+    )
+    pending_counts = (
+        select(models.Convocation.game_id, func.count(models.Convocation.id).label("pending"))
+        .where(
+            models.Convocation.game_id.in_(upcoming),
+            models.Convocation.status == models.ConvocationStatus.PENDING,
+        )
+        .group_by(models.Convocation.game_id)
+        .subquery()
+    )
+    upcoming_games = []
+    for game_id, name, scheduled_at, max_players, confirmed, waiting, reserved in (
+        db.query(
+            models.Game.id,
+            models.Game.name,
+            models.Game.scheduled_at,
+            models.Game.max_players,
+            func.coalesce(presence_counts.c.confirmed, 0),
+            func.coalesce(presence_counts.c.waiting, 0),
+            case(
+                (
+                    or_(models.Game.convocation_deadline.is_(None), models.Game.convocation_deadline > now),
+                    func.coalesce(pending_counts.c.pending, 0),
+                ),
+                else_=0,
+            ),
+        )
+        .outerjoin(presence_counts, presence_counts.c.game_id == models.Game.id)
+        .outerjoin(pending_counts, pending_counts.c.game_id == models.Game.id)
+        .filter(models.Game.group_id == group_id, models.Game.scheduled_at >= now)
+        .order_by(models.Game.scheduled_at)
+        .limit(games_limit)
+    ):
+        upcoming_games.append(
+            schemas.DashboardGame(
+                id=game_id,
+                name=name,
+                scheduled_at=scheduled_at,
+                max_players=max_players,
+                confirmed=confirmed,
+                waiting=waiting,
+                reserved_slots=reserved,
+                # Same rule as _compute_slot_metrics.
+                available_slots=max(max_players - confirmed - reserved, 0),
+            )
+        )
+
+    responses = (
+        select(
+            models.Convocation.responded_at.label("at"),
+            case(
+                (models.Convocation.status == models.ConvocationStatus.DECLINED, literal("declined")),
+                else_=literal("confirmed"),
+            ).label("kind"),
+            models.User.name.label("user_name"),
+            models.Game.id.label("game_id"),
+            models.Game.name.label("game_name"),
+        )
+        .join(models.User, models.User.id == models.Convocation.user_id)
+        .join(models.Game, models.Game.id == models.Convocation.game_id)
+        .where(
+            models.Game.group_id == group_id,
+            models.Convocation.responded_at.isnot(None),
+            models.Convocation.status.in_([models.ConvocationStatus.CONFIRMED, models.ConvocationStatus.DECLINED]),
+        )
+    )
+    joins = (
+        select(
+            models.Presence.joined_at.label("at"),
+            literal("joined").label("kind"),
+            models.User.name.label("user_name"),
+            models.Game.id.label("game_id"),
+            models.Game.name.label("game_name"),
+        )
+        .join(models.User, models.User.id == models.Presence.user_id)
+        .join(models.Game, models.Game.id == models.Presence.game_id)
+        .where(models.Game.group_id == group_id, models.Presence.role == models.PresenceRole.AVULSO)
+    )
+    accepted_invitations = select(
+        invitation.accepted_at.label("at"),
+        literal("invitation_accepted").label("kind"),
+        invitation.name.label("user_name"),
+        literal(None, type_=Integer).label("game_id"),
+        literal(None).label("game_name"),
+    ).where(invitation.group_id == group_id, invitation.accepted_at.isnot(None))
+    activity = union_all(responses, joins, accepted_invitations).subquery()
+    recent_activity = [
+        schemas.DashboardActivity(**row._mapping)
+        for row in db.execute(select(activity).order_by(activity.c.at.desc()).limit(activity_limit))
+    ]
+
+    return schemas.AdminDashboard(
+        member_count=sum(members_by_status.values()),
+        members_by_status=members_by_status,
+        invitations={"pending": pending or 0, "accepted": accepted or 0, "expired": expired or 0},
+        upcoming_games=upcoming_games,
+        recent_activity=recent_activity,
+    )
+
+
 def create_admin_invitations(
     db: Session,
     invitations: List[schemas.SuperadminInvitationCreate],
@@ -305,13 +535,60 @@ def mark_invitation_accepted(db: Session, invitation: models.Invitation, user: m
 def update_user_status(db: Session, user: models.User, status_value: UserStatus) -> models.User:
     if user.status != status_value:
         user.status = status_value
+        _touch_games_for_user(db, user.id)
         db.commit()
         db.refresh(user)
     return user
 
 
+def bulk_update_user_status(
+    db: Session,
+    changes: List[schemas.UserStatusChange],
+    *,
+    group_id: int,
+) -> List[schemas.UserStatusChangeResult]:
+    """Apply many status changes: one lookup, one UPDATE per target status, one commit.
+
+    Returns one result per requested change, in request order.
+    """
+    last_index = {change.user_id: index for index, change in enumerate(changes)}
+    current = {
+        user_id: (user_group_id, user_status)
+        for user_id, user_group_id, user_status in db.query(
+            models.User.id, models.User.group_id, models.User.status
+        ).filter(models.User.id.in_(last_index))
+    }
+
+    results: List[schemas.UserStatusChangeResult] = []
+    targets: Dict[UserStatus, List[int]] = {}
+    for index, change in enumerate(changes):
+        found = current.get(change.user_id)
+        if last_index[change.user_id] != index:
+            result = "superseded"
+        elif found is None:
+            result = "not_found"
+        elif found[0] != group_id:
+            result = "other_group"
+        elif found[1] == change.status:
+            result = "unchanged"
+        else:
+            result = "updated"
+            targets.setdefault(change.status, []).append(change.user_id)
+        results.append(schemas.UserStatusChangeResult(user_id=change.user_id, status=change.status, result=result))
+
+    if targets:
+        for status_value, user_ids in targets.items():
+            db.query(models.User).filter(models.User.id.in_(user_ids)).update(
+                {models.User.status: status_value}, synchronize_session=False
+            )
+        _touch_games_for_users(db, [user_id for user_ids in targets.values() for user_id in user_ids])
+        db.commit()
+    return results
+
+
 def update_profile_image(db: Session, user: models.User, image_path: str) -> models.User:
     user.profile_image = image_path
+    _touch_games_for_user(db, user.id)
     db.commit()
     db.refresh(user)
     return user
@@ -319,13 +596,66 @@ def update_profile_image(db: Session, user: models.User, image_path: str) -> mod
 
 # Game helpers
 
+def _touch_game(db: Session, game_id: int) -> None:
+    """Bump the roster version so cached snapshots of this game are not served again."""
+    db.query(models.Game).filter(models.Game.id == game_id).update(
+        {models.Game.version: models.Game.version + 1},
+        synchronize_session=False,
+    )
+
+
+def _touch_games_for_user(db: Session, user_id: int) -> None:
+    _touch_games_for_users(db, [user_id])
+
+
+def _touch_games_for_users(db: Session, user_ids: List[int]) -> None:
+    convoked = db.query(models.Convocation.game_id).filter(models.Convocation.user_id.in_(user_ids))
+    present = db.query(models.Presence.game_id).filter(models.Presence.user_id.in_(user_ids))
+    db.query(models.Game).filter(models.Game.id.in_(convoked.union(present))).update(
+        {models.Game.version: models.Game.version + 1},
+        synchronize_session=False,
+    )
+
+
 def _resolve_convocation_deadline(game_data: schemas.GameBase) -> Optional[datetime]:
     if game_data.convocation_deadline:
         return game_data.convocation_deadline
-    return datetime.utcnow() + timedelta(hours=settings.default_convocation_deadline_hours)
+    return datetime.utcnow() + timedelta(hours=get_settings().default_convocation_deadline_hours)
+
 
+def _resolve_convocation_user_ids(
+    db: Session,
+    group_id: int,
+    requested_ids: List[int],
+    include_mensalistas: bool,
+) -> List[int]:
+    """Validate the requested ids and add the group's mensalistas in a single query."""
+    requested_ids = list(dict.fromkeys(requested_ids))
+    if not requested_ids and not include_mensalistas:
+        return []
+
+    criteria = [models.User.id.in_(requested_ids)]
+    if include_mensalistas:
+        criteria.append(models.User.status == models.UserStatus.MENSALISTA)
+    found_ids = [
+        user_id
+        for (user_id,) in db.query(models.User.id)
+        .filter(models.User.group_id == group_id, or_(*criteria))
+        .order_by(models.User.id)
+    ]
 
-def create_game(db: Session, game: schemas.GameCreate, owner: models.User) -> models.Game:
+    missing = set(requested_ids) - set(found_ids)
+    if missing:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Users not found: {sorted(missing)}")
+    return list(dict.fromkeys(requested_ids + found_ids))
+
+
+def create_game(db: Session, game: schemas.GameCreate, owner: models.User) -> schemas.GameResponse:
+    """Create the game and its convocations in one transaction.
+
+    A brand-new game has no presences, so the waitlist pass is skipped and the slot
+    summary is computed from the inserted rows instead of reloading the game.
+    """
     convocation_deadline = _resolve_convocation_deadline(game)
 
     target_group_id = owner.group_id
@@ -338,6 +668,10 @@ def create_game(db: Session, game: schemas.GameCreate, owner: models.User) -> mo
     if target_group_id is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário não está vinculado a um grupo")
 
+    user_ids = _resolve_convocation_user_ids(
+        db, target_group_id, game.convocation_user_ids, game.auto_convocar_mensalistas
+    )
+
     db_game = models.Game(
         name=game.name,
         location=game.location,
@@ -345,76 +679,296 @@ def create_game(db: Session, game: schemas.GameCreate, owner: models.User) -> mo
         max_players=game.max_players,
         convocation_deadline=convocation_deadline,
         auto_convocar_mensalistas=game.auto_convocar_mensalistas,
-        owner_id=owner.id,
+        owner=owner,
         group_id=target_group_id,
     )
     db.add(db_game)
+    db.flush()
+
+    if user_ids:
+        db.execute(
+            insert(models.Convocation),
+            [{"game_id": db_game.id, "user_id": user_id} for user_id in user_ids],
+        )
+
+    response = _new_game_response(db_game, len(user_ids))
     db.commit()
-    db.refresh(db_game)
+    return response
+
+
+def _new_game_response(game: models.Game, convoked: int) -> schemas.GameResponse:
+    """Slot summary of a game that was just inserted with ``convoked`` pending convocations."""
+    response = schemas.GameResponse.from_orm(game)
+    response.reserved_slots = convoked if _deadline_open(game) else 0
+    response.available_slots = max(game.max_players - response.reserved_slots, 0)
+    return response
+
+
+# Game series helpers
+
+def get_series(db: Session, series_id: int, *, group_id: Optional[int] = None) -> models.GameSeries:
+    query = db.query(models.GameSeries).filter(models.GameSeries.id == series_id)
+    if group_id is not None:
+        query = query.filter(models.GameSeries.group_id == group_id)
+    series = query.first()
+    if not series:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Série não encontrada")
+    return series
 
-    selected_convocations = list(game.convocation_user_ids)
 
-    if game.auto_convocar_mensalistas:
-        mensalistas = (
-            db.query(models.User)
+def list_series(db: Session, group_id: int) -> List[models.GameSeries]:
+    return (
+        db.query(models.GameSeries)
+        .filter(models.GameSeries.group_id == group_id)
+        .order_by(models.GameSeries.starts_at)
+        .all()
+    )
+
+
+def _next_occurrence(db: Session, series: models.GameSeries) -> datetime:
+    interval = timedelta(weeks=series.interval_weeks)
+    last = (
+        db.query(func.max(models.Game.scheduled_at))
+        .filter(models.Game.series_id == series.id)
+        .scalar()
+    )
+    candidate = last + interval if last else series.starts_at
+    now = datetime.utcnow()
+    if candidate <= now:
+        # Skip occurrences that are already in the past.
+        skipped = (now - candidate) // interval + 1
+        candidate += interval * skipped
+    return candidate
+
+
+def _generate_series_games(
+    db: Session,
+    series: models.GameSeries,
+    occurrences: int,
+    requested_user_ids: List[int],
+    owner: models.User,
+) -> List[schemas.GameResponse]:
+    """Insert the next ``occurrences`` games and their convocations without committing."""
+    user_ids = _resolve_convocation_user_ids(
+        db, series.group_id, requested_user_ids, series.auto_convocar_mensalistas
+    )
+    first = _next_occurrence(db, series)
+    interval = timedelta(weeks=series.interval_weeks)
+    rows = []
+    for index in range(occurrences):
+        scheduled_at = first + interval * index
+        rows.append(
+            {
+                "name": series.name,
+                "location": series.location,
+                "scheduled_at": scheduled_at,
+                "max_players": series.max_players,
+                "convocation_deadline": scheduled_at - timedelta(hours=series.deadline_offset_hours),
+                "auto_convocar_mensalistas": series.auto_convocar_mensalistas,
+                "owner_id": owner.id,
+                "group_id": series.group_id,
+                "series_id": series.id,
+            }
+        )
+    db.execute(insert(models.Game), rows)
+    games = (
+        db.query(models.Game)
+        .filter(models.Game.series_id == series.id, models.Game.scheduled_at >= first)
+        .order_by(models.Game.scheduled_at)
+        .all()
+    )
+
+    if user_ids:
+        db.execute(
+            insert(models.Convocation),
+            [{"game_id": game.id, "user_id": user_id} for game in games for user_id in user_ids],
+        )
+    return [_new_game_response(game, len(user_ids)) for game in games]
+
+
+def create_series(db: Session, payload: schemas.GameSeriesCreate, owner: models.User) -> schemas.GameSeriesDetail:
+    if owner.group_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário não está vinculado a um grupo")
+
+    series = models.GameSeries(
+        name=payload.name,
+        location=payload.location,
+        starts_at=payload.starts_at,
+        interval_weeks=payload.interval_weeks,
+        max_players=payload.max_players,
+        deadline_offset_hours=payload.deadline_offset_hours,
+        auto_convocar_mensalistas=payload.auto_convocar_mensalistas,
+        owner_id=owner.id,
+        group_id=owner.group_id,
+    )
+    db.add(series)
+    db.flush()
+
+    games = _generate_series_games(db, series, payload.occurrences, payload.convocation_user_ids, owner)
+    response = schemas.GameSeriesDetail.from_orm(series)
+    response.games = games
+    db.commit()
+    return response
+
+
+def generate_series_games(
+    db: Session,
+    series: models.GameSeries,
+    payload: schemas.GameSeriesGenerate,
+    owner: models.User,
+) -> List[schemas.GameResponse]:
+    games = _generate_series_games(db, series, payload.occurrences, payload.convocation_user_ids, owner)
+    db.commit()
+    return games
+
+
+def _hours_before(db: Session, column, hours: int):
+    """SQL expression for ``column - hours`` on the current dialect."""
+    if db.get_bind().dialect.name == "sqlite":
+        # Same text format SQLAlchemy uses to store SQLite datetimes.
+        return func.strftime("%Y-%m-%d %H:%M:%S.000000", column, f"-{hours} hours")
+    return column - timedelta(hours=hours)
+
+
+def update_series(db: Session, series: models.GameSeries, payload: schemas.GameSeriesUpdate) -> models.GameSeries:
+    """Apply the changes to the series and, in one UPDATE, to its games not yet played."""
+    changes = payload.dict(exclude_unset=True, exclude_none=True)
+    if not changes:
+        return series
+
+    for field, value in changes.items():
+        setattr(series, field, value)
+
+    game_values = {
+        getattr(models.Game, field): value
+        for field, value in changes.items()
+        if field in {"name", "location", "max_players", "auto_convocar_mensalistas"}
+    }
+    if "deadline_offset_hours" in changes:
+        game_values[models.Game.convocation_deadline] = _hours_before(
+            db, models.Game.scheduled_at, changes["deadline_offset_hours"]
+        )
+        # Moved deadlines are due again; the caller resyncs the deadline scheduler.
+        game_values[models.Game.deadline_processed_at] = None
+    game_values[models.Game.version] = models.Game.version + 1
+
+    now = datetime.utcnow()
+    future_games = db.query(models.Game).filter(
+        models.Game.series_id == series.id,
+        models.Game.scheduled_at > now,
+    )
+    future_game_ids: List[int] = []
+    if "max_players" in changes:
+        future_game_ids = [game_id for (game_id,) in future_games.with_entities(models.Game.id)]
+    future_games.update(game_values, synchronize_session=False)
+
+    if "deadline_offset_hours" in changes:
+        _reopen_expired_convocations(db, series.id, now)
+
+    if future_game_ids:
+        # More room may promote players from the waitlist.
+        waiting_games = (
+            db.query(models.Game)
             .filter(
-                models.User.status == models.UserStatus.MENSALISTA,
-                models.User.group_id == target_group_id,
+                models.Game.id.in_(future_game_ids),
+                models.Game.presences.any(models.Presence.status == models.PresenceStatus.WAITING),
             )
+            # The bulk UPDATE above bypassed any games already in the session.
+            .populate_existing()
             .all()
         )
-        selected_convocations.extend(user.id for user in mensalistas)
+        for game in waiting_games:
+            _fill_waitlist(db, game)
 
-    if selected_convocations:
-        deduped: List[int] = []
-        seen = set()
-        for user_id in selected_convocations:
-            if user_id in seen:
-                continue
-            seen.add(user_id)
-            deduped.append(user_id)
-        selected_convocations = deduped
-        assign_convocations(db, db_game, selected_convocations)
-        db.refresh(db_game)
-
-    return db_game
+    db.commit()
+    db.refresh(series)
+    return series
 
 
-def assign_convocations(db: Session, game: models.Game, user_ids: List[int]) -> List[models.Convocation]:
-    unique_user_ids = list(dict.fromkeys(user_ids))
-    users = (
-        db.query(models.User)
-        .filter(models.User.id.in_(unique_user_ids), models.User.group_id == game.group_id)
+def _reopen_expired_convocations(db: Session, series_id: int, now: datetime) -> None:
+    """Turn EXPIRED convocations back to PENDING where the series' new deadline is ahead."""
+    reopened = (
+        db.query(models.Convocation.id, models.Convocation.user_id, models.Game)
+        .join(models.Game, models.Game.id == models.Convocation.game_id)
+        .filter(
+            models.Game.series_id == series_id,
+            models.Game.scheduled_at > now,
+            models.Game.convocation_deadline > now,
+            models.Convocation.status == models.ConvocationStatus.EXPIRED,
+        )
         .all()
     )
-    found_ids = {user.id for user in users}
-    missing = set(unique_user_ids) - found_ids
-    if missing:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Users not found: {sorted(missing)}")
+    if not reopened:
+        return
+
+    db.query(models.Convocation).filter(models.Convocation.id.in_([row[0] for row in reopened])).update(
+        {models.Convocation.status: models.ConvocationStatus.PENDING}, synchronize_session=False
+    )
+    games: Dict[int, models.Game] = {}
+    deltas: Dict[int, Dict[int, Counter]] = {}
+    for _, user_id, game in reopened:
+        games[game.id] = game
+        deltas.setdefault(game.id, {})[user_id] = Counter(no_shows=-1)
+    for game_id, game_deltas in deltas.items():
+        _bump_player_stats(db, games[game_id], game_deltas)
 
-    existing_convocations = {conv.user_id: conv for conv in game.convocations}
 
-    # Remove convocations that are no longer present and any related presences
-    for user_id, conv in list(existing_convocations.items()):
-        if user_id not in found_ids:
-            db.delete(conv)
-            presence = (
-                db.query(models.Presence)
-                .filter(models.Presence.game_id == game.id, models.Presence.user_id == user_id)
-                .first()
+def assign_convocations(
+    db: Session,
+    game: models.Game,
+    user_ids: List[int],
+    mode: schemas.ConvocationAssignMode = schemas.ConvocationAssignMode.REPLACE,
+) -> None:
+    """Replace, extend or shrink the convocation list with set-based statements.
+
+    Removed convocations and their presences go in one DELETE each, new ones in one
+    bulk INSERT, followed by a single waitlist pass and one commit.
+    """
+    requested = set(user_ids)
+    if mode != schemas.ConvocationAssignMode.REMOVE and requested:
+        found_ids = {
+            user_id
+            for (user_id,) in db.query(models.User.id).filter(
+                models.User.id.in_(requested), models.User.group_id == game.group_id
             )
-            if presence:
-                db.delete(presence)
+        }
+        missing = requested - found_ids
+        if missing:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Users not found: {sorted(missing)}")
+
+    existing = {
+        user_id
+        for (user_id,) in db.query(models.Convocation.user_id).filter(models.Convocation.game_id == game.id)
+    }
+    if mode == schemas.ConvocationAssignMode.REPLACE:
+        to_remove, to_add = existing - requested, requested - existing
+    elif mode == schemas.ConvocationAssignMode.ADD:
+        to_remove, to_add = set(), requested - existing
+    else:
+        to_remove, to_add = requested & existing, set()
+
+    if not to_remove and not to_add:
+        return
 
-    # Add or keep convocations
-    for user in users:
-        if user.id not in existing_convocations:
-            db.add(models.Convocation(game_id=game.id, user_id=user.id))
+    if to_remove:
+        deltas = _roster_stat_deltas(db, game.id, to_remove)
+        db.query(models.Convocation).filter(
+            models.Convocation.game_id == game.id, models.Convocation.user_id.in_(to_remove)
+        ).delete(synchronize_session=False)
+        db.query(models.Presence).filter(
+            models.Presence.game_id == game.id, models.Presence.user_id.in_(to_remove)
+        ).delete(synchronize_session=False)
+        _bump_player_stats(db, game, {user_id: _negated(counts) for user_id, counts in deltas.items()})
+    if to_add:
+        db.execute(
+            insert(models.Convocation),
+            [{"game_id": game.id, "user_id": user_id} for user_id in sorted(to_add)],
+        )
 
-    db.commit()
-    db.refresh(game)
+    _touch_game(db, game.id)
+    db.expire(game, ["convocations", "presences"])
     _fill_waitlist(db, game)
-    return game.convocations
+    db.commit()
 
 
 def get_games(db: Session, group_id: int) -> List[models.Game]:
@@ -436,13 +990,130 @@ def get_game(db: Session, game_id: int, *, group_id: Optional[int] = None) -> mo
     return game
 
 
+# Async read helpers. Nothing may lazy-load under asyncio, so every relationship the
+# callers touch is eager-loaded here.
+
+async def get_games_async(db: AsyncSession, group_id: int) -> List[models.Game]:
+    result = await db.execute(
+        select(models.Game)
+        .options(
+            joinedload(models.Game.owner),
+            selectinload(models.Game.convocations),
+            selectinload(models.Game.presences),
+        )
+        .where(models.Game.group_id == group_id)
+        .order_by(models.Game.scheduled_at)
+    )
+    return list(result.scalars().all())
+
+
+async def get_game_async(db: AsyncSession, game_id: int, *, group_id: Optional[int] = None) -> models.Game:
+    statement = select(models.Game).where(models.Game.id == game_id)
+    if group_id is not None:
+        statement = statement.where(models.Game.group_id == group_id)
+    game = (await db.execute(statement)).scalar_one_or_none()
+    if not game:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Game not found")
+    return game
+
+
+async def load_game_roster_async(db: AsyncSession, game_id: int) -> models.Game:
+    """Load a game with everything ``generate_game_snapshot`` reads."""
+    result = await db.execute(
+        select(models.Game)
+        .options(
+            joinedload(models.Game.owner),
+            selectinload(models.Game.convocations).joinedload(models.Convocation.user),
+            selectinload(models.Game.presences).joinedload(models.Presence.user),
+        )
+        .where(models.Game.id == game_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+async def list_my_games_async(db: AsyncSession, user: models.User) -> list:
+    """The user's standing in every upcoming game of the group, in one statement.
+
+    Convocation and presence are outer-joined on the user; the live waitlist
+    position is a ``row_number()`` over each game's waiting presences.
+    """
+    upcoming = select(models.Game.id).where(
+        models.Game.group_id == user.group_id,
+        models.Game.scheduled_at >= datetime.utcnow(),
+    )
+    waitlist = (
+        select(
+            models.Presence.id,
+            func.row_number()
+            .over(
+                partition_by=models.Presence.game_id,
+                order_by=(models.Presence.queue_position.asc(), models.Presence.joined_at.asc()),
+            )
+            .label("position"),
+        )
+        .where(
+            models.Presence.game_id.in_(upcoming),
+            models.Presence.status == models.PresenceStatus.WAITING,
+        )
+        .subquery()
+    )
+    result = await db.execute(
+        select(
+            models.Game.id.label("game_id"),
+            models.Game.name,
+            models.Game.location,
+            models.Game.scheduled_at,
+            models.Game.convocation_deadline,
+            models.Convocation.status.label("convocation_status"),
+            models.Presence.status.label("presence_status"),
+            models.Presence.role.label("presence_role"),
+            waitlist.c.position.label("waitlist_position"),
+        )
+        .outerjoin(
+            models.Convocation,
+            and_(models.Convocation.game_id == models.Game.id, models.Convocation.user_id == user.id),
+        )
+        .outerjoin(
+            models.Presence,
+            and_(models.Presence.game_id == models.Game.id, models.Presence.user_id == user.id),
+        )
+        .outerjoin(waitlist, waitlist.c.id == models.Presence.id)
+        .where(models.Game.id.in_(upcoming))
+        .order_by(models.Game.scheduled_at, models.Game.id)
+    )
+    return list(result.all())
+
+
+async def list_groups_async(
+    db: AsyncSession,
+    *,
+    query_text: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> List[models.Group]:
+    statement = select(models.Group).order_by(models.Group.name)
+    if query_text:
+        statement = statement.where(func.lower(models.Group.name).contains(query_text.lower(), autoescape=True))
+    result = await db.execute(statement.offset(offset).limit(limit))
+    return list(result.scalars().all())
+
+
 def delete_game(db: Session, game: models.Game) -> None:
+    deltas = _roster_stat_deltas(db, game.id)
+    _bump_player_stats(db, game, {user_id: _negated(counts) for user_id, counts in deltas.items()})
     db.delete(game)
     db.commit()
 
 
+def _deadline_open(game: models.Game) -> bool:
+    return game.convocation_deadline is None or game.convocation_deadline > datetime.utcnow()
+
+
 def _compute_slot_metrics(game: models.Game) -> Tuple[int, int, int]:
-    now = datetime.utcnow()
+    # The deadline scheduler flips overdue PENDING convocations to EXPIRED; the clock
+    # check covers the time before it runs, or DEADLINE_SCHEDULER=false.
+    deadline_open = _deadline_open(game)
     confirmed_presences = [
         presence for presence in game.presences if presence.status == models.PresenceStatus.CONFIRMED
     ]
@@ -450,8 +1121,7 @@ def _compute_slot_metrics(game: models.Game) -> Tuple[int, int, int]:
     reserved_slots = sum(
         1
         for conv in game.convocations
-        if conv.status == models.ConvocationStatus.PENDING
-        and (game.convocation_deadline is None or game.convocation_deadline > now)
+        if conv.status == models.ConvocationStatus.PENDING and deadline_open
     )
     available_slots = max(game.max_players - used_slots - reserved_slots, 0)
     return used_slots, reserved_slots, available_slots
@@ -490,27 +1160,80 @@ def _ensure_presence(
 
 
 def _fill_waitlist(db: Session, game: models.Game) -> List[models.Presence]:
-    promoted: List[models.Presence] = []
-    while True:
-        _, reserved, available = _compute_slot_metrics(game)
-        if available <= 0:
-            break
-        waiting_presence = (
-            db.query(models.Presence)
-            .filter(
-                models.Presence.game_id == game.id,
-                models.Presence.status == models.PresenceStatus.WAITING,
-            )
-            .order_by(models.Presence.queue_position.asc(), models.Presence.joined_at.asc())
-            .first()
+    """Promote as many waiting players as there are free slots, in one pass.
+
+    ``game.convocations`` and ``game.presences`` must reflect pending changes (expire
+    them after bulk statements). The caller commits.
+    """
+    _, _, available = _compute_slot_metrics(game)
+    if available <= 0:
+        return []
+    promoted = (
+        db.query(models.Presence)
+        .filter(
+            models.Presence.game_id == game.id,
+            models.Presence.status == models.PresenceStatus.WAITING,
         )
-        if not waiting_presence:
-            break
-        waiting_presence.status = models.PresenceStatus.CONFIRMED
-        promoted.append(waiting_presence)
-        db.commit()
-        db.refresh(waiting_presence)
-        db.refresh(game)
+        .order_by(models.Presence.queue_position.asc(), models.Presence.joined_at.asc())
+        .limit(available)
+        .all()
+    )
+    if not promoted:
+        return []
+    now = datetime.utcnow()
+    for presence in promoted:
+        presence.status = models.PresenceStatus.CONFIRMED
+        presence.promoted_at = now
+    _touch_game(db, game.id)
+    _bump_player_stats(
+        db, game, {presence.user_id: Counter(confirmed=1, promotions=1) for presence in promoted}
+    )
+    return promoted
+
+
+def pending_deadlines(db: Session, until: datetime) -> List[Tuple[datetime, int]]:
+    """Unprocessed convocation deadlines up to ``until``, as ``(deadline, game_id)``."""
+    return [
+        (deadline, game_id)
+        for game_id, deadline in db.query(models.Game.id, models.Game.convocation_deadline).filter(
+            models.Game.convocation_deadline.isnot(None),
+            models.Game.convocation_deadline <= until,
+            models.Game.deadline_processed_at.is_(None),
+        )
+    ]
+
+
+def process_convocation_deadline(db: Session, game_id: int) -> List[models.Presence]:
+    """Expire unanswered convocations of a game past its deadline and promote the waitlist.
+
+    The conditional UPDATE claims the game, so schedulers running in several workers
+    process each deadline once; a deadline moved into the future is left alone.
+    """
+    now = datetime.utcnow()
+    claimed = (
+        db.query(models.Game)
+        .filter(
+            models.Game.id == game_id,
+            models.Game.deadline_processed_at.is_(None),
+            models.Game.convocation_deadline <= now,
+        )
+        .update({models.Game.deadline_processed_at: now}, synchronize_session=False)
+    )
+    if not claimed:
+        db.rollback()
+        return []
+
+    pending = db.query(models.Convocation).filter(
+        models.Convocation.game_id == game_id,
+        models.Convocation.status == models.ConvocationStatus.PENDING,
+    )
+    expired_user_ids = [user_id for (user_id,) in pending.with_entities(models.Convocation.user_id)]
+    pending.update({models.Convocation.status: models.ConvocationStatus.EXPIRED}, synchronize_session=False)
+    _touch_game(db, game_id)
+    game = db.get(models.Game, game_id)
+    _bump_player_stats(db, game, {user_id: Counter(no_shows=1) for user_id in expired_user_ids})
+    promoted = _fill_waitlist(db, game)
+    db.commit()
     return promoted
 
 
@@ -557,6 +1280,9 @@ def join_as_avulso(db: Session, game_id: int, user: models.User) -> models.Prese
         queue_position=next_position,
     )
     db.add(presence)
+    _touch_game(db, game.id)
+    if status_value == models.PresenceStatus.CONFIRMED:
+        _bump_player_stats(db, game, {user.id: Counter(confirmed=1)})
     db.commit()
     db.refresh(presence)
 
@@ -573,6 +1299,11 @@ def confirm_convocation(db: Session, game_id: int, user: models.User) -> Tuple[m
     if not convocation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Convocação não encontrada para este usuário")
 
+    stats: Dict[int, Counter] = {user.id: Counter()}
+    if convocation.status == models.ConvocationStatus.DECLINED:
+        stats[user.id]["declined"] -= 1
+    elif convocation.status == models.ConvocationStatus.EXPIRED:
+        stats[user.id]["no_shows"] -= 1
     convocation.status = models.ConvocationStatus.CONFIRMED
     convocation.responded_at = datetime.utcnow()
 
@@ -596,10 +1327,22 @@ def confirm_convocation(db: Session, game_id: int, user: models.User) -> Tuple[m
         )
         if avulso_to_wait:
             avulso_to_wait.status = models.PresenceStatus.WAITING
+            stats.setdefault(avulso_to_wait.user_id, Counter())["confirmed"] -= 1
+            if avulso_to_wait.promoted_at is not None:
+                stats[avulso_to_wait.user_id]["promotions"] -= 1
+                avulso_to_wait.promoted_at = None
             displaced.append(avulso_to_wait)
         else:
             available = 1
 
+    # Loaded as an entity so a displacement above (not flushed yet) is seen.
+    existing = (
+        db.query(models.Presence)
+        .filter(models.Presence.game_id == game_id, models.Presence.user_id == user.id)
+        .first()
+    )
+    if existing is None or existing.status != models.PresenceStatus.CONFIRMED:
+        stats[user.id]["confirmed"] += 1
     presence = _ensure_presence(
         db,
         game_id,
@@ -607,6 +1350,8 @@ def confirm_convocation(db: Session, game_id: int, user: models.User) -> Tuple[m
         models.PresenceRole.CONVOKED,
         models.PresenceStatus.CONFIRMED,
     )
+    _touch_game(db, game_id)
+    _bump_player_stats(db, game, stats)
     db.commit()
     db.refresh(convocation)
     db.refresh(presence)
@@ -624,6 +1369,11 @@ def decline_convocation(db: Session, game_id: int, user: models.User) -> List[mo
     if not convocation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Convocação não encontrada para este usuário")
 
+    counts = Counter()
+    if convocation.status != models.ConvocationStatus.DECLINED:
+        counts["declined"] += 1
+    if convocation.status == models.ConvocationStatus.EXPIRED:
+        counts["no_shows"] -= 1
     convocation.status = models.ConvocationStatus.DECLINED
     convocation.responded_at = datetime.utcnow()
 
@@ -633,13 +1383,17 @@ def decline_convocation(db: Session, game_id: int, user: models.User) -> List[mo
         .first()
     )
     if presence:
+        counts.subtract(_presence_stat_counts(presence))
         db.delete(presence)
 
-    db.commit()
-
+    _touch_game(db, game_id)
     game = convocation.game
-    db.refresh(game)
-    return _fill_waitlist(db, game)
+    _bump_player_stats(db, game, {user.id: counts})
+    db.flush()
+    db.expire(game, ["convocations", "presences"])
+    promoted = _fill_waitlist(db, game)
+    db.commit()
+    return promoted
 
 
 def remove_presence(
@@ -664,58 +1418,601 @@ def remove_presence(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to remove this presence")
 
     db.delete(presence)
+    _touch_game(db, game.id)
+    _bump_player_stats(db, game, {presence.user_id: _negated(_presence_stat_counts(presence))})
+    db.flush()
+    db.expire(game, ["convocations", "presences"])
+    promoted = _fill_waitlist(db, game)
     db.commit()
-    db.refresh(game)
-    return _fill_waitlist(db, game)
+    return promoted
 
 
-def generate_game_snapshot(game: models.Game) -> schemas.GameDetail:
+def _sorted_convocations(game: models.Game) -> List[models.Convocation]:
+    return sorted(
+        game.convocations,
+        key=lambda conv: (
+            0 if conv.status == models.ConvocationStatus.CONFIRMED else 1,
+            conv.user.name.lower(),
+        ),
+    )
+
+
+def _presence_sort_key(presence: models.Presence) -> Tuple[int, int, int, datetime]:
+    role_priority = 0 if presence.role == models.PresenceRole.CONVOKED else 1
+    status_priority = {
+        models.PresenceStatus.CONFIRMED: 0,
+        models.PresenceStatus.WAITING: 1,
+        models.PresenceStatus.DECLINED: 2,
+    }.get(presence.status, 3)
+    queue_order = (
+        presence.queue_position
+        if presence.status == models.PresenceStatus.WAITING and presence.queue_position is not None
+        else 10**9
+    )
+    return (role_priority, status_priority, queue_order, presence.joined_at)
+
+
+def _sorted_presences(game: models.Game) -> List[models.Presence]:
+    return sorted(game.presences, key=_presence_sort_key)
+
+
+def _game_summary_fields(game: models.Game) -> dict:
     reserved, available = get_slot_summary(game)
+    return {
+        "id": game.id,
+        "name": game.name,
+        "location": game.location,
+        "scheduled_at": game.scheduled_at,
+        "max_players": game.max_players,
+        "convocation_deadline": game.convocation_deadline,
+        "auto_convocar_mensalistas": game.auto_convocar_mensalistas,
+        "created_at": game.created_at,
+        "owner": schemas.UserPublic.from_orm(game.owner) if game.owner else None,
+        "reserved_slots": reserved,
+        "available_slots": available,
+        "group_id": game.group_id,
+        "series_id": game.series_id,
+    }
 
-    convocations = [
-        schemas.ConvocationResponse.from_orm(conv)
-        for conv in sorted(
-            game.convocations,
-            key=lambda conv: (
-                0 if conv.status == models.ConvocationStatus.CONFIRMED else 1,
-                conv.user.name.lower(),
-            ),
+
+def generate_game_snapshot(game: models.Game) -> schemas.GameDetail:
+    convocations = [schemas.ConvocationResponse.from_orm(conv) for conv in _sorted_convocations(game)]
+    presences = [schemas.PresenceResponse.from_orm(presence) for presence in _sorted_presences(game)]
+
+    return schemas.GameDetail(
+        **_game_summary_fields(game),
+        convocations=convocations,
+        presences=presences,
+    )
+
+
+def generate_compact_game_snapshot(game: models.Game) -> schemas.GameDetailCompact:
+    """Same roster as ``generate_game_snapshot`` but each user is serialized once.
+
+    Convocations and presences reference ``user_id``; the user payloads live in the
+    ``users`` map (keyed by id, without the redundant ``id``/``group_id``), so a
+    convocado who is also present is not duplicated.
+    """
+    convocations = _sorted_convocations(game)
+    presences = _sorted_presences(game)
+
+    users: dict[int, schemas.RosterUser] = {}
+    for entry in (*convocations, *presences):
+        if entry.user_id not in users:
+            users[entry.user_id] = schemas.RosterUser.from_orm(entry.user)
+
+    return schemas.GameDetailCompact(
+        **_game_summary_fields(game),
+        users=users,
+        convocations=[schemas.ConvocationCompact.from_orm(conv) for conv in convocations],
+        presences=[schemas.PresenceCompact.from_orm(presence) for presence in presences],
+    )
+
+
+# Reminder helpers
+
+def due_reminders(
+    db: Session,
+    kind: models.ReminderKind,
+    offset_minutes: int,
+    window_start: datetime,
+    window_end: datetime,
+    claim_cutoff: datetime,
+) -> list:
+    """Recipients of one reminder window, in a single set-based query.
+
+    Deadline reminders go to convocados still pending whose deadline falls in
+    ``(window_start, window_end]``; kickoff reminders to confirmed players of games
+    starting in that window. Recipients already reminded (or claimed after
+    ``claim_cutoff``) for this kind and offset are skipped.
+    """
+    log = models.ReminderLog
+    reminded = (
+        select(log.id)
+        .where(
+            log.kind == kind,
+            log.offset_minutes == offset_minutes,
+            log.game_id == models.Game.id,
+            log.user_id == models.User.id,
+            or_(log.sent_at.isnot(None), log.claimed_at > claim_cutoff),
+        )
+        .exists()
+    )
+    columns = (
+        models.Game.id.label("game_id"),
+        models.User.id.label("user_id"),
+        models.User.name.label("user_name"),
+        models.User.email,
+        models.Game.name.label("game_name"),
+        models.Game.location,
+        models.Game.scheduled_at,
+        models.Game.convocation_deadline,
+    )
+    if kind == models.ReminderKind.DEADLINE:
+        query = (
+            db.query(*columns)
+            .select_from(models.Convocation)
+            .join(models.Game, models.Convocation.game_id == models.Game.id)
+            .join(models.User, models.Convocation.user_id == models.User.id)
+            .filter(
+                models.Convocation.status == models.ConvocationStatus.PENDING,
+                models.Game.deadline_processed_at.is_(None),
+                models.Game.convocation_deadline > window_start,
+                models.Game.convocation_deadline <= window_end,
+            )
+        )
+    else:
+        query = (
+            db.query(*columns)
+            .select_from(models.Presence)
+            .join(models.Game, models.Presence.game_id == models.Game.id)
+            .join(models.User, models.Presence.user_id == models.User.id)
+            .filter(
+                models.Presence.status == models.PresenceStatus.CONFIRMED,
+                models.Game.scheduled_at > window_start,
+                models.Game.scheduled_at <= window_end,
+            )
         )
+    return query.filter(models.User.is_active.is_(True), ~reminded).order_by(models.Game.id).all()
+
+
+def claim_reminders(
+    db: Session,
+    kind: models.ReminderKind,
+    offset_minutes: int,
+    recipients: List[Tuple[int, int]],
+    claim_cutoff: datetime,
+) -> dict:
+    """Claim ``(game_id, user_id)`` pairs in the ledger with one upsert.
+
+    Returns ``{(game_id, user_id): ledger_id}`` for the pairs this caller won; pairs
+    claimed by another worker (or already sent) are left out.
+    """
+    if not recipients:
+        return {}
+    log = models.ReminderLog
+    now = datetime.utcnow()
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    statement = (
+        dialect_insert(log)
+        .values(
+            [
+                {"kind": kind, "offset_minutes": offset_minutes, "game_id": game_id, "user_id": user_id, "claimed_at": now}
+                for game_id, user_id in recipients
+            ]
+        )
+        .on_conflict_do_update(
+            index_elements=[log.kind, log.offset_minutes, log.game_id, log.user_id],
+            set_={"claimed_at": now},
+            where=and_(log.sent_at.is_(None), log.claimed_at <= claim_cutoff),
+        )
+        .returning(log.id, log.game_id, log.user_id)
+    )
+    claimed = {(game_id, user_id): ledger_id for ledger_id, game_id, user_id in db.execute(statement)}
+    db.commit()
+    return claimed
+
+
+def mark_reminders_sent(db: Session, ledger_ids: List[int]) -> None:
+    if not ledger_ids:
+        return
+    db.query(models.ReminderLog).filter(models.ReminderLog.id.in_(ledger_ids)).update(
+        {models.ReminderLog.sent_at: datetime.utcnow()},
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+# Player stats helpers. Counters mirror current rows, so every mutation applies the
+# difference it makes and ``rebuild_player_stats`` recomputes the same numbers.
+
+_STAT_FIELDS = ("confirmed", "declined", "no_shows", "promotions")
+
+
+def _negated(counts: Counter) -> Counter:
+    # Counter's own unary minus drops negative results.
+    return Counter({field: -value for field, value in counts.items()})
+
+
+def _presence_stat_counts(presence: models.Presence) -> Counter:
+    counts = Counter()
+    if presence.status == models.PresenceStatus.CONFIRMED:
+        counts["confirmed"] += 1
+    if presence.promoted_at is not None:
+        counts["promotions"] += 1
+    return counts
+
+
+def _roster_stat_deltas(db: Session, game_id: int, user_ids: Optional[set] = None) -> Dict[int, Counter]:
+    """What the game's convocations and presences (optionally only some users') count for."""
+    deltas: Dict[int, Counter] = {}
+    convocations = db.query(models.Convocation.user_id, models.Convocation.status).filter(
+        models.Convocation.game_id == game_id,
+        models.Convocation.status.in_([models.ConvocationStatus.DECLINED, models.ConvocationStatus.EXPIRED]),
+    )
+    presences = db.query(models.Presence).filter(models.Presence.game_id == game_id)
+    if user_ids is not None:
+        convocations = convocations.filter(models.Convocation.user_id.in_(user_ids))
+        presences = presences.filter(models.Presence.user_id.in_(user_ids))
+    for user_id, status_value in convocations:
+        field = "declined" if status_value == models.ConvocationStatus.DECLINED else "no_shows"
+        deltas.setdefault(user_id, Counter())[field] += 1
+    for presence in presences:
+        deltas.setdefault(presence.user_id, Counter()).update(_presence_stat_counts(presence))
+    return deltas
+
+
+def _bump_player_stats(db: Session, game: models.Game, deltas: Dict[int, Counter]) -> None:
+    """Add per-user deltas to the game's season rows with one upsert (not committed)."""
+    now = datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "season": game.scheduled_at.year,
+            "group_id": game.group_id,
+            "updated_at": now,
+            **{field: counts.get(field, 0) for field in _STAT_FIELDS},
+        }
+        for user_id, counts in deltas.items()
+        if any(counts.get(field) for field in _STAT_FIELDS)
     ]
+    if not rows:
+        return
+    stats = models.PlayerStats
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    statement = dialect_insert(stats)
+    statement = statement.on_conflict_do_update(
+        index_elements=[stats.user_id, stats.season],
+        set_={
+            "updated_at": statement.excluded.updated_at,
+            **{field: getattr(stats, field) + getattr(statement.excluded, field) for field in _STAT_FIELDS},
+        },
+    )
+    db.execute(statement, rows)
+
+
+def get_player_stats(db: Session, user_id: int) -> List[models.PlayerStats]:
+    return (
+        db.query(models.PlayerStats)
+        .filter(models.PlayerStats.user_id == user_id)
+        .order_by(models.PlayerStats.season.desc())
+        .all()
+    )
+
+
+def get_leaderboard(db: Session, group_id: int, season: int, limit: int) -> List[models.PlayerStats]:
+    """Top players of a season by confirmed presences, read off the leaderboard index."""
+    return (
+        db.query(models.PlayerStats)
+        .options(joinedload(models.PlayerStats.user))
+        .filter(models.PlayerStats.group_id == group_id, models.PlayerStats.season == season)
+        .order_by(models.PlayerStats.confirmed.desc(), models.PlayerStats.user_id.asc())
+        .limit(limit)
+        .all()
+    )
+
+
+def rebuild_player_stats(db: Session) -> int:
+    """Recompute every counter from convocations, presences and the archive; returns the row count."""
+
+    def _source(model, game, condition, **values):
+        return (
+            select(
+                model.user_id.label("user_id"),
+                cast(extract("year", game.scheduled_at), Integer).label("season"),
+                game.group_id.label("group_id"),
+                *[literal(values.get(field, 0)).label(field) for field in _STAT_FIELDS],
+            )
+            .select_from(model)
+            .join(game, game.id == model.game_id)
+            # Archived attendance of deleted accounts has no player to count.
+            .where(condition, model.user_id.isnot(None))
+        )
+
+    attendance = models.ArchivedAttendance
+    sources = union_all(
+        _source(models.Presence, models.Game, models.Presence.status == models.PresenceStatus.CONFIRMED, confirmed=1),
+        _source(models.Presence, models.Game, models.Presence.promoted_at.isnot(None), promotions=1),
+        _source(models.Convocation, models.Game, models.Convocation.status == models.ConvocationStatus.DECLINED, declined=1),
+        _source(models.Convocation, models.Game, models.Convocation.status == models.ConvocationStatus.EXPIRED, no_shows=1),
+        _source(attendance, models.ArchivedGame, attendance.presence_status == models.PresenceStatus.CONFIRMED, confirmed=1),
+        _source(attendance, models.ArchivedGame, attendance.promoted.is_(True), promotions=1),
+        _source(attendance, models.ArchivedGame, attendance.convocation_status == models.ConvocationStatus.DECLINED, declined=1),
+        _source(attendance, models.ArchivedGame, attendance.convocation_status == models.ConvocationStatus.EXPIRED, no_shows=1),
+    ).subquery()
+    totals = select(
+        sources.c.user_id,
+        sources.c.season,
+        func.max(sources.c.group_id),
+        *[func.sum(sources.c[field]) for field in _STAT_FIELDS],
+        literal(datetime.utcnow()),
+    ).group_by(sources.c.user_id, sources.c.season)
+
+    db.query(models.PlayerStats).delete(synchronize_session=False)
+    db.execute(
+        insert(models.PlayerStats).from_select(
+            ["user_id", "season", "group_id", *_STAT_FIELDS, "updated_at"],
+            totals,
+        )
+    )
+    db.commit()
+    return db.query(models.PlayerStats).count()
+
+
+def _confirmed_user_ids(game_id: int):
+    return select(models.Presence.user_id).where(
+        models.Presence.game_id == game_id,
+        models.Presence.status == models.PresenceStatus.CONFIRMED,
+    )
+
+
+def roster_stats_updated_at(db: Session, game_id: int) -> Optional[datetime]:
+    """Last change to the stats the confirmed players are rated by; part of the teams cache key."""
+    stats = models.PlayerStats
+    return db.query(func.max(stats.updated_at)).filter(stats.user_id.in_(_confirmed_user_ids(game_id))).scalar()
+
+
+def draw_teams(db: Session, game: models.Game, team_count: int) -> schemas.TeamDraw:
+    """Split the confirmed players into balanced teams (see :mod:`app.teams`).
+
+    Seeded with the game id and roster version, so a roster rated by the same stats
+    always draws the same teams.
+    """
+    from . import teams  # NumPy is only imported by the first draw, not at boot.
 
-    def presence_sort_key(presence: models.Presence) -> Tuple[int, int, int, datetime]:
-        role_priority = 0 if presence.role == models.PresenceRole.CONVOKED else 1
-        status_priority = {
-            models.PresenceStatus.CONFIRMED: 0,
-            models.PresenceStatus.WAITING: 1,
-            models.PresenceStatus.DECLINED: 2,
-        }.get(presence.status, 3)
-        queue_order = (
-            presence.queue_position
-            if presence.status == models.PresenceStatus.WAITING and presence.queue_position is not None
-            else 10**9
-        )
-        return (role_priority, status_priority, queue_order, presence.joined_at)
-
-    presences = [
-        schemas.PresenceResponse.from_orm(presence)
-        for presence in sorted(game.presences, key=presence_sort_key)
+    stats = models.PlayerStats
+    totals = (
+        select(
+            stats.user_id,
+            func.sum(stats.confirmed).label("confirmed"),
+            func.sum(stats.declined).label("declined"),
+            func.sum(stats.no_shows).label("no_shows"),
+        )
+        .where(stats.user_id.in_(_confirmed_user_ids(game.id)))
+        .group_by(stats.user_id)
+        .subquery()
+    )
+    rows = (
+        db.query(models.User, totals.c.confirmed, totals.c.declined, totals.c.no_shows)
+        .join(models.Presence, models.Presence.user_id == models.User.id)
+        .outerjoin(totals, totals.c.user_id == models.User.id)
+        .filter(
+            models.Presence.game_id == game.id,
+            models.Presence.status == models.PresenceStatus.CONFIRMED,
+        )
+        .order_by(models.User.id)
+        .all()
+    )
+    if len(rows) < team_count:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"São necessários pelo menos {team_count} jogadores confirmados",
+        )
+
+    ratings = [
+        teams.attendance_rating(confirmed or 0, declined or 0, no_shows or 0)
+        for _, confirmed, declined, no_shows in rows
     ]
+    positions = [teams.normalize_position(user.preferred_position) for user, *_ in rows]
+    assignment, imbalance = teams.balance_teams(ratings, positions, team_count, seed=(game.id, game.version, team_count))
+
+    drawn = [schemas.Team(rating=0, players=[]) for _ in range(team_count)]
+    for (user, *_), rating, team_index in zip(rows, ratings, assignment):
+        drawn[team_index].players.append(schemas.TeamPlayer(user=schemas.UserPublic.from_orm(user), rating=rating))
+    for team in drawn:
+        team.players.sort(key=lambda player: (-player.rating, player.user.name))
+        team.rating = round(sum(player.rating for player in team.players), 4)
+    return schemas.TeamDraw(game_id=game.id, version=game.version, imbalance=imbalance, teams=drawn)
+
+
+# Archive helpers. Finished games leave the hot tables in batches; player_stats keeps
+# counting them and rebuild_player_stats reads the archive too.
+
+def archive_games(db: Session, before: datetime, batch_size: int) -> int:
+    """Move games scheduled before ``before`` into the archive; returns how many moved.
+
+    Each batch is a few set-based statements committed together: copy the games, fold
+    their convocations and presences into attendance rows, delete the games (ON DELETE
+    CASCADE takes the rosters and reminder log). Run one archiver per database.
+    """
+    game = models.Game
+    convocation = models.Convocation
+    presence = models.Presence
+    archived = models.ArchivedGame
+    moved = 0
+    while True:
+        ids = [
+            game_id
+            for (game_id,) in db.query(game.id)
+            .filter(game.scheduled_at < before)
+            .order_by(game.id)
+            .limit(batch_size)
+        ]
+        if not ids:
+            return moved
+
+        archived_at = datetime.utcnow()
+        db.execute(
+            insert(archived).from_select(
+                ["original_game_id", "name", "location", "scheduled_at", "max_players", "created_at", "archived_at", "owner_id", "group_id"],
+                select(
+                    game.id,
+                    game.name,
+                    game.location,
+                    game.scheduled_at,
+                    game.max_players,
+                    game.created_at,
+                    literal(archived_at),
+                    game.owner_id,
+                    game.group_id,
+                ).where(game.id.in_(ids)),
+            )
+        )
+        players = union(
+            select(convocation.game_id, convocation.user_id).where(convocation.game_id.in_(ids)),
+            select(presence.game_id, presence.user_id).where(presence.game_id.in_(ids)),
+        ).subquery()
+        # The rows just copied; archived_at also tells them from games archived before
+        # game ids stopped being reused.
+        batch = (
+            select(archived.id, archived.original_game_id)
+            .where(archived.original_game_id.in_(ids), archived.archived_at == archived_at)
+            .subquery()
+        )
+        db.execute(
+            insert(models.ArchivedAttendance).from_select(
+                ["game_id", "user_id", "convocation_status", "presence_role", "presence_status", "promoted"],
+                select(
+                    batch.c.id,
+                    players.c.user_id,
+                    convocation.status,
+                    presence.role,
+                    presence.status,
+                    presence.promoted_at.isnot(None),
+                )
+                .select_from(players)
+                .join(batch, batch.c.original_game_id == players.c.game_id)
+                .outerjoin(
+                    convocation,
+                    and_(convocation.game_id == players.c.game_id, convocation.user_id == players.c.user_id),
+                )
+                .outerjoin(
+                    presence,
+                    and_(presence.game_id == players.c.game_id, presence.user_id == players.c.user_id),
+                ),
+            )
+        )
+        db.query(game).filter(game.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        moved += len(ids)
 
-    owner = schemas.UserPublic.from_orm(game.owner) if game.owner else None
 
-    return schemas.GameDetail(
-        id=game.id,
-        name=game.name,
-        location=game.location,
-        scheduled_at=game.scheduled_at,
-        max_players=game.max_players,
-        convocation_deadline=game.convocation_deadline,
-        created_at=game.created_at,
-        owner=owner,
-        convocations=convocations,
-        presences=presences,
-        reserved_slots=reserved,
-        available_slots=available,
-        group_id=game.group_id,
+def list_archived_games(
+    db: Session,
+    group_id: int,
+    *,
+    before: Optional[datetime] = None,
+    limit: int = 20,
+) -> List[schemas.ArchivedGameSummary]:
+    """Most recent first; pass the last ``scheduled_at`` as ``before`` for the next page."""
+    archived = models.ArchivedGame
+    attendance = models.ArchivedAttendance
+    confirmed = (
+        select(func.count())
+        .where(
+            attendance.game_id == archived.id,
+            attendance.presence_status == models.PresenceStatus.CONFIRMED,
+        )
+        .scalar_subquery()
+    )
+    query = db.query(archived, confirmed).filter(archived.group_id == group_id)
+    if before is not None:
+        query = query.filter(archived.scheduled_at < before)
+    rows = query.order_by(archived.scheduled_at.desc(), archived.id.desc()).limit(limit).all()
+    return [
+        schemas.ArchivedGameSummary(**schemas.ArchivedGameBase.from_orm(game).dict(), confirmed=count)
+        for game, count in rows
+    ]
+
+
+def get_archived_game(db: Session, archived_id: int, *, group_id: int) -> schemas.ArchivedGameDetail:
+    game = (
+        db.query(models.ArchivedGame)
+        .options(selectinload(models.ArchivedGame.attendance).joinedload(models.ArchivedAttendance.user))
+        .filter(models.ArchivedGame.id == archived_id, models.ArchivedGame.group_id == group_id)
+        .first()
+    )
+    if not game:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Game not found")
+    detail = schemas.ArchivedGameDetail.from_orm(game)
+    detail.attendance.sort(
+        key=lambda entry: (entry.presence_status != models.PresenceStatus.CONFIRMED, entry.user.name if entry.user else "")
+    )
+    return detail
+
+
+# Export helpers
+
+def group_history_queries(group_id: int) -> List[Select]:
+    """Every game of the group with one row per player: archived games, then the live ones.
+
+    Both queries yield the same columns in ``scheduled_at`` order, so they can be
+    streamed one after the other without sorting the whole history at once.
+    """
+    archived = models.ArchivedGame
+    attendance = models.ArchivedAttendance
+    user = models.User
+    archived_rows = (
+        select(
+            archived.original_game_id.label("game_id"),
+            literal(True).label("archived"),
+            archived.name.label("game_name"),
+            archived.location,
+            archived.scheduled_at,
+            attendance.user_id,
+            user.name.label("user_name"),
+            user.email,
+            attendance.convocation_status,
+            attendance.presence_role,
+            attendance.presence_status,
+            null().label("queue_position"),
+            attendance.promoted,
+        )
+        .select_from(attendance)
+        .join(archived, archived.id == attendance.game_id)
+        .outerjoin(user, user.id == attendance.user_id)
+        .where(archived.group_id == group_id)
+        .order_by(archived.scheduled_at, archived.id, user.name)
+    )
+
+    game = models.Game
+    convocation = models.Convocation
+    presence = models.Presence
+    players = union(
+        select(convocation.game_id, convocation.user_id).join(game, game.id == convocation.game_id).where(game.group_id == group_id),
+        select(presence.game_id, presence.user_id).join(game, game.id == presence.game_id).where(game.group_id == group_id),
+    ).subquery()
+    live_rows = (
+        select(
+            game.id.label("game_id"),
+            literal(False).label("archived"),
+            game.name.label("game_name"),
+            game.location,
+            game.scheduled_at,
+            players.c.user_id,
+            user.name.label("user_name"),
+            user.email,
+            convocation.status.label("convocation_status"),
+            presence.role.label("presence_role"),
+            presence.status.label("presence_status"),
+            presence.queue_position,
+            presence.promoted_at.isnot(None).label("promoted"),
+        )
+        .select_from(players)
+        .join(game, game.id == players.c.game_id)
+        .join(user, user.id == players.c.user_id)
+        .outerjoin(convocation, and_(convocation.game_id == players.c.game_id, convocation.user_id == players.c.user_id))
+        .outerjoin(presence, and_(presence.game_id == players.c.game_id, presence.user_id == players.c.user_id))
+        .order_by(game.scheduled_at, game.id, user.name)
     )
+    return [archived_rows, live_rows]
@@ -1,27 +1,433 @@
+import hashlib
+import itertools
+import logging
 import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
 from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
 
-from sqlalchemy import create_engine, inspect
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import Column, DateTime, Enum as SqlEnum, Integer, MetaData, String, Table, bindparam, create_engine, event, func, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.schema import CreateTable
+
+logger = logging.getLogger(__name__)
 
 DEFAULT_DB_URL = "sqlite:///./data/app.db"
-DATABASE_URL = os.getenv("DATABASE_URL", DEFAULT_DB_URL)
 
-connect_args = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
-    db_path = DATABASE_URL.replace("sqlite:///", "", 1)
+# Requests hold their connection while they wait for a threadpool slot, so the pool
+# must cover every request the admission limits let in, not just the thread count.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "80"))
+
+Base = declarative_base()
+
+
+def _async_url(url: str) -> str:
+    for sync_prefix, async_prefix in (
+        ("sqlite://", "sqlite+aiosqlite://"),
+        ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+        ("postgresql://", "postgresql+asyncpg://"),
+    ):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+class DatabaseEngines:
+    """Sync and async engines, and their session factories, for one database URL."""
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+        # create_engine does not connect; the first connection happens during startup.
+        self.engine = create_engine(
+            url,
+            connect_args=connect_args,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+        )
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        # Read-heavy endpoints use the async engine so waiting on the database does not
+        # pin a threadpool thread; writes stay on the sync engine above.
+        self.async_engine = create_async_engine(
+            _async_url(url),
+            # aiosqlite defaults to NullPool for file databases; pool like the sync engine.
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+        )
+        self.AsyncSessionLocal = async_sessionmaker(self.async_engine, autoflush=False, expire_on_commit=False)
+        if url.startswith("sqlite"):
+            # SQLite ignores ON DELETE rules unless every connection opts in; the models rely
+            # on them (passive_deletes) instead of loading children before a delete.
+            event.listen(self.engine, "connect", _enable_sqlite_foreign_keys)
+            event.listen(self.async_engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+
+
+# Set for requests that must not read from a replica (ReadYourWritesMiddleware).
+primary_reads: ContextVar[bool] = ContextVar("primary_reads", default=False)
+
+
+class Shard(DatabaseEngines):
+    """One database holding whole groups, plus the read replicas of it."""
+
+    def __init__(self, name: str, url: str, replica_urls: Sequence[str] = ()) -> None:
+        super().__init__(url)
+        self.name = name
+        self.replicas = [DatabaseEngines(replica_url) for replica_url in replica_urls]
+        self._next_replica = itertools.cycle(self.replicas)
+
+    def reader(self) -> DatabaseEngines:
+        """Round-robin over the replicas; the primary when there are none or reads are pinned."""
+        if not self.replicas or primary_reads.get():
+            return self
+        return next(self._next_replica)
+
+
+def _parse_shards(raw: str) -> Dict[str, str]:
+    """Parse ``"east=sqlite:///./data/east.db,west=postgresql://..."``."""
+    urls: Dict[str, str] = {}
+    for item in raw.split(","):
+        name, _, url = item.strip().partition("=")
+        if name.strip() and url.strip():
+            urls[name.strip()] = url.strip()
+    return urls
+
+
+def _parse_replicas(raw: str) -> Dict[str, List[str]]:
+    """Parse ``"postgresql://r1/app,east=postgresql://r2/app"``; bare URLs replicate the default shard."""
+    urls: Dict[str, List[str]] = {}
+    for item in raw.split(","):
+        item = item.strip()
+        name, _, url = item.partition("=")
+        if not url or "://" in name:
+            name, url = DEFAULT_SHARD, item
+        if url.strip():
+            urls.setdefault(name.strip(), []).append(url.strip())
+    return urls
+
+
+# Each group lives entirely in one shard. The default shard is DATABASE_URL and also
+# holds the group -> shard catalog; DATABASE_SHARDS adds more databases.
+DEFAULT_SHARD = "default"
+# After a write, reads stay on the primary this long; replicas may lag behind it.
+REPLICA_PIN_SECONDS = float(os.getenv("REPLICA_PIN_SECONDS", "5"))
+
+
+def _build_shards() -> Dict[str, Shard]:
+    # Replicas only serve the read endpoints; see get_read_db.
+    replica_urls = _parse_replicas(os.getenv("DATABASE_REPLICAS", ""))
+    urls = {**_parse_shards(os.getenv("DATABASE_SHARDS", "")), DEFAULT_SHARD: os.getenv("DATABASE_URL", DEFAULT_DB_URL)}
+    return {name: Shard(name, url, replica_urls.get(name, ())) for name, url in urls.items()}
+
+
+class ShardRegistry(Mapping[str, Shard]):
+    """Every shard by name, built on first use instead of at import.
+
+    Importing the app (the gunicorn master preloads it) creates no engine; the
+    startup tasks or the first request in each worker do, and the time shows up as
+    the ``engines`` startup phase.
+    """
+
+    def __init__(self) -> None:
+        self._shards: Optional[Dict[str, Shard]] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Shard]:
+        if self._shards is None:
+            with self._lock:
+                if self._shards is None:
+                    self._shards = _build_shards()
+        return self._shards
+
+    @property
+    def loaded(self) -> bool:
+        return self._shards is not None
+
+    def reset(self) -> None:
+        """Dispose and forget the engines; the next use builds new ones."""
+        with self._lock:
+            built, self._shards = self._shards, None
+        for shard in (built or {}).values():
+            for engines in (shard, *shard.replicas):
+                engines.engine.dispose()
+
+    def __getitem__(self, name: str) -> Shard:
+        return self.load()[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.load())
+
+    def __len__(self) -> int:
+        return len(self.load())
+
+
+shards = ShardRegistry()
+
+
+def __getattr__(name: str):
+    # The default shard's engines under their old module-level names, built on access.
+    if name in {"engine", "SessionLocal", "async_engine", "AsyncSessionLocal"}:
+        return getattr(shards[DEFAULT_SHARD], name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _catalog_engine() -> Engine:
+    return shards[DEFAULT_SHARD].engine
+
+
+# Shard of the request being served; ShardRoutingMiddleware sets it from the token.
+current_shard: ContextVar[str] = ContextVar("current_shard", default=DEFAULT_SHARD)
+
+
+def shard_names() -> List[str]:
+    return [DEFAULT_SHARD] + sorted(name for name in shards if name != DEFAULT_SHARD)
+
+
+def get_shard(name: Optional[str] = None) -> Shard:
+    return shards[name or current_shard.get()]
+
+
+@contextmanager
+def use_shard(name: str) -> Iterator[Shard]:
+    token = current_shard.set(name)
+    try:
+        yield shards[name]
+    finally:
+        current_shard.reset(token)
+
+
+def shard_session(name: Optional[str] = None) -> Session:
+    return get_shard(name).SessionLocal()
+
+
+def has_replicas() -> bool:
+    return any(shard.replicas for shard in shards.values())
+
+
+def _all_engines() -> List[DatabaseEngines]:
+    if not shards.loaded:
+        return []
+    return [engines for shard in shards.values() for engines in (shard, *shard.replicas)]
+
+
+def load_engines() -> None:
+    shards.load()
+
+
+def engines_loaded() -> bool:
+    return shards.loaded
+
+
+def dispose_engines() -> None:
+    for engines in _all_engines():
+        engines.engine.dispose()
+
+
+def reset_engines() -> None:
+    """Drop this process's engines (the gunicorn master's, before forking workers)."""
+    shards.reset()
+
+
+async def dispose_async_engines() -> None:
+    for engines in _all_engines():
+        await engines.async_engine.dispose()
+
+
+# Bump when the schema changes in ways the models do not show (triggers, raw DDL).
+SCHEMA_REVISION = 6
+
+# Kept outside Base.metadata so it never takes part in the reset below.
+schema_state = Table(
+    "schema_state",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String, nullable=False),
+)
+# Which shard each group lives in; only in the default shard. It also hands out group
+# ids, which must not clash between shards. Groups missing here live in the default shard.
+# moving_since is set while move_group copies the group; its writes are refused meanwhile.
+group_shards = Table(
+    "group_shards",
+    MetaData(),
+    Column("group_id", Integer, primary_key=True, autoincrement=False),
+    Column("shard", String, nullable=False),
+    Column("moving_since", DateTime, nullable=True),
+)
+
+
+# In-process copy of the catalog: (shard, moving, expiry). This process drops an entry
+# when it changes it; the others see a change once their entry expires (moves are
+# manual and rare, and move_group waits that long before copying).
+GROUP_SHARD_CACHE_SECONDS = float(os.getenv("GROUP_SHARD_CACHE_SECONDS", "60"))
+_group_shard_cache: Dict[int, Tuple[str, bool, float]] = {}
+
+
+def _catalog_entry(group_id: int) -> Tuple[str, bool]:
+    cached = _group_shard_cache.get(group_id)
+    if cached is not None and cached[2] > time.monotonic():
+        return cached[0], cached[1]
+    with _catalog_engine().connect() as connection:
+        row = connection.execute(
+            select(group_shards.c.shard, group_shards.c.moving_since).where(group_shards.c.group_id == group_id)
+        ).first()
+    if row is None or row.shard not in shards:
+        # Not cached: the id may still be handed out, to any shard.
+        return DEFAULT_SHARD, False
+    moving = row.moving_since is not None
+    _group_shard_cache[group_id] = (row.shard, moving, time.monotonic() + GROUP_SHARD_CACHE_SECONDS)
+    return row.shard, moving
+
+
+def shard_for_group(group_id: Optional[int]) -> str:
+    if group_id is None or len(shards) == 1:
+        return DEFAULT_SHARD
+    return _catalog_entry(group_id)[0]
+
+
+def group_is_moving(group_id: Optional[int]) -> bool:
+    if group_id is None or len(shards) == 1:
+        return False
+    return _catalog_entry(group_id)[1]
+
+
+def set_group_moving(group_id: int, moving: bool) -> None:
+    _group_shard_cache.pop(group_id, None)
+    with _catalog_engine().begin() as connection:
+        connection.execute(
+            group_shards.update()
+            .where(group_shards.c.group_id == group_id)
+            .values(moving_since=datetime.utcnow() if moving else None)
+        )
+
+
+def shard_group_counts() -> Dict[str, int]:
+    counts = dict.fromkeys(shard_names(), 0)
+    with _catalog_engine().connect() as connection:
+        for name, count in connection.execute(
+            select(group_shards.c.shard, func.count()).group_by(group_shards.c.shard)
+        ):
+            counts[name] = count
+    return counts
+
+
+def reserve_group_id(shard: str) -> int:
+    """Next group id, recorded in the catalog as living in ``shard``."""
+    while True:
+        with _catalog_engine().connect() as connection:
+            group_id = connection.execute(select(func.max(group_shards.c.group_id))).scalar() or 0
+        # Also past any group the catalog missed (created before it existed).
+        with shards[shard].engine.connect() as connection:
+            group_id = max(group_id, connection.execute(text("SELECT MAX(id) FROM groups")).scalar() or 0) + 1
+        try:
+            with _catalog_engine().begin() as connection:
+                connection.execute(group_shards.insert().values(group_id=group_id, shard=shard))
+            return group_id
+        except IntegrityError:
+            # Another worker took the same id; try the next one.
+            continue
+
+
+def assign_group_shard(group_id: int, shard: str) -> None:
+    _group_shard_cache.pop(group_id, None)
+    with _catalog_engine().begin() as connection:
+        updated = connection.execute(
+            group_shards.update().where(group_shards.c.group_id == group_id).values(shard=shard)
+        ).rowcount
+        if not updated:
+            connection.execute(group_shards.insert().values(group_id=group_id, shard=shard))
+
+
+def release_group_id(group_id: int) -> None:
+    _group_shard_cache.pop(group_id, None)
+    with _catalog_engine().begin() as connection:
+        connection.execute(group_shards.delete().where(group_shards.c.group_id == group_id))
+
+
+def prepare_storage(url: str) -> None:
+    """Create the SQLite parent directory; done at startup rather than at import."""
+    if not url.startswith("sqlite"):
+        return
+    db_path = url.replace("sqlite:///", "", 1)
     if db_path.startswith("./"):
         db_path = db_path[2:]
-    db_file = Path(db_path)
-    db_file.parent.mkdir(parents=True, exist_ok=True)
+    if db_path and db_path != ":memory:":
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
+
+def _metadata_fingerprint() -> str:
+    parts = [str(SCHEMA_REVISION)]
+    for table in sorted(Base.metadata.tables.values(), key=lambda table: table.name):
+        columns = ",".join(sorted(column.name for column in table.columns))
+        indexes = ",".join(sorted(index.name or "" for index in table.indexes))
+        parts.append(f"{table.name}:{columns}:{indexes}")
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def _stored_fingerprint(engine: Engine) -> Optional[str]:
+    try:
+        with engine.connect() as connection:
+            return connection.execute(select(schema_state.c.fingerprint)).scalar()
+    except DBAPIError:
+        return None
+
+
+def _store_fingerprint(engine: Engine, fingerprint: str) -> None:
+    schema_state.create(bind=engine, checkfirst=True)
+    with engine.begin() as connection:
+        connection.execute(schema_state.delete())
+        connection.execute(schema_state.insert().values(id=1, fingerprint=fingerprint))
 
 
 def ensure_schema() -> None:
+    """Create/upgrade every shard; a single query per shard when the models did not change."""
+    from . import models  # noqa: F401  (registers the tables on Base.metadata)
+
+    fingerprint = _metadata_fingerprint()
+    for name in shard_names():
+        shard = shards[name]
+        prepare_storage(shard.url)
+        if _stored_fingerprint(shard.engine) == fingerprint:
+            continue
+
+        _reflect_and_migrate(shard)
+        _store_fingerprint(shard.engine, fingerprint)
+
+
+def _register_groups(shard: Shard) -> None:
+    """Catalog the groups of ``shard`` that predate the catalog (or were restored)."""
+    catalog = _catalog_engine()
+    group_shards.create(bind=catalog, checkfirst=True)
+    if "moving_since" not in {column["name"] for column in inspect(catalog).get_columns("group_shards")}:
+        with catalog.begin() as connection:
+            connection.execute(text("ALTER TABLE group_shards ADD COLUMN moving_since TIMESTAMP"))
+    with shard.engine.connect() as connection:
+        group_ids = set(connection.execute(text("SELECT id FROM groups")).scalars())
+    with catalog.begin() as connection:
+        known = set(connection.execute(select(group_shards.c.group_id)).scalars())
+        missing = sorted(group_ids - known)
+        if missing:
+            connection.execute(
+                group_shards.insert(), [{"group_id": group_id, "shard": shard.name} for group_id in missing]
+            )
+
+
+def _reflect_and_migrate(shard: Shard) -> None:
+    engine = shard.engine
     inspector = inspect(engine)
     tables = set(inspector.get_table_names())
     expected_tables = {"users", "games", "convocations", "presences", "invitations", "groups"}
@@ -67,11 +473,223 @@ def ensure_schema() -> None:
         Base.metadata.drop_all(bind=engine)
 
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns(engine)
+    _rebuild_rekeyed_tables(engine)
+    _enable_sqlite_autoincrement(engine)
+    _add_missing_enum_values(engine)
+    _backfill_search_names(shard.SessionLocal)
+    _create_search_index(engine)
+    _register_groups(shard)
+
+
+# Columns introduced after the reset checks above. They are added in place so
+# existing data survives; new columns must be nullable or carry a server default.
+ADDITIVE_COLUMNS = {
+    "games": {
+        "version": "INTEGER NOT NULL DEFAULT 0",
+        "series_id": "INTEGER REFERENCES game_series(id) ON DELETE SET NULL",
+        "deadline_processed_at": "TIMESTAMP",
+    },
+    "presences": {"promoted_at": "TIMESTAMP"},
+    "users": {"search_name": "VARCHAR"},
+    "idempotency_records": {"request_hash": "VARCHAR", "locked_until": "TIMESTAMP"},
+}
+# Run once, together with the ALTER that adds their column, over the rows that predate it.
+ADDITIVE_BACKFILLS = {
+    # Games already played: their deadlines are history, not work for the scheduler.
+    ("games", "deadline_processed_at"): (
+        "UPDATE games SET deadline_processed_at = convocation_deadline "
+        "WHERE convocation_deadline IS NOT NULL AND scheduled_at < :now"
+    ),
+}
+
+
+def _add_missing_columns(engine: Engine) -> None:
+    inspector = inspect(engine)
+    for table, columns in ADDITIVE_COLUMNS.items():
+        existing = {column["name"] for column in inspector.get_columns(table)}
+        for name, ddl in columns.items():
+            if name in existing:
+                continue
+            with engine.begin() as connection:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+                backfill = ADDITIVE_BACKFILLS.get((table, name))
+                if backfill:
+                    connection.execute(text(backfill), {"now": datetime.utcnow()})
+
+
+def _rebuild_table(engine: Engine, table: Table) -> None:
+    """Recreate ``table`` from its model and copy over the columns both versions share.
+
+    The copy goes into a new table that then takes the old one's name. On SQLite foreign
+    keys are off meanwhile, so dropping the old table does not cascade into its children.
+    """
+    rebuilt = f"{table.name}_rebuild"
+    create = str(CreateTable(table).compile(dialect=engine.dialect)).replace(
+        f"CREATE TABLE {table.name} (", f"CREATE TABLE {rebuilt} (", 1
+    )
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    columns = ", ".join(column.name for column in table.columns if column.name in existing)
+    sqlite = engine.dialect.name == "sqlite"
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        if sqlite:
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        try:
+            connection.exec_driver_sql("BEGIN")
+            connection.exec_driver_sql(create)
+            connection.exec_driver_sql(f"INSERT INTO {rebuilt} ({columns}) SELECT {columns} FROM {table.name}")
+            connection.exec_driver_sql(f"DROP TABLE {table.name}")
+            connection.exec_driver_sql(f"ALTER TABLE {rebuilt} RENAME TO {table.name}")
+            for index in table.indexes:
+                index.create(bind=connection)
+            connection.exec_driver_sql("COMMIT")
+        except Exception:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
+        finally:
+            if sqlite:
+                connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+
+
+def _enable_sqlite_autoincrement(engine: Engine) -> None:
+    """Rebuild tables declared ``sqlite_autoincrement`` after they were created without it.
+
+    SQLite cannot add AUTOINCREMENT in place.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    for table in Base.metadata.sorted_tables:
+        if not table.dialect_options["sqlite"]["autoincrement"]:
+            continue
+        with engine.connect() as connection:
+            ddl = connection.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table.name}
+            ).scalar()
+        if ddl is None or "AUTOINCREMENT" in ddl.upper():
+            continue
+        _rebuild_table(engine, table)
+        logger.info("Rebuilt table %s with AUTOINCREMENT ids", table.name)
+
+
+# Tables whose primary key changed, with the column they gained; rebuilt while it is missing.
+REKEYED_TABLES = {
+    # Was keyed on (game_id, user_id); user_id became nullable to outlive deleted accounts.
+    "archived_attendance": "id",
+}
+
+
+def _rebuild_rekeyed_tables(engine: Engine) -> None:
+    inspector = inspect(engine)
+    for name, column in REKEYED_TABLES.items():
+        if column in {existing["name"] for existing in inspector.get_columns(name)}:
+            continue
+        _rebuild_table(engine, Base.metadata.tables[name])
+        logger.info("Rebuilt table %s with its new primary key", name)
 
 
 def get_db():
-    db = SessionLocal()
+    db = get_shard().SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def _add_missing_enum_values(engine: Engine) -> None:
+    """Native enums (PostgreSQL) do not pick up new members from create_all."""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for table in Base.metadata.tables.values():
+            for column in table.columns:
+                if not isinstance(column.type, SqlEnum) or not column.type.native_enum:
+                    continue
+                for value in column.type.enums:
+                    connection.execute(
+                        text(f"ALTER TYPE {column.type.name} ADD VALUE IF NOT EXISTS '{value}'")
+                    )
+
+
+def _backfill_search_names(session_factory: sessionmaker, batch_size: int = 1000) -> None:
+    from .models import User, normalize_search_text
+
+    users = User.__table__
+    fill = (
+        users.update()
+        .where(users.c.id == bindparam("user_id"))
+        .values(search_name=bindparam("search_name"))
+    )
+    with session_factory() as db:
+        while True:
+            rows = (
+                db.query(User.id, User.name, User.email)
+                .filter(User.search_name.is_(None))
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                return
+            # One executemany per batch rather than one UPDATE round trip per user.
+            db.execute(
+                fill,
+                [
+                    {"user_id": user_id, "search_name": normalize_search_text(name, email)}
+                    for user_id, name, email in rows
+                ],
+            )
+            db.commit()
+
+
+# Substring search over users.search_name. On SQLite an external-content FTS5 table
+# with the trigram tokenizer, kept in step by triggers and rebuilt on every
+# migration (a reset drops users underneath it).
+SQLITE_SEARCH_DDL = (
+    "DROP TABLE IF EXISTS users_search",
+    "CREATE VIRTUAL TABLE users_search USING fts5("
+    "search_name, content='users', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS users_search_ai AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_search(rowid, search_name) VALUES (new.id, new.search_name); END",
+    "CREATE TRIGGER IF NOT EXISTS users_search_ad AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_search(users_search, rowid, search_name) VALUES ('delete', old.id, old.search_name); END",
+    "CREATE TRIGGER IF NOT EXISTS users_search_au AFTER UPDATE OF search_name ON users BEGIN "
+    "INSERT INTO users_search(users_search, rowid, search_name) VALUES ('delete', old.id, old.search_name); "
+    "INSERT INTO users_search(rowid, search_name) VALUES (new.id, new.search_name); END",
+    "INSERT INTO users_search(users_search) VALUES ('rebuild')",
+)
+POSTGRES_SEARCH_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_users_search_name_trgm ON users USING gin (search_name gin_trgm_ops)",
+)
+
+
+def _create_search_index(engine: Engine) -> None:
+    statements = SQLITE_SEARCH_DDL if engine.dialect.name == "sqlite" else POSTGRES_SEARCH_DDL
+    try:
+        with engine.begin() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+    except SQLAlchemyError:
+        if engine.dialect.name == "sqlite":
+            raise
+        # pg_trgm needs CREATE privileges; without it search still works, unindexed.
+        logger.warning("Could not create the pg_trgm index for member search", exc_info=True)
+
+
+async def get_async_db():
+    async with get_shard().AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db():
+    """Session for read-only endpoints: a replica when configured, else the primary."""
+    db = get_shard().reader().SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    async with get_shard().reader().AsyncSessionLocal() as db:
+        yield db
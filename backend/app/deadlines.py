@@ -0,0 +1,133 @@
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from . import crud
+from .config import get_settings
+from .database import current_shard, shard_names, shard_session
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineScheduler:
+    """Fires ``crud.process_convocation_deadline`` when each game's deadline passes.
+
+    Upcoming deadlines sit in a heap that is rebuilt from the database at start and
+    every ``DEADLINE_RESYNC_SECONDS`` (picking up games created by other workers or
+    whose deadline changed); new games are pushed directly. Entries carry the game's
+    shard. Every worker runs one; processing claims the game in the database, so a
+    deadline fires once.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[datetime, str, int]] = []
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._resync_due = 0.0
+
+    @property
+    def resync_seconds(self) -> int:
+        return get_settings().deadline_resync_seconds
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._resync_due = 0.0
+        self._thread = threading.Thread(target=self._run, name="deadline-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        thread.join(timeout=5)
+        self._thread = None
+
+    def schedule(self, game_id: int, deadline: Optional[datetime]) -> None:
+        """Called from request handlers, so the game is in the current shard."""
+        if deadline is None or self._thread is None:
+            return
+        with self._condition:
+            heapq.heappush(self._heap, (deadline, current_shard.get(), game_id))
+            self._condition.notify()
+
+    def resync(self) -> None:
+        """Reload the heap from the database on the next tick."""
+        with self._condition:
+            self._resync_due = 0.0
+            self._condition.notify()
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._heap)
+
+    def _reload(self) -> None:
+        # Only deadlines before the next resync are kept; later ones load then.
+        horizon = datetime.utcnow() + timedelta(seconds=self.resync_seconds * 2)
+        entries: List[Tuple[datetime, str, int]] = []
+        for shard in shard_names():
+            with shard_session(shard) as db:
+                entries.extend((deadline, shard, game_id) for deadline, game_id in crud.pending_deadlines(db, horizon))
+        heapq.heapify(entries)
+        with self._condition:
+            self._heap = entries
+            self._resync_due = time.monotonic() + self.resync_seconds
+
+    def _pop_due(self) -> List[Tuple[str, int]]:
+        now = datetime.utcnow()
+        due: List[Tuple[str, int]] = []
+        with self._condition:
+            while self._heap and self._heap[0][0] <= now:
+                _, shard, game_id = heapq.heappop(self._heap)
+                if (shard, game_id) not in due:
+                    due.append((shard, game_id))
+        return due
+
+    def _process(self, shard: str, game_id: int) -> None:
+        try:
+            with shard_session(shard) as db:
+                promoted = crud.process_convocation_deadline(db, game_id)
+            if promoted:
+                logger.info("Deadline of game %s (shard %s) promoted %s player(s)", game_id, shard, len(promoted))
+        except Exception:
+            logger.exception("Failed to process the convocation deadline of game %s (shard %s)", game_id, shard)
+
+    def _wait_seconds(self) -> float:
+        wait = self._resync_due - time.monotonic()
+        if self._heap:
+            until_next = (self._heap[0][0] - datetime.utcnow()).total_seconds()
+            wait = min(wait, until_next)
+        return max(wait, 0.0)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if self._stopping:
+                    return
+                resync_needed = time.monotonic() >= self._resync_due
+            if resync_needed:
+                try:
+                    self._reload()
+                except Exception:
+                    logger.exception("Failed to load upcoming convocation deadlines")
+                    with self._condition:
+                        self._resync_due = time.monotonic() + self.resync_seconds
+
+            for shard, game_id in self._pop_due():
+                self._process(shard, game_id)
+
+            with self._condition:
+                if self._stopping:
+                    return
+                self._condition.wait(timeout=self._wait_seconds())
+
+
+deadline_scheduler = DeadlineScheduler()
@@ -1,37 +1,80 @@
 import logging
 import smtplib
+from contextlib import contextmanager
+from datetime import datetime
 from email.message import EmailMessage
-from typing import Optional
+from typing import Iterator, List, Optional, Tuple
 
-from .config import settings
+from .config import get_settings
 
 logger = logging.getLogger(__name__)
 
 
-def send_email(subject: str, to_email: str, body: str) -> None:
-    if not settings.smtp_host or not settings.email_from:
-        logger.warning("SMTP settings not configured; skipping email to %s", to_email)
-        return
+def email_configured() -> bool:
+    settings = get_settings()
+    return bool(settings.smtp_host and settings.email_from)
+
 
+@contextmanager
+def _smtp_connection() -> Iterator[smtplib.SMTP]:
+    settings = get_settings()
+    with smtplib.SMTP(settings.smtp_host, settings.smtp_port) as server:
+        if settings.smtp_starttls:
+            server.starttls()
+        if settings.smtp_user and settings.smtp_password:
+            server.login(settings.smtp_user, settings.smtp_password)
+        yield server
+
+
+def _build_message(subject: str, to_email: str, body: str) -> EmailMessage:
     message = EmailMessage()
     message["Subject"] = subject
-    message["From"] = settings.email_from
+    message["From"] = get_settings().email_from
     message["To"] = to_email
     message.set_content(body)
+    return message
+
+
+def send_email(subject: str, to_email: str, body: str) -> None:
+    if not email_configured():
+        logger.warning("SMTP settings not configured; skipping email to %s", to_email)
+        return
 
     try:
-        with smtplib.SMTP(settings.smtp_host, settings.smtp_port) as server:
-            if settings.smtp_starttls:
-                server.starttls()
-            if settings.smtp_user and settings.smtp_password:
-                server.login(settings.smtp_user, settings.smtp_password)
-            server.send_message(message)
+        with _smtp_connection() as server:
+            server.send_message(_build_message(subject, to_email, body))
     except Exception as exc:  # pylint: disable=broad-except
         logger.error("Failed to send email to %s: %s", to_email, exc)
 
 
+def send_bulk_email(messages: List[Tuple[str, str, str]]) -> List[int]:
+    """Send ``(subject, to_email, body)`` messages over a single SMTP connection.
+
+    Returns the indexes of the messages the server accepted.
+    """
+    if not messages:
+        return []
+    if not email_configured():
+        logger.warning("SMTP settings not configured; skipping %s emails", len(messages))
+        return []
+
+    sent: List[int] = []
+    try:
+        with _smtp_connection() as server:
+            for index, (subject, to_email, body) in enumerate(messages):
+                try:
+                    server.send_message(_build_message(subject, to_email, body))
+                except smtplib.SMTPRecipientsRefused as exc:
+                    logger.error("Failed to send email to %s: %s", to_email, exc)
+                    continue
+                sent.append(index)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.error("Failed to send email batch (%s of %s sent): %s", len(sent), len(messages), exc)
+    return sent
+
+
 def build_confirmation_body(token: str) -> str:
-    confirm_link = f"{settings.frontend_base_url.rstrip('/')}/confirm-account?token={token}"
+    confirm_link = f"{get_settings().frontend_base_url.rstrip('/')}/confirm-account?token={token}"
     return (
         "Olá!\n\n"
         "Recebemos um pedido de criação de conta para este e-mail. "
@@ -42,7 +85,7 @@ def build_confirmation_body(token: str) -> str:
 
 
 def build_reset_body(token: str) -> str:
-    reset_link = f"{settings.frontend_base_url.rstrip('/')}/reset-password?token={token}"
+    reset_link = f"{get_settings().frontend_base_url.rstrip('/')}/reset-password?token={token}"
     return (
         "Olá!\n\n"
         "Recebemos um pedido para redefinir sua senha. "
@@ -53,7 +96,7 @@ def build_reset_body(token: str) -> str:
 
 
 def build_invitation_body(name: str, token: str, expires_at: Optional[str] = None) -> str:
-    register_link = f"{settings.frontend_base_url.rstrip('/')}/register?token={token}"
+    register_link = f"{get_settings().frontend_base_url.rstrip('/')}/register?token={token}"
     expiry_notice = (
         f"Este link expira em {expires_at}.\n\n"
         if expires_at
@@ -73,6 +116,30 @@ def build_invitation_body(name: str, token: str, expires_at: Optional[str] = Non
     return body
 
 
+def _game_link(game_id: int) -> str:
+    return f"{get_settings().frontend_base_url.rstrip('/')}/games/{game_id}"
+
+
+def build_deadline_reminder_body(name: str, game_name: str, game_id: int, deadline: datetime) -> str:
+    return (
+        f"Olá, {name}!\n\n"
+        f"Você foi convocado para \"{game_name}\" e ainda não respondeu. "
+        f"O prazo para confirmar termina em {deadline.strftime('%d/%m/%Y %H:%M')} (UTC); "
+        "depois disso sua vaga é liberada para os avulsos.\n\n"
+        f"Confirme ou recuse aqui: {_game_link(game_id)}"
+    )
+
+
+def build_kickoff_reminder_body(
+    name: str, game_name: str, game_id: int, location: str, scheduled_at: datetime
+) -> str:
+    return (
+        f"Olá, {name}!\n\n"
+        f"Lembrete: \"{game_name}\" começa em {scheduled_at.strftime('%d/%m/%Y %H:%M')} (UTC), em {location}.\n\n"
+        f"Se não puder ir, avise pelo app para liberar a vaga: {_game_link(game_id)}"
+    )
+
+
 def send_confirmation_email(to_email: str, token: str) -> None:
     send_email("Confirme sua conta", to_email, build_confirmation_body(token))
 
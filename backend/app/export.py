@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Iterator, List, Sequence
+
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import Select
+
+from .database import DatabaseEngines
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _encode(rows: Sequence[Row], columns: List[str], export_format: str) -> bytes:
+    if export_format == "ndjson":
+        return "".join(
+            json.dumps(dict(zip(columns, map(_plain, row))), ensure_ascii=False) + "\n" for row in rows
+        ).encode()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(
+            ("true" if value else "false") if isinstance(value, bool) else _plain(value) for value in row
+        )
+    return buffer.getvalue().encode()
+
+
+def stream_rows(
+    engines: DatabaseEngines,
+    queries: Sequence[Select],
+    export_format: str,
+    batch_size: int,
+) -> Iterator[bytes]:
+    """Yield the rows of ``queries``, one chunk per fetched batch.
+
+    Runs in its own session (the request's is closed before the body is sent) and
+    fetches through ``yield_per``, so memory stays at one batch whatever the size of
+    the history. Starlette iterates a sync generator in the threadpool, one chunk at
+    a time, so a long export never holds the event loop.
+    """
+    with engines.SessionLocal() as db:
+        if engines.engine.dialect.name != "sqlite":
+            # One snapshot for every query: the archiver may move games in between.
+            db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        header_sent = False
+        for query in queries:
+            result = db.execute(query.execution_options(yield_per=batch_size))
+            columns = list(result.keys())
+            if export_format == "csv" and not header_sent:
+                # The BOM lets spreadsheet apps detect UTF-8 (accented names).
+                yield "\ufeff".encode() + _encode([columns], columns, "csv")
+                header_sent = True
+            for rows in result.partitions():
+                yield _encode(rows, columns, export_format)
@@ -0,0 +1,233 @@
+import hashlib
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import models
+from .config import get_settings
+from .database import current_shard, shard_session
+from .security import decode_user_id
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+PURGE_INTERVAL_SECONDS = 60
+
+# Mutating game endpoints whose retries must not re-run the roster query chain.
+IDEMPOTENT_ROUTES = re.compile(
+    r"^(POST /games|POST /games/\d+/(join|confirm|decline|convocations)"
+    r"|DELETE /games/\d+(/presences/\d+)?)$"
+)
+
+# Per shard: each one keeps its own records.
+_last_purge: Dict[str, float] = {}
+
+
+def _purge_expired(db: Session, shard: str) -> None:
+    now = time.monotonic()
+    if now - _last_purge.get(shard, 0.0) < PURGE_INTERVAL_SECONDS:
+        return
+    _last_purge[shard] = now
+    db.query(models.IdempotencyRecord).filter(
+        models.IdempotencyRecord.expires_at < datetime.utcnow()
+    ).delete(synchronize_session=False)
+
+
+def request_hash(method: str, path: str, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _find(db: Session, scope: str, key: str) -> Optional[models.IdempotencyRecord]:
+    return (
+        db.query(models.IdempotencyRecord)
+        .filter(models.IdempotencyRecord.scope == scope, models.IdempotencyRecord.key == key)
+        .first()
+    )
+
+
+def _take_over(db: Session, record: models.IdempotencyRecord, lease: timedelta) -> bool:
+    """Claim a record whose owner let its lease run out; only one retry wins."""
+    taken = (
+        db.query(models.IdempotencyRecord)
+        .filter(
+            models.IdempotencyRecord.id == record.id,
+            models.IdempotencyRecord.status_code.is_(None),
+            models.IdempotencyRecord.locked_until == record.locked_until,
+        )
+        .update({models.IdempotencyRecord.locked_until: datetime.utcnow() + lease}, synchronize_session=False)
+    )
+    db.commit()
+    return taken == 1
+
+
+def claim(shard: str, scope: str, key: str, body_hash: str) -> Optional[models.IdempotencyRecord]:
+    """Reserve ``key`` for this request.
+
+    Returns ``None`` when the caller owns the key and must run the request, or the
+    existing record (completed, still in flight, or sent with another body) otherwise.
+    A record left in flight past its lease (``IDEMPOTENCY_LEASE_SECONDS``) belongs to
+    a worker that died; the next retry takes it over.
+    """
+    settings = get_settings()
+    lease = timedelta(seconds=settings.idempotency_lease_seconds)
+    with shard_session(shard) as db:
+        _purge_expired(db, shard)
+        record = _find(db, scope, key)
+        now = datetime.utcnow()
+        if record and record.expires_at >= now:
+            if (
+                record.status_code is None
+                and record.request_hash in (None, body_hash)
+                and (record.locked_until is None or record.locked_until < now)
+                and _take_over(db, record, lease)
+            ):
+                return None
+            db.expunge(record)
+            db.commit()
+            return record
+        if record:
+            db.delete(record)
+            db.flush()
+
+        db.add(
+            models.IdempotencyRecord(
+                scope=scope,
+                key=key,
+                request_hash=body_hash,
+                locked_until=now + lease,
+                expires_at=now + timedelta(hours=settings.idempotency_ttl_hours),
+            )
+        )
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker claimed the same key between our SELECT and INSERT.
+            db.rollback()
+            record = _find(db, scope, key)
+            if record:
+                db.expunge(record)
+            return record
+    return None
+
+
+def complete(
+    shard: str, scope: str, key: str, status_code: int, content_type: Optional[str], body: bytes
+) -> None:
+    with shard_session(shard) as db:
+        query = db.query(models.IdempotencyRecord).filter(
+            models.IdempotencyRecord.scope == scope,
+            models.IdempotencyRecord.key == key,
+        )
+        if status_code >= 500:
+            # Server errors are not final; let the client retry for real.
+            query.delete(synchronize_session=False)
+        else:
+            query.update(
+                {
+                    models.IdempotencyRecord.status_code: status_code,
+                    models.IdempotencyRecord.content_type: content_type,
+                    models.IdempotencyRecord.body: body.decode("utf-8", errors="replace"),
+                    models.IdempotencyRecord.locked_until: None,
+                },
+                synchronize_session=False,
+            )
+        db.commit()
+
+
+def _replay(record: models.IdempotencyRecord, body_hash: str) -> Response:
+    if record.request_hash is not None and record.request_hash != body_hash:
+        return JSONResponse(
+            {"detail": "Idempotency-Key já usada em uma requisição diferente."},
+            status_code=422,
+        )
+    if record.status_code is None:
+        return JSONResponse(
+            {"detail": "Requisição com esta Idempotency-Key ainda está em processamento."},
+            status_code=409,
+        )
+    headers = {"Idempotency-Replayed": "true"}
+    if record.content_type:
+        headers["Content-Type"] = record.content_type
+    return Response(content=record.body or b"", status_code=record.status_code, headers=headers)
+
+
+class IdempotencyMiddleware:
+    """Replays the stored response for a repeated ``Idempotency-Key``.
+
+    Replays are answered from ``idempotency_records`` alone, without touching the
+    game tables. Keys are scoped per user, method and path, and expire after
+    ``IDEMPOTENCY_TTL_HOURS``; the same key with another body is refused with 422.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not IDEMPOTENT_ROUTES.match(f"{scope['method']} {scope['path']}"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_HEADER)
+        authorization = headers.get("authorization", "")
+        user_id = decode_user_id(authorization[7:]) if authorization.lower().startswith("bearer ") else None
+        if not key or user_id is None:
+            # Without a key (or a valid token) the request runs normally.
+            await self.app(scope, receive, send)
+            return
+
+        if len(key) > MAX_KEY_LENGTH:
+            response = JSONResponse({"detail": "Idempotency-Key muito longa"}, status_code=400)
+            await response(scope, receive, send)
+            return
+
+        # The body is needed for the hash before the route reads it; these are small JSON bodies.
+        messages: List[Message] = []
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request" or not message.get("more_body", False):
+                break
+        body_hash = request_hash(
+            scope["method"], scope["path"], b"".join(message.get("body", b"") for message in messages)
+        )
+
+        async def replay_receive() -> Message:
+            return messages.pop(0) if messages else await receive()
+
+        record_scope = f"{user_id}:{scope['method']}:{scope['path']}"
+        # User ids are per shard, and so are the records.
+        shard = current_shard.get()
+        existing = await run_in_threadpool(claim, shard, record_scope, key, body_hash)
+        if existing is not None:
+            await _replay(existing, body_hash)(scope, receive, send)
+            return
+
+        status_code = 500
+        content_type: Optional[str] = None
+        body = bytearray()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, content_type
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = Headers(raw=message["headers"]).get("content-type")
+            elif message["type"] == "http.response.body":
+                body.extend(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, send_wrapper)
+        finally:
+            await run_in_threadpool(complete, shard, record_scope, key, status_code, content_type, bytes(body))
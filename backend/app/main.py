@@ -1,34 +1,52 @@
+import json
 import logging
 import os
+import time
 import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
+import anyio
 from fastapi import (
     BackgroundTasks,
     Depends,
     FastAPI,
     File,
     HTTPException,
+    Query,
+    Request,
     Response,
     UploadFile,
     status,
 )
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-
-from . import crud, email_utils, models, schemas, security
-from .config import settings
-from .database import SessionLocal, ensure_schema, get_db
-
-ensure_schema()
+from starlette.concurrency import run_in_threadpool
+
+from . import crud, email_utils, export, models, schemas, security, sharding
+from .admission import AdmissionMiddleware, admission
+from .compression import CompressionMiddleware
+from .idempotency import IdempotencyMiddleware
+from .replicas import READ_PRIMARY_HEADER, ReadYourWritesMiddleware
+from .config import get_settings
+from .database import dispose_async_engines, engines_loaded, get_async_read_db, get_db, get_read_db, get_shard, load_engines, shard_for_group, shard_session
+from .deadlines import deadline_scheduler
+from .reminders import reminder_service
+from .snapshot_cache import game_snapshots, group_directory, snapshot_key
+from .startup import StartupReport, run_startup_tasks
+
+startup_report = StartupReport()
 
 logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def _parse_origins() -> List[str]:
@@ -55,8 +73,39 @@ def _origin_regex() -> str:
     )
 
 
-app = FastAPI(title="Footy Friends", version="0.3.0")
-
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with startup_report.phase("threadpool"):
+        anyio.to_thread.current_default_thread_limiter().total_tokens = get_settings().threadpool_size
+    with startup_report.phase("storage"):
+        UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    if not engines_loaded():
+        # Each gunicorn worker builds its own; the master dropped its engines before forking.
+        with startup_report.phase("engines"):
+            load_engines()
+    # No-op under gunicorn, where the master already ran them before forking.
+    await run_in_threadpool(run_startup_tasks, startup_report, defer_admin=True)
+    settings = get_settings()
+    if settings.deadline_scheduler_enabled:
+        deadline_scheduler.start()
+    if settings.reminders_enabled:
+        reminder_service.start()
+    startup_report.log()
+    yield
+    reminder_service.stop()
+    deadline_scheduler.stop()
+    await dispose_async_engines()
+
+
+app = FastAPI(title="Footy Friends", version="0.3.0", lifespan=lifespan)
+
+# Inside admission control: claiming a key is a write and waits for the write gate.
+app.add_middleware(IdempotencyMiddleware)
+# Inside CORS so shed requests still get CORS headers the browser can read.
+app.add_middleware(AdmissionMiddleware)
+# Outside idempotency, whose records live in the caller's shard.
+app.add_middleware(sharding.ShardRoutingMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=_parse_origins(),
@@ -64,39 +113,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # The frontend echoes it back to read its own writes (see replicas.py).
+    expose_headers=[READ_PRIMARY_HEADER, "Content-Disposition"],
 )
+app.add_middleware(CompressionMiddleware)
 
-app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
+# The directory is created during lifespan startup, not at import.
+app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR), check_dir=False), name="uploads")
 
 
-@app.on_event("startup")
-def ensure_default_admin() -> None:
-    if not settings.admin_default_user:
-        return
+# Operational details: superadmins only.
+@app.get("/health/startup", response_model=schemas.StartupReportResponse)
+def read_startup_report(_: models.User = Depends(security.require_superadmin)):
+    return schemas.StartupReportResponse(
+        total_ms=startup_report.total_ms, phases=startup_report.phases, failed=startup_report.failed
+    )
 
-    parts = [value.strip() for value in settings.admin_default_user.split(",")]
-    if len(parts) != 3:
-        logger.warning(
-            "ADMIN_DEFAULT_USER should follow 'Name,email,password'. Skipping creation."
-        )
-        return
-
-    name, email, password = parts
-    with SessionLocal() as db:
-        existing = crud.get_user_by_email(db, email)
-        if existing:
-            if existing.role != models.UserRole.SUPERADMIN:
-                existing.role = models.UserRole.SUPERADMIN
-                db.commit()
-                logger.info("Promoted existing user '%s' to superadmin", email)
-            return
-        group = crud.get_group_by_name(db, name) or crud.create_group(
-            db,
-            schemas.GroupCreate(name=name, description=f"Grupo padrão para {name}"),
-        )
-        user_schema = schemas.UserCreate(name=name, email=email, password=password, group_id=group.id)
-        crud.create_user(db, user_schema, role=models.UserRole.SUPERADMIN, is_active=True)
-        logger.info("Created default superadmin user '%s'", email)
+
+@app.get("/health/admission", response_model=Dict[str, schemas.AdmissionGateStatus])
+def read_admission_occupancy(_: models.User = Depends(security.require_superadmin)):
+    return admission.occupancy()
 
 
 # Auth routes
@@ -106,37 +142,41 @@ def ensure_default_admin() -> None:
 def register(
     user: schemas.UserCreate,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
 ):
-    new_user, token = crud.create_pending_user(db, user)
-    background_tasks.add_task(email_utils.send_confirmation_email, new_user.email, token)
+    shard = shard_for_group(user.group_id)
+    sharding.ensure_group_writable(user.group_id)
+    if sharding.email_registered_elsewhere(user.email, shard):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
+    with shard_session(shard) as db:
+        new_user, token = crud.create_pending_user(db, user)
+        background_tasks.add_task(email_utils.send_confirmation_email, new_user.email, token)
     return schemas.MessageResponse(message="Cadastro realizado! Verifique seu e-mail para confirmar a conta.")
 
 
 @app.post("/auth/login", response_model=schemas.TokenResponse)
-def login(
-    form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
-):
-    user = crud.authenticate_user(db, form_data.username, form_data.password)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
+def login(form_data: OAuth2PasswordRequestForm = Depends()):
+    shard = sharding.shard_of_email(form_data.username)
+    with shard_session(shard) as db:
+        user = crud.authenticate_user(db, form_data.username, form_data.password)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
 
-    if not user.is_active:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Conta não confirmada. Verifique seu e-mail.")
+        if not user.is_active:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Conta não confirmada. Verifique seu e-mail.")
 
-    access_token = security.create_access_token({"sub": str(user.id)})
+        access_token = security.create_user_token(user, shard)
     return schemas.TokenResponse(access_token=access_token)
 
 
 @app.get("/auth/me", response_model=schemas.UserResponse)
-def read_current_user(current_user: models.User = Depends(security.get_current_user)):
+async def read_current_user(current_user: models.User = Depends(security.get_current_user_async)):
     return current_user
 
 
 @app.get("/auth/confirm", response_model=schemas.MessageResponse)
-def confirm_account(token: str, db: Session = Depends(get_db)):
-    _, confirmed_now = crud.confirm_user(db, token)
+def confirm_account(token: str):
+    with shard_session(sharding.shard_of_confirmation_token(token)) as db:
+        _, confirmed_now = crud.confirm_user(db, token)
     message = (
         "Conta confirmada com sucesso! Você já pode fazer login."
         if confirmed_now
@@ -149,70 +189,71 @@ def confirm_account(token: str, db: Session = Depends(get_db)):
 def forgot_password(
     request: schemas.ForgotPasswordRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
 ):
-    user = crud.get_user_by_email(db, request.email.lower())
-    if user:
-        token = crud.generate_reset_token(db, user)
-        background_tasks.add_task(email_utils.send_reset_email, user.email, token)
+    email = request.email.lower()
+    with shard_session(sharding.shard_of_email(email)) as db:
+        user = crud.get_user_by_email(db, email)
+        if user:
+            sharding.ensure_group_writable(user.group_id)
+            token = crud.generate_reset_token(db, user)
+            background_tasks.add_task(email_utils.send_reset_email, user.email, token)
     return schemas.MessageResponse(message="Se o e-mail estiver cadastrado, enviaremos instruções para redefinir a senha.")
 
 
 @app.post("/auth/reset-password", response_model=schemas.MessageResponse)
-def reset_password(
-    payload: schemas.ResetPasswordRequest,
-    db: Session = Depends(get_db),
-):
-    crud.reset_password(db, payload.token, payload.new_password)
+def reset_password(payload: schemas.ResetPasswordRequest):
+    with shard_session(sharding.shard_of_reset_token(payload.token)) as db:
+        crud.reset_password(db, payload.token, payload.new_password)
     return schemas.MessageResponse(message="Senha atualizada com sucesso!")
 
 
 @app.get("/auth/invitations/{token}", response_model=schemas.InvitationTokenInfo)
-def get_invitation(token: str, db: Session = Depends(get_db)):
-    invitation = crud.get_active_invitation(db, token)
-    return schemas.InvitationTokenInfo(
-        name=invitation.name,
-        email=invitation.email,
-        expires_at=invitation.expires_at,
-        group_id=invitation.group_id,
-        group_name=invitation.group.name if invitation.group else "",
-        group_description=invitation.group.description if invitation.group else None,
-        role=invitation.role,
-    )
+def get_invitation(token: str):
+    with shard_session(sharding.shard_of_invitation(token)) as db:
+        invitation = crud.get_active_invitation(db, token)
+        return schemas.InvitationTokenInfo(
+            name=invitation.name,
+            email=invitation.email,
+            expires_at=invitation.expires_at,
+            group_id=invitation.group_id,
+            group_name=invitation.group.name if invitation.group else "",
+            group_description=invitation.group.description if invitation.group else None,
+            role=invitation.role,
+        )
 
 
 @app.post("/auth/register-invited", response_model=schemas.MessageResponse, status_code=status.HTTP_201_CREATED)
-def register_invited(
-    payload: schemas.InvitedRegisterRequest,
-    db: Session = Depends(get_db),
-):
-    invitation = crud.get_active_invitation(db, payload.token)
-
-    if invitation.role == models.UserRole.SUPERADMIN:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Convites de superadmin não podem ser concluídos pela interface pública")
-
-    if crud.get_user_by_email(db, invitation.email):
-        invitation.status = models.InvitationStatus.EXPIRED
-        db.commit()
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="E-mail já cadastrado")
-
-    if not invitation.group_id:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Convite sem grupo associado")
-
-    user_data = schemas.UserCreate(
-        name=invitation.name,
-        email=invitation.email,
-        password=payload.password,
-        group_id=invitation.group_id,
-    )
-    new_user = crud.create_user(
-        db,
-        user_data,
-        role=invitation.role,
-        is_active=True,
-        preferred_position=payload.preferred_position,
-    )
-    crud.mark_invitation_accepted(db, invitation, new_user)
+def register_invited(payload: schemas.InvitedRegisterRequest):
+    shard = sharding.shard_of_invitation(payload.token)
+    with shard_session(shard) as db:
+        invitation = crud.get_active_invitation(db, payload.token)
+        sharding.ensure_group_writable(invitation.group_id)
+
+        if invitation.role == models.UserRole.SUPERADMIN:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Convites de superadmin não podem ser concluídos pela interface pública")
+
+        if crud.get_user_by_email(db, invitation.email) or sharding.email_registered_elsewhere(invitation.email, shard):
+            invitation.status = models.InvitationStatus.EXPIRED
+            db.commit()
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="E-mail já cadastrado")
+
+        if not invitation.group_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Convite sem grupo associado")
+
+        user_data = schemas.UserCreate(
+            name=invitation.name,
+            email=invitation.email,
+            password=payload.password,
+            group_id=invitation.group_id,
+        )
+        new_user = crud.create_user(
+            db,
+            user_data,
+            role=invitation.role,
+            is_active=True,
+            preferred_position=payload.preferred_position,
+        )
+        crud.mark_invitation_accepted(db, invitation, new_user)
     return schemas.MessageResponse(message="Cadastro concluído! Você já pode fazer login.")
 
 
@@ -240,34 +281,120 @@ async def upload_profile_photo(
     return schemas.UserResponse.from_orm(updated_user)
 
 
+@app.get("/users/me/games", response_model=List[schemas.MyGameStatus])
+async def list_my_games(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(security.get_current_user_async),
+):
+    if current_user.group_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário não vinculado a grupo")
+    rows = await crud.list_my_games_async(db, current_user)
+    return [schemas.MyGameStatus.from_orm(row) for row in rows]
+
+
 # User routes
 
 
 @app.get("/users", response_model=List[schemas.UserPublic])
-def list_users(db: Session = Depends(get_db), current_user: models.User = Depends(security.require_admin)):
+def list_users(db: Session = Depends(get_read_db), current_user: models.User = Depends(security.require_admin)):
     if current_user.group_id is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Administrador não vinculado a grupo")
     users = crud.list_users(db, group_id=current_user.group_id)
     return [schemas.UserPublic.from_orm(user) for user in users]
 
 
+@app.get("/users/search", response_model=schemas.UserSearchPage)
+def search_users(
+    q: str = Query("", max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(security.require_admin),
+):
+    if current_user.group_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Administrador não vinculado a grupo")
+    users, next_offset = crud.search_users(db, current_user.group_id, q, limit=limit, offset=offset)
+    return schemas.UserSearchPage(
+        items=[schemas.UserPublic.from_orm(user) for user in users],
+        next_offset=next_offset,
+    )
+
+
+@app.get("/users/{user_id}/stats", response_model=List[schemas.PlayerStatsResponse])
+def get_user_stats(
+    user_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(security.get_current_user),
+):
+    if user_id != current_user.id:
+        user = crud.get_user_by_id(db, user_id)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
+        if user.group_id != current_user.group_id:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Usuário pertence a outro grupo")
+    return [schemas.PlayerStatsResponse.from_orm(stats) for stats in crud.get_player_stats(db, user_id)]
+
+
+@app.get("/stats/leaderboard", response_model=List[schemas.LeaderboardEntry])
+def get_leaderboard(
+    season: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(security.get_current_user),
+):
+    if current_user.group_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário não vinculado a grupo")
+    season = season or datetime.utcnow().year
+    entries = crud.get_leaderboard(db, current_user.group_id, season, limit)
+    return [schemas.LeaderboardEntry.from_orm(entry) for entry in entries]
+
+
 # Group routes
 
 
 @app.get("/groups", response_model=List[schemas.GroupResponse])
-def list_groups(db: Session = Depends(get_db)):
-    groups = crud.list_groups(db)
-    return [schemas.GroupResponse.from_orm(group) for group in groups]
+async def list_groups(
+    request: Request,
+    q: Optional[str] = Query(None, max_length=100),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+):
+    max_age = get_settings().group_directory_max_age
+    # Creating or deleting a group clears this worker's cache; the time bucket bounds
+    # how long other workers (and HTTP caches, via max-age) serve the old list.
+    key = ("groups", q or "", limit, offset, int(time.time() // max_age))
+
+    async def build() -> bytes:
+        groups = await sharding.list_groups_async(query_text=q, limit=limit, offset=offset)
+        return json.dumps(
+            [jsonable_encoder(group) for group in groups],
+            separators=(",", ":"),
+        ).encode()
+
+    payload = await group_directory.aget_or_build(key, build)
+    headers = {"ETag": payload.etag, "Cache-Control": f"public, max-age={max_age}"}
+    if request.headers.get("if-none-match") == payload.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response = payload.to_response(request.headers.get("accept-encoding"))
+    response.headers.update(headers)
+    return response
 
 
 @app.post("/groups", response_model=schemas.GroupResponse, status_code=status.HTTP_201_CREATED)
 def create_group(
     payload: schemas.GroupCreate,
-    db: Session = Depends(get_db),
     _: models.User = Depends(security.require_superadmin),
 ):
-    group = crud.create_group(db, payload)
-    return schemas.GroupResponse.from_orm(group)
+    return sharding.create_group(payload)
+
+
+@app.delete("/groups/{group_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_group(
+    group_id: int,
+    _: models.User = Depends(security.require_superadmin),
+):
+    sharding.delete_group(group_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 # Superadmin routes
@@ -281,25 +408,30 @@ def create_group(
 def create_admin_invitations(
     payload: schemas.SuperadminInvitationBatchRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
     _: models.User = Depends(security.require_superadmin),
 ):
     if not payload.invitations:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nenhum convite informado")
 
-    created, skipped = crud.create_admin_invitations(db, payload.invitations)
-    for invitation in created:
-        expires_at = invitation.expires_at.strftime("%d/%m/%Y %H:%M")
-        background_tasks.add_task(
-            email_utils.send_invitation_email,
-            invitation.email,
-            invitation.name,
-            invitation.token,
-            expires_at,
-        )
+    created: List[schemas.InvitationResponse] = []
+    skipped: List[dict] = []
+    for shard, items in sharding.group_by_shard(payload.invitations, lambda item: item.group_id).items():
+        with shard_session(shard) as db:
+            shard_created, shard_skipped = crud.create_admin_invitations(db, items)
+            for invitation in shard_created:
+                expires_at = invitation.expires_at.strftime("%d/%m/%Y %H:%M")
+                background_tasks.add_task(
+                    email_utils.send_invitation_email,
+                    invitation.email,
+                    invitation.name,
+                    invitation.token,
+                    expires_at,
+                )
+            created.extend(schemas.InvitationResponse.from_orm(inv) for inv in shard_created)
+            skipped.extend(shard_skipped)
 
     return schemas.InvitationBatchResponse(
-        created=[schemas.InvitationResponse.from_orm(inv) for inv in created],
+        created=created,
         skipped=[schemas.InvitationSkipped(**item) for item in skipped],
     )
 
@@ -307,11 +439,9 @@ def create_admin_invitations(
 @app.get("/superadmin/invitations", response_model=List[schemas.InvitationResponse])
 def list_admin_invitations(
     group_id: Optional[int] = None,
-    db: Session = Depends(get_db),
     _: models.User = Depends(security.require_superadmin),
 ):
-    invitations = crud.list_invitations(db, group_id=group_id, role=models.UserRole.ADMIN)
-    return [schemas.InvitationResponse.from_orm(invitation) for invitation in invitations]
+    return sharding.list_admin_invitations(group_id)
 
 
 # Admin routes
@@ -368,6 +498,49 @@ def list_invitations(
     return [schemas.InvitationResponse.from_orm(invitation) for invitation in invitations]
 
 
+@app.get("/admin/dashboard", response_model=schemas.AdminDashboard)
+def get_admin_dashboard(
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(security.require_admin),
+):
+    if current_user.group_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Administrador não vinculado a grupo")
+    return crud.get_admin_dashboard(db, current_user.group_id)
+
+
+@app.get("/admin/export", response_class=StreamingResponse)
+def export_group_history(
+    export_format: str = Query("csv", alias="format", regex="^(csv|ndjson)$"),
+    current_user: models.User = Depends(security.require_admin),
+):
+    if current_user.group_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Administrador não vinculado a grupo")
+
+    filename = f"historico-grupo-{current_user.group_id}-{datetime.utcnow():%Y%m%d}.{export_format}"
+    rows = export.stream_rows(
+        get_shard().reader(),
+        crud.group_history_queries(current_user.group_id),
+        export_format,
+        get_settings().export_batch_size,
+    )
+    return StreamingResponse(
+        rows,
+        media_type=export.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.patch("/admin/users/status", response_model=List[schemas.UserStatusChangeResult])
+def bulk_set_user_status(
+    payload: schemas.BulkUserStatusRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.require_admin),
+):
+    if current_user.group_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Administrador não vinculado a grupo")
+    return crud.bulk_update_user_status(db, payload.changes, group_id=current_user.group_id)
+
+
 @app.patch("/admin/users/{user_id}/status", response_model=schemas.UserResponse)
 def set_user_status(
     user_id: int,
@@ -395,22 +568,19 @@ def create_game(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(security.require_admin),
 ):
-    created_game = crud.create_game(db, game, current_user)
-    reserved, available = crud.get_slot_summary(created_game)
-    response = schemas.GameResponse.from_orm(created_game)
-    response.available_slots = available
-    response.reserved_slots = reserved
-    return response
+    created = crud.create_game(db, game, current_user)
+    deadline_scheduler.schedule(created.id, created.convocation_deadline)
+    return created
 
 
 @app.get("/games", response_model=List[schemas.GameResponse])
-def list_games(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(security.get_current_user),
+async def list_games(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(security.get_current_user_async),
 ):
     if current_user.group_id is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário não vinculado a grupo")
-    games = crud.get_games(db, current_user.group_id)
+    games = await crud.get_games_async(db, current_user.group_id)
     result: List[schemas.GameResponse] = []
     for game in games:
         reserved, available = crud.get_slot_summary(game)
@@ -421,14 +591,76 @@ def list_games(
     return result
 
 
+# Declared before /games/{game_id} so "archive" is not parsed as a game id.
+@app.get("/games/archive", response_model=List[schemas.ArchivedGameSummary])
+def list_archived_games(
+    before: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(security.get_current_user),
+):
+    if current_user.group_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário não vinculado a grupo")
+    return crud.list_archived_games(db, current_user.group_id, before=before, limit=limit)
+
+
+@app.get("/games/archive/{archived_id}", response_model=schemas.ArchivedGameDetail)
+def get_archived_game(
+    archived_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(security.get_current_user),
+):
+    if current_user.group_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário não vinculado a grupo")
+    return crud.get_archived_game(db, archived_id, group_id=current_user.group_id)
+
+
 @app.get("/games/{game_id}", response_model=schemas.GameDetail)
-def get_game_detail(
+async def get_game_detail(
     game_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response_format: str = Query("full", alias="format", regex="^(full|compact)$"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(security.get_current_user_async),
+):
+    game = await crud.get_game_async(db, game_id, group_id=current_user.group_id)
+    # Snapshots are cached as serialized (and lazily compressed) bytes keyed by the
+    # game's roster version, so the response_model is bypassed on purpose.
+    # Concurrent misses for the same version share a single build.
+    def serialize(roster: models.Game) -> bytes:
+        if response_format == "compact":
+            body = crud.generate_compact_game_snapshot(roster).json(exclude_none=True, separators=(",", ":"))
+        else:
+            body = crud.generate_game_snapshot(roster).json(separators=(",", ":"))
+        return body.encode()
+
+    async def build() -> bytes:
+        roster = await crud.load_game_roster_async(db, game.id)
+        # Pure CPU work on already-loaded objects; keep it off the event loop.
+        return await run_in_threadpool(serialize, roster)
+
+    payload = await game_snapshots.aget_or_build(snapshot_key(game, response_format), build)
+    return payload.to_response(request.headers.get("accept-encoding"))
+
+
+@app.get("/games/{game_id}/teams", response_model=schemas.TeamDraw)
+def get_game_teams(
+    game_id: int,
+    request: Request,
+    teams: int = Query(2, ge=2, le=6),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(security.get_current_user),
 ):
     game = crud.get_game(db, game_id, group_id=current_user.group_id)
-    return crud.generate_game_snapshot(game)
+    # Same cache as the snapshots. Ratings come from player_stats, which also change
+    # with other games, so their last update is part of the key: every worker then
+    # draws the same teams for the same roster and stats.
+    stats_at = crud.roster_stats_updated_at(db, game.id)
+    payload = game_snapshots.get_or_build(
+        snapshot_key(game, f"teams:{teams}:{stats_at.isoformat() if stats_at else ''}"),
+        lambda: crud.draw_teams(db, game, teams).json(separators=(",", ":")).encode(),
+    )
+    return payload.to_response(request.headers.get("accept-encoding"))
 
 
 @app.post("/games/{game_id}/convocations", response_model=schemas.GameDetail)
@@ -439,8 +671,7 @@ def set_convocations(
     current_user: models.User = Depends(security.require_admin),
 ):
     game = crud.get_game(db, game_id, group_id=current_user.group_id)
-    crud.assign_convocations(db, game, payload.user_ids)
-    db.refresh(game)
+    crud.assign_convocations(db, game, payload.user_ids, payload.mode)
     return crud.generate_game_snapshot(game)
 
 
@@ -499,3 +730,63 @@ def remove_presence(
 ):
     crud.remove_presence(db, game_id, current_user, user_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+# Game series routes
+
+
+@app.post("/series", response_model=schemas.GameSeriesDetail, status_code=status.HTTP_201_CREATED)
+def create_series(
+    payload: schemas.GameSeriesCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.require_admin),
+):
+    created = crud.create_series(db, payload, current_user)
+    for game in created.games:
+        deadline_scheduler.schedule(game.id, game.convocation_deadline)
+    return created
+
+
+@app.get("/series", response_model=List[schemas.GameSeriesResponse])
+def list_series(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.get_current_user),
+):
+    if current_user.group_id is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário não vinculado a grupo")
+    return [schemas.GameSeriesResponse.from_orm(series) for series in crud.list_series(db, current_user.group_id)]
+
+
+@app.post(
+    "/series/{series_id}/games",
+    response_model=List[schemas.GameResponse],
+    status_code=status.HTTP_201_CREATED,
+)
+def generate_series_games(
+    series_id: int,
+    payload: schemas.GameSeriesGenerate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.require_admin),
+):
+    series = crud.get_series(db, series_id, group_id=current_user.group_id)
+    games = crud.generate_series_games(db, series, payload, current_user)
+    for game in games:
+        deadline_scheduler.schedule(game.id, game.convocation_deadline)
+    return games
+
+
+@app.patch("/series/{series_id}", response_model=schemas.GameSeriesResponse)
+def update_series(
+    series_id: int,
+    payload: schemas.GameSeriesUpdate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.require_admin),
+):
+    series = crud.get_series(db, series_id, group_id=current_user.group_id)
+    updated = crud.update_series(db, series, payload)
+    if payload.deadline_offset_hours is not None:
+        deadline_scheduler.resync()
+    return schemas.GameSeriesResponse.from_orm(updated)
+
+
+startup_report.mark("import")
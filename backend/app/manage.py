@@ -0,0 +1,75 @@
+"""Maintenance commands: ``python -m app.manage <command>``."""
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+from . import crud, sharding
+from .config import get_settings
+from .database import ensure_schema, shard_group_counts, shard_names, shard_session
+
+logger = logging.getLogger(__name__)
+
+
+def rebuild_stats(args: argparse.Namespace) -> None:
+    for shard in shard_names():
+        with shard_session(shard) as db:
+            rows = crud.rebuild_player_stats(db)
+        logger.info("Rebuilt %s player stats row(s) in shard %r", rows, shard)
+
+
+def archive_games(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    before = datetime.utcnow() - timedelta(days=args.days or settings.archive_after_days)
+    for shard in shard_names():
+        with shard_session(shard) as db:
+            moved = crud.archive_games(db, before, args.batch_size or settings.archive_batch_size)
+        logger.info("Archived %s game(s) scheduled before %s in shard %r", moved, before.isoformat(timespec="minutes"), shard)
+
+
+def list_shards(args: argparse.Namespace) -> None:
+    for shard, groups in shard_group_counts().items():
+        print(f"{shard}\t{groups} group(s)")
+
+
+def move_group(args: argparse.Namespace) -> None:
+    copied = sharding.move_group(args.group_id, args.shard, settle_seconds=args.settle_seconds)
+    if not copied:
+        logger.info("Group %s is already in shard %r", args.group_id, args.shard)
+        return
+    details = ", ".join(f"{table}={count}" for table, count in copied.items() if count)
+    logger.info("Copied %s", details)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.manage")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser(
+        "rebuild-stats", help="Recompute player_stats from convocations and presences"
+    ).set_defaults(handler=rebuild_stats)
+    archive = commands.add_parser(
+        "archive-games", help="Move finished games and their rosters into the archive tables"
+    )
+    archive.add_argument("--days", type=int, help="Archive games older than this (default ARCHIVE_AFTER_DAYS)")
+    archive.add_argument("--batch-size", type=int, help="Games per transaction (default ARCHIVE_BATCH_SIZE)")
+    archive.set_defaults(handler=archive_games)
+    commands.add_parser("shards", help="Show how many groups each shard holds").set_defaults(handler=list_shards)
+    move = commands.add_parser(
+        "move-group", help="Move a group and all its data to another shard; its writes get 503 meanwhile"
+    )
+    move.add_argument("group_id", type=int)
+    move.add_argument("shard")
+    move.add_argument(
+        "--settle-seconds",
+        type=float,
+        help="Wait between blocking writes and copying (default GROUP_SHARD_CACHE_SECONDS + 5)",
+    )
+    move.set_defaults(handler=move_group)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    ensure_schema()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
+import unicodedata
 from datetime import datetime
 from enum import Enum
+from typing import Optional
 
 from sqlalchemy import (
     Boolean,
@@ -7,15 +9,26 @@ from sqlalchemy import (
     DateTime,
     Enum as SqlEnum,
     ForeignKey,
+    Index,
     Integer,
     String,
+    Text,
     UniqueConstraint,
+    event,
+    inspect,
 )
 from sqlalchemy.orm import relationship
 
 from .database import Base
 
 
+def normalize_search_text(*parts: Optional[str]) -> str:
+    """Lowercase, accent-free text used for member search (``"José" -> "jose"``)."""
+    text = " ".join(part.strip() for part in parts if part).casefold()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
 class UserRole(str, Enum):
     USER = "user"
     ADMIN = "admin"
@@ -31,6 +44,8 @@ class ConvocationStatus(str, Enum):
     PENDING = "pending"
     CONFIRMED = "confirmed"
     DECLINED = "declined"
+    # Still pending when the convocation deadline passed.
+    EXPIRED = "expired"
 
 
 class PresenceRole(str, Enum):
@@ -52,9 +67,14 @@ class Group(Base):
     description = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    users = relationship("User", back_populates="group", cascade="all, delete")
-    games = relationship("Game", back_populates="group", cascade="all, delete")
-    invitations = relationship("Invitation", back_populates="group", cascade="all, delete-orphan")
+    # Child rows are removed by ON DELETE rules in the database (passive_deletes), so
+    # deleting a parent never loads its history. users.group_id is RESTRICT; see
+    # crud.delete_group.
+    users = relationship("User", back_populates="group", cascade="all, delete", passive_deletes=True)
+    games = relationship("Game", back_populates="group", cascade="all, delete", passive_deletes=True)
+    invitations = relationship(
+        "Invitation", back_populates="group", cascade="all, delete-orphan", passive_deletes=True
+    )
 
 
 class InvitationStatus(str, Enum):
@@ -65,6 +85,10 @@ class InvitationStatus(str, Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Prefix search; substring search uses users_search (SQLite) or a trigram index.
+        Index("ix_users_group_search_name", "group_id", "search_name"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -82,16 +106,33 @@ class User(Base):
     profile_image = Column(String, nullable=True)
     preferred_position = Column(String, nullable=True)
     group_id = Column(Integer, ForeignKey("groups.id", ondelete="RESTRICT"), nullable=True)
+    # normalize_search_text(name, email), kept in step by _sync_search_name on every ORM
+    # insert or update; bulk Query.update() calls that touch name or email must set it too.
+    search_name = Column(String, nullable=True)
 
     group = relationship("Group", back_populates="users")
-    games_created = relationship("Game", back_populates="owner", cascade="all, delete")
-    convocations = relationship("Convocation", back_populates="user", cascade="all, delete-orphan")
-    presences = relationship("Presence", back_populates="user", cascade="all, delete-orphan")
-    invitations = relationship("Invitation", back_populates="user")
+    # games.owner_id is SET NULL: a removed organizer does not take the group's games along.
+    games_created = relationship("Game", back_populates="owner", passive_deletes=True)
+    convocations = relationship(
+        "Convocation", back_populates="user", cascade="all, delete-orphan", passive_deletes=True
+    )
+    presences = relationship("Presence", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    invitations = relationship("Invitation", back_populates="user", passive_deletes=True)
+
+
+@event.listens_for(User, "before_insert")
+@event.listens_for(User, "before_update")
+def _sync_search_name(mapper, connection, user: User) -> None:
+    state = inspect(user)
+    if state.pending or any(state.attrs[key].history.has_changes() for key in ("name", "email")):
+        user.search_name = normalize_search_text(user.name, user.email)
 
 
 class Game(Base):
     __tablename__ = "games"
+    # Game ids key the snapshot cache, reminder log and archive; SQLite would otherwise
+    # hand a deleted game's id to the next one.
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -99,15 +140,46 @@ class Game(Base):
     scheduled_at = Column(DateTime, nullable=False)
     max_players = Column(Integer, nullable=False, default=10)
     convocation_deadline = Column(DateTime, nullable=True)
+    # Set by the deadline scheduler once pending convocations were expired.
+    deadline_processed_at = Column(DateTime, nullable=True)
     auto_convocar_mensalistas = Column(Boolean, nullable=False, default=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Bumped on every roster change; keys the serialized snapshot cache.
+    version = Column(Integer, nullable=False, default=0, server_default="0")
     owner_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
+    series_id = Column(Integer, ForeignKey("game_series.id", ondelete="SET NULL"), nullable=True)
 
     owner = relationship("User", back_populates="games_created")
     group = relationship("Group", back_populates="games")
-    convocations = relationship("Convocation", back_populates="game", cascade="all, delete-orphan")
-    presences = relationship("Presence", back_populates="game", cascade="all, delete-orphan")
+    series = relationship("GameSeries", back_populates="games")
+    convocations = relationship(
+        "Convocation", back_populates="game", cascade="all, delete-orphan", passive_deletes=True
+    )
+    presences = relationship("Presence", back_populates="game", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class GameSeries(Base):
+    """Weekly fixture; occurrences are generated as regular games."""
+
+    __tablename__ = "game_series"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    location = Column(String, nullable=False)
+    # First occurrence; its weekday and time repeat every ``interval_weeks``.
+    starts_at = Column(DateTime, nullable=False)
+    interval_weeks = Column(Integer, nullable=False, default=1)
+    max_players = Column(Integer, nullable=False, default=10)
+    deadline_offset_hours = Column(Integer, nullable=False, default=24)
+    auto_convocar_mensalistas = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
+
+    owner = relationship("User")
+    group = relationship("Group")
+    games = relationship("Game", back_populates="series", passive_deletes=True)
 
 
 class Convocation(Base):
@@ -137,6 +209,8 @@ class Presence(Base):
     status = Column(SqlEnum(PresenceStatus), nullable=False, default=PresenceStatus.CONFIRMED)
     queue_position = Column(Integer, nullable=True)
     joined_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Set when the player got in from the waitlist; cleared if displaced back to it.
+    promoted_at = Column(DateTime, nullable=True)
 
     game_id = Column(Integer, ForeignKey("games.id", ondelete="CASCADE"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -162,3 +236,125 @@ class Invitation(Base):
 
     user = relationship("User", back_populates="invitations")
     group = relationship("Group", back_populates="invitations")
+
+
+class IdempotencyRecord(Base):
+    __tablename__ = "idempotency_records"
+    __table_args__ = (
+        UniqueConstraint("scope", "key", name="uq_idempotency_scope_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # "<user_id>:<method>:<path>" so a key only replays the request it was sent with
+    scope = Column(String, nullable=False)
+    key = Column(String, nullable=False)
+    # SHA-256 of method, path and body; reusing the key for another request is a 422
+    request_hash = Column(String, nullable=True)
+    # NULL while the original request is still being processed
+    status_code = Column(Integer, nullable=True)
+    # While processing: after this a retry takes the key over (the worker died)
+    locked_until = Column(DateTime, nullable=True)
+    content_type = Column(String, nullable=True)
+    body = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class ReminderKind(str, Enum):
+    DEADLINE = "deadline"
+    KICKOFF = "kickoff"
+
+
+class ReminderLog(Base):
+    """Ledger of reminder e-mails; the unique key makes each reminder go out once."""
+
+    __tablename__ = "reminder_log"
+    __table_args__ = (
+        UniqueConstraint("kind", "offset_minutes", "game_id", "user_id", name="uq_reminder_recipient"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(SqlEnum(ReminderKind), nullable=False)
+    offset_minutes = Column(Integer, nullable=False)
+    game_id = Column(Integer, ForeignKey("games.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # A claim without sent_at is retried once it is older than REMINDER_CLAIM_MINUTES.
+    claimed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+
+class PlayerStats(Base):
+    """Per-season attendance counters, kept in step by the crud mutations.
+
+    Every counter mirrors current rows (confirmed presences, declined and expired
+    convocations, presences promoted from the waitlist) plus their archived copies,
+    so ``manage.py rebuild-stats`` recomputes exactly what the incremental updates
+    maintain.
+    """
+
+    __tablename__ = "player_stats"
+    __table_args__ = (
+        Index("ix_player_stats_leaderboard", "group_id", "season", "confirmed"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    season = Column(Integer, primary_key=True)
+    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
+    confirmed = Column(Integer, nullable=False, default=0)
+    declined = Column(Integer, nullable=False, default=0)
+    no_shows = Column(Integer, nullable=False, default=0)
+    promotions = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    user = relationship("User")
+
+
+class ArchivedGame(Base):
+    """A finished game moved out of ``games`` by ``manage.py archive-games``.
+
+    Only what history needs is kept; the roster lives in ``archived_attendance``.
+    Player stats are not touched by archiving.
+    """
+
+    __tablename__ = "archived_games"
+    __table_args__ = (
+        Index("ix_archived_games_group_scheduled", "group_id", "scheduled_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    # Id the game had in ``games``; never handed out again (sqlite_autoincrement).
+    original_game_id = Column(Integer, nullable=False)
+    name = Column(String, nullable=False)
+    location = Column(String, nullable=False)
+    scheduled_at = Column(DateTime, nullable=False)
+    max_players = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False)
+
+    attendance = relationship(
+        "ArchivedAttendance", back_populates="game", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+
+class ArchivedAttendance(Base):
+    """A player's convocation and presence in an archived game, folded into one row."""
+
+    __tablename__ = "archived_attendance"
+    __table_args__ = (
+        UniqueConstraint("game_id", "user_id", name="uq_archived_attendance_game_user"),
+        Index("ix_archived_attendance_user", "user_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    game_id = Column(Integer, ForeignKey("archived_games.id", ondelete="CASCADE"), nullable=False)
+    # NULL once the player's account is deleted; the game keeps its full roster.
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    convocation_status = Column(SqlEnum(ConvocationStatus), nullable=True)
+    presence_role = Column(SqlEnum(PresenceRole), nullable=True)
+    presence_status = Column(SqlEnum(PresenceStatus), nullable=True)
+    promoted = Column(Boolean, nullable=False, default=False)
+
+    game = relationship("ArchivedGame", back_populates="attendance")
+    user = relationship("User")
@@ -0,0 +1,127 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from . import crud, email_utils, models
+from .config import get_settings
+from .database import shard_names, shard_session
+
+logger = logging.getLogger(__name__)
+
+
+def parse_offsets(raw: str) -> List[int]:
+    """Parse ``"24h,2h,30m"`` into sorted minutes: ``[30, 120, 1440]``."""
+    offsets = set()
+    for item in raw.split(","):
+        item = item.strip().lower()
+        if not item:
+            continue
+        if item.endswith("h"):
+            offsets.add(int(item[:-1]) * 60)
+        elif item.endswith("m"):
+            offsets.add(int(item[:-1]))
+        else:
+            offsets.add(int(item))
+    return sorted(offsets)
+
+
+def _message(kind: models.ReminderKind, recipient) -> Tuple[str, str, str]:
+    if kind == models.ReminderKind.DEADLINE:
+        body = email_utils.build_deadline_reminder_body(
+            recipient.user_name, recipient.game_name, recipient.game_id, recipient.convocation_deadline
+        )
+        return f"Confirme sua presença: {recipient.game_name}", recipient.email, body
+    body = email_utils.build_kickoff_reminder_body(
+        recipient.user_name, recipient.game_name, recipient.game_id, recipient.location, recipient.scheduled_at
+    )
+    return f"Lembrete de partida: {recipient.game_name}", recipient.email, body
+
+
+class ReminderService:
+    """Sends reminders at configured offsets before convocation deadlines and kickoff.
+
+    Offsets split the time ahead into disjoint windows (with ``24h,2h``: deadline
+    within 2h, then between 2h and 24h), so a player gets one reminder per window.
+    Each window is one query; recipients are claimed in ``reminder_log`` and mailed
+    in batches over one SMTP connection, so workers never send the same reminder.
+    """
+
+    def __init__(self) -> None:
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="reminders", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def run_once(self) -> int:
+        """Send every reminder due now; returns how many e-mails went out."""
+        if not email_utils.email_configured():
+            return 0
+        settings = get_settings()
+        now = datetime.utcnow()
+        claim_cutoff = now - timedelta(minutes=settings.reminder_claim_minutes)
+        sent = 0
+        for shard in shard_names():
+            for kind, raw_offsets in (
+                (models.ReminderKind.DEADLINE, settings.reminder_deadline_offsets),
+                (models.ReminderKind.KICKOFF, settings.reminder_kickoff_offsets),
+            ):
+                previous = 0
+                for offset in parse_offsets(raw_offsets):
+                    window_start = now + timedelta(minutes=previous)
+                    window_end = now + timedelta(minutes=offset)
+                    sent += self._send_window(shard, kind, offset, window_start, window_end, claim_cutoff)
+                    previous = offset
+        return sent
+
+    def _send_window(
+        self,
+        shard: str,
+        kind: models.ReminderKind,
+        offset: int,
+        window_start: datetime,
+        window_end: datetime,
+        claim_cutoff: datetime,
+    ) -> int:
+        batch_size = get_settings().reminder_batch_size
+        sent = 0
+        with shard_session(shard) as db:
+            recipients = crud.due_reminders(db, kind, offset, window_start, window_end, claim_cutoff)
+            for start in range(0, len(recipients), batch_size):
+                batch = recipients[start:start + batch_size]
+                claimed = crud.claim_reminders(
+                    db, kind, offset, [(item.game_id, item.user_id) for item in batch], claim_cutoff
+                )
+                batch = [item for item in batch if (item.game_id, item.user_id) in claimed]
+                delivered = email_utils.send_bulk_email([_message(kind, item) for item in batch])
+                crud.mark_reminders_sent(
+                    db, [claimed[(batch[index].game_id, batch[index].user_id)] for index in delivered]
+                )
+                sent += len(delivered)
+        return sent
+
+    def _run(self) -> None:
+        interval = get_settings().reminder_interval_seconds
+        while not self._stop.is_set():
+            try:
+                sent = self.run_once()
+                if sent:
+                    logger.info("Sent %s reminder e-mails", sent)
+            except Exception:
+                logger.exception("Reminder run failed")
+            self._stop.wait(interval)
+
+
+reminder_service = ReminderService()
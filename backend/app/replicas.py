@@ -0,0 +1,100 @@
+import time
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .database import DEFAULT_SHARD, REPLICA_PIN_SECONDS, has_replicas, primary_reads
+from .security import decode_token
+
+READ_PRIMARY_HEADER = "X-Read-Primary-Until"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Expired pins are swept once the map grows past this.
+PIN_SWEEP_SIZE = 10_000
+
+
+class ReadPins:
+    """Per-user deadlines, in this process, until which reads go to the primary.
+
+    Keyed on (shard, token ``sub``): user ids are only unique within a shard. Only
+    touched from the event loop, so no lock.
+    """
+
+    def __init__(self) -> None:
+        self._until: Dict[Tuple[str, str], float] = {}
+
+    def pin(self, key: Tuple[str, str], until: float) -> None:
+        if len(self._until) >= PIN_SWEEP_SIZE:
+            now = time.time()
+            self._until = {pinned: deadline for pinned, deadline in self._until.items() if deadline > now}
+        self._until[key] = until
+
+    def pinned(self, key: Tuple[str, str]) -> bool:
+        until = self._until.get(key)
+        if until is None:
+            return False
+        if until > time.time():
+            return True
+        del self._until[key]
+        return False
+
+
+read_pins = ReadPins()
+
+
+def _pinned_until(headers: Headers) -> Optional[float]:
+    try:
+        return int(headers.get(READ_PRIMARY_HEADER, "")) / 1000
+    except ValueError:
+        return None
+
+
+def _user_key(headers: Headers) -> Optional[Tuple[str, str]]:
+    authorization = headers.get("authorization", "")
+    claims = decode_token(authorization[7:]) if authorization.lower().startswith("bearer ") else None
+    if not claims or claims.get("sub") is None:
+        return None
+    return str(claims.get("shd") or DEFAULT_SHARD), str(claims["sub"])
+
+
+class ReadYourWritesMiddleware:
+    """Keeps a client's reads on the primary for a moment after each of its writes.
+
+    Each authenticated write pins its user's reads to the primary for
+    ``REPLICA_PIN_SECONDS`` in this process (``read_pins``), whatever the client does.
+    The response also carries ``X-Read-Primary-Until`` (epoch milliseconds); clients
+    that send it back get the same from workers that did not see the write. A no-op
+    without ``DATABASE_REPLICAS``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not has_replicas():
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        user = _user_key(headers)
+        if scope["method"] in SAFE_METHODS:
+            until = _pinned_until(headers)
+            pinned = (user is not None and read_pins.pinned(user)) or (until is not None and until > time.time())
+            token = primary_reads.set(pinned)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                primary_reads.reset(token)
+            return
+
+        # Failed writes may have committed something too (an expired invitation, ...).
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                until = time.time() + REPLICA_PIN_SECONDS
+                if user is not None:
+                    read_pins.pin(user, until)
+                response_headers = MutableHeaders(scope=message)
+                response_headers[READ_PRIMARY_HEADER] = str(int(until * 1000))
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,5 +1,6 @@
 from datetime import datetime
-from typing import List, Optional
+from enum import Enum
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, EmailStr, Field
 
@@ -48,6 +49,11 @@ class UserPublic(BaseModel):
         orm_mode = True
 
 
+class UserSearchPage(BaseModel):
+    items: List[UserPublic]
+    next_offset: Optional[int] = None
+
+
 class GroupBase(BaseModel):
     name: str = Field(..., min_length=1)
     description: Optional[str] = None
@@ -100,11 +106,67 @@ class GameResponse(GameBase):
     available_slots: int = 0
     reserved_slots: int = 0
     group_id: int
+    series_id: Optional[int] = None
+
+    class Config:
+        orm_mode = True
+
+
+class MyGameStatus(BaseModel):
+    game_id: int
+    name: str
+    location: str
+    scheduled_at: datetime
+    convocation_deadline: Optional[datetime] = None
+    convocation_status: Optional[ConvocationStatus] = None
+    presence_status: Optional[PresenceStatus] = None
+    presence_role: Optional[PresenceRole] = None
+    waitlist_position: Optional[int] = None
 
     class Config:
         orm_mode = True
 
 
+class GameSeriesBase(BaseModel):
+    name: str = Field(..., min_length=1)
+    location: str = Field(..., min_length=1)
+    starts_at: datetime
+    interval_weeks: int = Field(default=1, ge=1, le=4)
+    max_players: int = Field(default=10, gt=0)
+    deadline_offset_hours: int = Field(default=24, ge=0)
+    auto_convocar_mensalistas: bool = False
+
+
+class GameSeriesGenerate(BaseModel):
+    occurrences: int = Field(default=4, ge=1, le=52)
+    convocation_user_ids: List[int] = Field(default_factory=list)
+
+
+class GameSeriesCreate(GameSeriesBase, GameSeriesGenerate):
+    pass
+
+
+class GameSeriesUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1)
+    location: Optional[str] = Field(None, min_length=1)
+    max_players: Optional[int] = Field(None, gt=0)
+    deadline_offset_hours: Optional[int] = Field(None, ge=0)
+    auto_convocar_mensalistas: Optional[bool] = None
+
+
+class GameSeriesResponse(GameSeriesBase):
+    id: int
+    created_at: datetime
+    group_id: int
+
+    class Config:
+        orm_mode = True
+
+
+class GameSeriesDetail(GameSeriesResponse):
+    games: List[GameResponse] = Field(default_factory=list)
+
+
 class ConvocationResponse(BaseModel):
     id: int
     status: ConvocationStatus
@@ -137,8 +199,54 @@ class GameDetail(GameResponse):
     presences: List[PresenceResponse]
 
 
+class ConvocationCompact(BaseModel):
+    id: int
+    status: ConvocationStatus
+    responded_at: Optional[datetime]
+    user_id: int
+
+    class Config:
+        orm_mode = True
+
+
+class PresenceCompact(BaseModel):
+    id: int
+    role: PresenceRole
+    status: PresenceStatus
+    joined_at: datetime
+    queue_position: Optional[int] = None
+    user_id: int
+
+    class Config:
+        orm_mode = True
+
+
+class RosterUser(BaseModel):
+    name: str
+    role: UserRole
+    status: UserStatus
+    profile_image: Optional[str]
+    preferred_position: Optional[str]
+
+    class Config:
+        orm_mode = True
+
+
+class GameDetailCompact(GameResponse):
+    users: Dict[int, RosterUser]
+    convocations: List[ConvocationCompact]
+    presences: List[PresenceCompact]
+
+
+class ConvocationAssignMode(str, Enum):
+    REPLACE = "replace"
+    ADD = "add"
+    REMOVE = "remove"
+
+
 class ConvocationAssignRequest(BaseModel):
     user_ids: List[int]
+    mode: ConvocationAssignMode = ConvocationAssignMode.REPLACE
 
 
 class MessageResponse(BaseModel):
@@ -219,3 +327,124 @@ class SuperadminInvitationBatchRequest(BaseModel):
 
 class UpdateUserStatusRequest(BaseModel):
     status: UserStatus
+
+
+class UserStatusChange(BaseModel):
+    user_id: int
+    status: UserStatus
+
+
+class BulkUserStatusRequest(BaseModel):
+    changes: List[UserStatusChange] = Field(..., min_items=1, max_items=500)
+
+
+class UserStatusChangeResult(BaseModel):
+    user_id: int
+    status: UserStatus
+    # updated, unchanged, not_found, other_group or superseded (a later entry for the same user wins)
+    result: str
+
+
+class AdmissionGateStatus(BaseModel):
+    limit: int
+    queue_size: int
+    active: int
+    waiting: int
+    rejected: int
+    timed_out: int
+
+
+class StartupReportResponse(BaseModel):
+    total_ms: float
+    phases: Dict[str, float]
+    failed: List[str] = []
+
+
+class PlayerStatsResponse(BaseModel):
+    season: int
+    confirmed: int = 0
+    declined: int = 0
+    no_shows: int = 0
+    promotions: int = 0
+
+    class Config:
+        orm_mode = True
+
+
+class LeaderboardEntry(PlayerStatsResponse):
+    user: UserPublic
+
+
+class ArchivedGameBase(BaseModel):
+    id: int
+    name: str
+    location: str
+    scheduled_at: datetime
+    max_players: int
+
+    class Config:
+        orm_mode = True
+
+
+class ArchivedGameSummary(ArchivedGameBase):
+    confirmed: int = 0
+
+
+class ArchivedAttendanceResponse(BaseModel):
+    # None when the player's account was deleted after the game was archived.
+    user: Optional[UserPublic] = None
+    convocation_status: Optional[ConvocationStatus] = None
+    presence_role: Optional[PresenceRole] = None
+    presence_status: Optional[PresenceStatus] = None
+    promoted: bool = False
+
+    class Config:
+        orm_mode = True
+
+
+class ArchivedGameDetail(ArchivedGameBase):
+    attendance: List[ArchivedAttendanceResponse] = []
+
+
+class TeamPlayer(BaseModel):
+    user: UserPublic
+    rating: float
+
+
+class Team(BaseModel):
+    rating: float
+    players: List[TeamPlayer]
+
+
+class TeamDraw(BaseModel):
+    game_id: int
+    version: int
+    imbalance: float
+    teams: List[Team]
+
+
+class DashboardGame(BaseModel):
+    id: int
+    name: str
+    scheduled_at: datetime
+    max_players: int
+    confirmed: int = 0
+    waiting: int = 0
+    reserved_slots: int = 0
+    available_slots: int = 0
+
+
+class DashboardActivity(BaseModel):
+    at: datetime
+    kind: str
+    user_name: str
+    game_id: Optional[int] = None
+    game_name: Optional[str] = None
+
+
+class AdminDashboard(BaseModel):
+    member_count: int
+    members_by_status: Dict[str, int]
+    invitations: Dict[str, int]
+    upcoming_games: List[DashboardGame]
+    recent_activity: List[DashboardActivity]
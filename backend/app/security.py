@@ -1,14 +1,16 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .config import settings
-from .database import get_db
+from .config import get_settings
+from .database import get_async_read_db, get_db
 from .models import User, UserRole
 
 ALGORITHM = "HS256"
@@ -27,36 +29,71 @@ def get_password_hash(password: str) -> str:
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.token_expire_minutes))
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=get_settings().token_expire_minutes))
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.jwt_secret, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, get_settings().jwt_secret, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    credentials_exception = HTTPException(
+def create_user_token(user: User, shard: str) -> str:
+    # The shard routes every later request without a catalog lookup; the group lets
+    # get_current_user reject tokens issued before the group moved to another shard.
+    return create_access_token({"sub": str(user.id), "grp": user.group_id, "shd": shard})
+
+
+def decode_token(token: str) -> Optional[dict]:
+    try:
+        return jwt.decode(token, get_settings().jwt_secret, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+
+def decode_user_id(token: str) -> Optional[int]:
+    payload = decode_token(token)
+    user_id = payload.get("sub") if payload else None
+    return int(user_id) if user_id is not None else None
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.jwt_secret, algorithms=[ALGORITHM])
-    except JWTError:
-        raise credentials_exception
 
-    user_id = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if user is None:
-        raise credentials_exception
+def _token_user_id(token: str) -> Tuple[int, dict]:
+    payload = decode_token(token)
+    if payload is None or payload.get("sub") is None:
+        raise _credentials_exception()
+    return int(payload["sub"]), payload
+
+
+def _check_token_group(user: Optional[User], payload: dict) -> User:
+    # Tokens issued before sharding carry no group and are only checked by id.
+    if user is None or ("grp" in payload and payload["grp"] != user.group_id):
+        raise _credentials_exception()
     return user
 
 
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    user_id, payload = _token_user_id(token)
+    user = db.query(User).filter(User.id == user_id).first()
+    return _check_token_group(user, payload)
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> User:
+    user_id, payload = _token_user_id(token)
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+    return _check_token_group(user, payload)
+
+
 def require_admin(current_user: User = Depends(get_current_user)) -> User:
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
@@ -0,0 +1,355 @@
+"""Cross-shard operations: request routing, lookups that run before authentication,
+superadmin views over every group and moving a group to another shard."""
+import asyncio
+import heapq
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy import Table, delete, func, or_, select, text
+from sqlalchemy.engine import Connection, RowMapping
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from . import crud, models, schemas
+from .database import (
+    DEFAULT_SHARD,
+    GROUP_SHARD_CACHE_SECONDS,
+    Base,
+    assign_group_shard,
+    group_is_moving,
+    release_group_id,
+    reserve_group_id,
+    set_group_moving,
+    shard_for_group,
+    shard_group_counts,
+    shard_names,
+    shard_session,
+    shards,
+    use_shard,
+)
+from .security import decode_token
+from .snapshot_cache import group_directory
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Replays of recent writes; they expire within hours and are not worth moving.
+UNMOVED_TABLES = {"idempotency_records"}
+# Rows read and inserted per statement while moving a group.
+MOVE_BATCH_SIZE = 1000
+# How long a write admitted just before a group was marked as moving may still run.
+MOVE_IN_FLIGHT_SECONDS = 5.0
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+GROUP_MOVING_DETAIL = "Grupo em migração para outro servidor. Tente novamente em instantes."
+
+
+def ensure_group_writable(group_id: Optional[int]) -> None:
+    """Refuse writes to a group while move_group copies it; they would be lost."""
+    if group_is_moving(group_id):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=GROUP_MOVING_DETAIL,
+            headers={"Retry-After": str(int(GROUP_SHARD_CACHE_SECONDS))},
+        )
+
+
+class ShardRoutingMiddleware:
+    """Serves each request from the shard named in its bearer token.
+
+    Requests without a token, or with one issued before sharding, run against the
+    default shard; routes that act before login locate the shard themselves. Writes
+    from members of a group being moved get a 503 until the move is over.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or len(shards) == 1:
+            await self.app(scope, receive, send)
+            return
+
+        authorization = Headers(scope=scope).get("authorization", "")
+        claims = decode_token(authorization[7:]) if authorization.lower().startswith("bearer ") else None
+        claims = claims or {}
+        if scope["method"] not in SAFE_METHODS and claims.get("grp") is not None:
+            # A catalog lookup at most every GROUP_SHARD_CACHE_SECONDS; run it off the loop.
+            if await asyncio.to_thread(group_is_moving, claims["grp"]):
+                response = JSONResponse(
+                    {"detail": GROUP_MOVING_DETAIL},
+                    status_code=503,
+                    headers={"Retry-After": str(int(GROUP_SHARD_CACHE_SECONDS))},
+                )
+                await response(scope, receive, send)
+                return
+        shard = claims.get("shd")
+        with use_shard(shard if shard in shards else DEFAULT_SHARD):
+            await self.app(scope, receive, send)
+
+
+_lookup_pool: Optional[ThreadPoolExecutor] = None
+_lookup_pool_lock = threading.Lock()
+
+
+def _shard_lookup_pool() -> ThreadPoolExecutor:
+    global _lookup_pool
+    with _lookup_pool_lock:
+        if _lookup_pool is None:
+            # Room for every login the admission gate lets in at once, each asking every shard.
+            _lookup_pool = ThreadPoolExecutor(max_workers=8 * len(shards), thread_name_prefix="shard-lookup")
+        return _lookup_pool
+
+
+def _forget_lookup_pool() -> None:
+    # A forked worker (gunicorn --preload) inherits the pool without its threads.
+    global _lookup_pool, _lookup_pool_lock
+    _lookup_pool = None
+    _lookup_pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_lookup_pool)
+
+
+def _found_in(names: List[str], lookup: Callable[[Session], object]) -> List[bool]:
+    """Run ``lookup`` on each shard at once, so a login waits for one round trip, not one per shard."""
+
+    def found(name: str) -> bool:
+        with shard_session(name) as db:
+            return lookup(db) is not None
+
+    if len(names) <= 1:
+        return [found(name) for name in names]
+    return list(_shard_lookup_pool().map(found, names))
+
+
+def locate(lookup: Callable[[Session], object]) -> str:
+    """First shard where ``lookup`` finds something; the default shard otherwise."""
+    if len(shards) == 1:
+        return DEFAULT_SHARD
+    names = shard_names()
+    return next((name for name, hit in zip(names, _found_in(names, lookup)) if hit), DEFAULT_SHARD)
+
+
+def shard_of_email(email: str) -> str:
+    return locate(lambda db: crud.get_user_by_email(db, email))
+
+
+def shard_of_confirmation_token(token: str) -> str:
+    return locate(
+        lambda db: db.query(models.User.id)
+        .filter(or_(models.User.confirmation_token == token, models.User.last_confirmation_token == token))
+        .first()
+    )
+
+
+def shard_of_reset_token(token: str) -> str:
+    return locate(lambda db: db.query(models.User.id).filter(models.User.reset_token == token).first())
+
+
+def shard_of_invitation(token: str) -> str:
+    return locate(lambda db: db.query(models.Invitation.id).filter(models.Invitation.token == token).first())
+
+
+def email_registered_elsewhere(email: str, shard: str) -> bool:
+    """E-mails are unique per database; this covers the other shards."""
+    others = [name for name in shard_names() if name != shard]
+    return any(_found_in(others, lambda db: crud.get_user_by_email(db, email)))
+
+
+def group_by_shard(items: Iterable[T], group_id: Callable[[T], int]) -> Dict[str, List[T]]:
+    by_shard: Dict[str, List[T]] = {}
+    shard_of: Dict[int, str] = {}
+    for item in items:
+        key = group_id(item)
+        if key not in shard_of:
+            shard_of[key] = shard_for_group(key)
+        by_shard.setdefault(shard_of[key], []).append(item)
+    return by_shard
+
+
+def create_group(payload: schemas.GroupCreate, *, shard: Optional[str] = None) -> schemas.GroupResponse:
+    """Create a group in ``shard``, by default the one holding the fewest groups."""
+    if len(shards) > 1:
+        for name in shard_names():
+            with shard_session(name) as db:
+                if crud.get_group_by_name(db, payload.name):
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Já existe um grupo com esse nome")
+    if shard is None:
+        counts = shard_group_counts()
+        shard = min(shard_names(), key=lambda name: counts[name])
+
+    group_id = reserve_group_id(shard)
+    try:
+        with shard_session(shard) as db:
+            return schemas.GroupResponse.from_orm(crud.create_group(db, payload, group_id=group_id))
+    except Exception:
+        release_group_id(group_id)
+        raise
+
+
+def delete_group(group_id: int) -> None:
+    with shard_session(shard_for_group(group_id)) as db:
+        group = crud.get_group_by_id(db, group_id)
+        if not group:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Grupo não encontrado")
+        crud.delete_group(db, group)
+    release_group_id(group_id)
+
+
+async def list_groups_async(
+    *,
+    query_text: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> List[schemas.GroupResponse]:
+    """The public directory: every shard's groups merged by name."""
+
+    async def page(name: str, page_limit: Optional[int], page_offset: int) -> List[schemas.GroupResponse]:
+        async with shards[name].reader().AsyncSessionLocal() as db:
+            groups = await crud.list_groups_async(db, query_text=query_text, limit=page_limit, offset=page_offset)
+            return [schemas.GroupResponse.from_orm(group) for group in groups]
+
+    if len(shards) == 1:
+        return await page(DEFAULT_SHARD, limit, offset)
+    # Each shard returns its first offset + limit groups; the page is cut after merging.
+    depth = None if limit is None else offset + limit
+    pages = await asyncio.gather(*(page(name, depth, 0) for name in shard_names()))
+    merged = list(heapq.merge(*pages, key=lambda group: group.name))
+    return merged[offset:depth]
+
+
+def list_admin_invitations(group_id: Optional[int] = None) -> List[schemas.InvitationResponse]:
+    names = [shard_for_group(group_id)] if group_id is not None else shard_names()
+    invitations: List[schemas.InvitationResponse] = []
+    for name in names:
+        with shard_session(name) as db:
+            invitations.extend(
+                schemas.InvitationResponse.from_orm(invitation)
+                for invitation in crud.list_invitations(db, group_id=group_id, role=models.UserRole.ADMIN)
+            )
+    if len(names) > 1:
+        invitations.sort(key=lambda invitation: invitation.created_at, reverse=True)
+    return invitations
+
+
+def _group_rows(
+    connection: Connection, table: Table, group_id: int, new_ids: Dict[str, Dict[int, int]]
+) -> Iterator[Sequence[RowMapping]]:
+    if table.name == "groups":
+        condition = table.c.id == group_id
+    elif "group_id" in table.c:
+        condition = table.c.group_id == group_id
+    else:
+        # Reached through a row already copied: convocations through games, and so on.
+        parent = next(
+            foreign_key
+            for foreign_key in sorted(table.foreign_keys, key=lambda foreign_key: foreign_key.parent.name)
+            if not foreign_key.parent.nullable and foreign_key.column.table.name in new_ids
+        )
+        condition = parent.parent.in_(list(new_ids[parent.column.table.name]))
+    result = connection.execute(select(table).where(condition).execution_options(yield_per=MOVE_BATCH_SIZE))
+    return result.mappings().partitions()
+
+
+def _remap(table: Table, row: dict, new_ids: Dict[str, Dict[int, int]]) -> Optional[dict]:
+    for foreign_key in table.foreign_keys:
+        column = foreign_key.parent.name
+        if row[column] is None:
+            continue
+        mapping = new_ids.get(foreign_key.column.table.name, {})
+        if row[column] in mapping:
+            row[column] = mapping[row[column]]
+        elif foreign_key.parent.nullable:
+            row[column] = None
+        else:
+            # Points outside the group; nothing to attach it to in the target.
+            return None
+    return row
+
+
+def _allocate_ids(connection: Connection, table: Table, count: int) -> List[int]:
+    """Reserve ``count`` ids of ``table`` in the target, so a batch inserts them explicitly."""
+    if connection.dialect.name == "postgresql":
+        return list(
+            connection.execute(
+                text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+                {"table": table.name, "count": count},
+            ).scalars()
+        )
+    last = connection.execute(select(func.max(table.c.id))).scalar() or 0
+    if table.dialect_options["sqlite"]["autoincrement"]:
+        # Ids freed by deletes are never handed out again; stay past them too.
+        sequence = connection.execute(
+            text("SELECT seq FROM sqlite_sequence WHERE name = :table"), {"table": table.name}
+        ).scalar()
+        last = max(last, sequence or 0)
+    return list(range(last + 1, last + 1 + count))
+
+
+def move_group(group_id: int, target: str, *, settle_seconds: Optional[float] = None) -> Dict[str, int]:
+    """Copy a group into ``target``, point the catalog at it, then drop the original.
+
+    The group is marked as moving first, and ShardRoutingMiddleware answers its
+    members' writes with 503 until the move is over. The copy starts ``settle_seconds``
+    later (by default once every worker's catalog cache has expired and writes already
+    admitted are done). Rows get new ids in the target (only group ids are global), so
+    the group's members must log in again: their tokens name the old shard and the old
+    ids. Returns how many rows of each table were copied.
+    """
+    if target not in shards:
+        raise ValueError(f"Unknown shard {target!r}")
+    source = shard_for_group(group_id)
+    if source == target:
+        return {}
+
+    set_group_moving(group_id, True)
+    try:
+        time.sleep(GROUP_SHARD_CACHE_SECONDS + MOVE_IN_FLIGHT_SECONDS if settle_seconds is None else settle_seconds)
+        copied = _copy_group(group_id, source, target)
+        assign_group_shard(group_id, target)
+    finally:
+        set_group_moving(group_id, False)
+
+    users = models.User.__table__
+    groups = models.Group.__table__
+    with shards[source].engine.begin() as connection:
+        # Everything else goes with ON DELETE CASCADE / SET NULL.
+        connection.execute(delete(users).where(users.c.group_id == group_id))
+        connection.execute(delete(groups).where(groups.c.id == group_id))
+    group_directory.clear()
+    logger.info("Moved group %s from shard %r to %r", group_id, source, target)
+    return copied
+
+
+def _copy_group(group_id: int, source: str, target: str) -> Dict[str, int]:
+    new_ids: Dict[str, Dict[int, int]] = {"groups": {group_id: group_id}}
+    copied: Dict[str, int] = {}
+    with shards[source].engine.connect() as reader, shards[target].engine.begin() as writer:
+        for table in Base.metadata.sorted_tables:
+            if table.name in UNMOVED_TABLES:
+                continue
+            surrogate = table.name != "groups" and [column.name for column in table.primary_key] == ["id"]
+            ids = new_ids.setdefault(table.name, {})
+            count = 0
+            for rows in _group_rows(reader, table, group_id, new_ids):
+                batch = [values for values in (_remap(table, dict(row), new_ids) for row in rows) if values is not None]
+                if not batch:
+                    continue
+                if surrogate:
+                    for values, new_id in zip(batch, _allocate_ids(writer, table, len(batch))):
+                        ids[values["id"]] = new_id
+                        values["id"] = new_id
+                writer.execute(table.insert(), batch)
+                count += len(batch)
+            if table.name == "groups" and not count:
+                raise ValueError(f"Group {group_id} not found in shard {source!r}")
+            copied[table.name] = count
+    return copied
@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Awaitable, Callable, Hashable, Optional
+
+from fastapi import Response
+
+from . import compression, models
+from .config import get_settings
+from .database import current_shard
+
+
+class CachedPayload:
+    """Serialized JSON body plus its compressed variants, each encoded at most once."""
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self._encoded: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self._etag: Optional[str] = None
+
+    @property
+    def etag(self) -> str:
+        # Weak: the gzip and brotli variants share it.
+        if self._etag is None:
+            self._etag = f'W/"{hashlib.sha1(self.body).hexdigest()}"'
+        return self._etag
+
+    def encoded(self, encoding: str) -> bytes:
+        cached = self._encoded.get(encoding)
+        if cached is not None:
+            return cached
+        with self._lock:
+            if encoding not in self._encoded:
+                self._encoded[encoding] = compression.compress(self.body, encoding)
+            return self._encoded[encoding]
+
+    def to_response(self, accept_encoding: Optional[str]) -> Response:
+        media_type = "application/json"
+        encoding = compression.negotiate_encoding(accept_encoding)
+        if encoding is None or not compression.is_compressible(media_type, len(self.body)):
+            response = Response(content=self.body, media_type=media_type)
+        else:
+            response = Response(
+                content=self.encoded(encoding),
+                media_type=media_type,
+                headers={"Content-Encoding": encoding},
+            )
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+
+class SnapshotCache:
+    """Small thread-safe LRU of serialized game snapshots."""
+
+    def __init__(self, maxsize: Optional[int] = None) -> None:
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, CachedPayload]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def maxsize(self) -> int:
+        if self._maxsize is None:
+            self._maxsize = get_settings().snapshot_cache_size
+        return self._maxsize
+
+    def get(self, key: Hashable) -> Optional[CachedPayload]:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+            return payload
+
+    def put(self, key: Hashable, body: bytes) -> CachedPayload:
+        payload = CachedPayload(body)
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return payload
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_build(self, key: Hashable, build: Callable[[], bytes]) -> CachedPayload:
+        """Return the cached payload, building it at most once across concurrent callers."""
+        payload = self.get(key)
+        if payload is not None:
+            return payload
+
+        def build_and_store() -> CachedPayload:
+            # A previous flight may have stored it while we were queuing for the lock.
+            return self.get(key) or self.put(key, build())
+
+        return snapshot_builds.do(key, build_and_store)
+
+    async def aget_or_build(self, key: Hashable, build: Callable[[], Awaitable[bytes]]) -> CachedPayload:
+        """Async counterpart of :meth:`get_or_build` for handlers on the event loop."""
+        payload = self.get(key)
+        if payload is not None:
+            return payload
+
+        async def build_and_store() -> CachedPayload:
+            return self.get(key) or self.put(key, await build())
+
+        return await async_snapshot_builds.do(key, build_and_store)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution.
+
+    The first caller runs ``fn``; callers arriving while it is in flight block on
+    its future and receive the same result (or exception).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], CachedPayload]) -> CachedPayload:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """:class:`SingleFlight` for coroutines sharing one event loop.
+
+    Followers await the leader's future instead of blocking a worker thread.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[CachedPayload]]) -> CachedPayload:
+        future = self._calls.get(key)
+        if future is not None:
+            # shield(): a cancelled follower must not cancel the shared build.
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark it retrieved so a flight without followers does not log a warning.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+def snapshot_key(game: models.Game, response_format: str) -> tuple:
+    # Reserved slots stop counting once the convocation deadline passes, before the
+    # scheduler expires them and bumps the version; flip the key at that moment too.
+    deadline_open = game.convocation_deadline is None or game.convocation_deadline > datetime.utcnow()
+    # Game ids are only unique within a shard, but never reused there (AUTOINCREMENT on SQLite).
+    return (current_shard.get(), game.id, game.version, deadline_open, response_format)
+
+
+snapshot_builds = SingleFlight()
+async_snapshot_builds = AsyncSingleFlight()
+game_snapshots = SnapshotCache()
+# Serialized GET /groups pages; cleared by crud.create_group / delete_group.
+group_directory = SnapshotCache(maxsize=64)
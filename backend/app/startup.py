@@ -0,0 +1,135 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from . import crud, models, schemas, sharding
+from .config import get_settings
+from .database import DEFAULT_SHARD, engines_loaded, ensure_schema, load_engines, shard_session
+from .security import pwd_context
+
+logger = logging.getLogger(__name__)
+
+# Set by the gunicorn master once the one-off tasks ran; forked workers inherit it.
+STARTUP_DONE_ENV = "IFUTE_STARTUP_DONE"
+
+
+class StartupReport:
+    """Duration of each boot phase, so regressions in boot time show up in the logs."""
+
+    def __init__(self) -> None:
+        self._last_mark = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.failed: list[str] = []
+        # Phases that ran alongside the boot; reported, but not part of its duration.
+        self.background: set[str] = set()
+
+    @contextmanager
+    def phase(self, name: str, *, background: bool = False) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.failed.append(name)
+            raise
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 2)
+            if background:
+                self.background.add(name)
+            else:
+                self._last_mark = time.perf_counter()
+
+    def mark(self, name: str) -> None:
+        """Record the time elapsed since the previous phase or mark."""
+        now = time.perf_counter()
+        self.phases[name] = round((now - self._last_mark) * 1000, 2)
+        self._last_mark = now
+
+    @property
+    def total_ms(self) -> float:
+        return round(sum(duration for name, duration in self.phases.items() if name not in self.background), 2)
+
+    def log(self) -> None:
+        details = ", ".join(f"{name}={duration:.1f}ms" for name, duration in self.phases.items())
+        logger.info("Startup finished in %.1f ms (%s)", self.total_ms, details)
+
+
+def ensure_default_admin() -> None:
+    admin_default_user = get_settings().admin_default_user
+    if not admin_default_user:
+        return
+
+    parts = [value.strip() for value in admin_default_user.split(",")]
+    if len(parts) != 3:
+        logger.warning(
+            "ADMIN_DEFAULT_USER should follow 'Name,email,password'. Skipping creation."
+        )
+        return
+
+    name, email, password = parts
+    with shard_session(sharding.shard_of_email(email)) as db:
+        existing = crud.get_user_by_email(db, email)
+        if existing:
+            if existing.role != models.UserRole.SUPERADMIN:
+                existing.role = models.UserRole.SUPERADMIN
+                db.commit()
+                logger.info("Promoted existing user '%s' to superadmin", email)
+            return
+        group = crud.get_group_by_name(db, name) or sharding.create_group(
+            schemas.GroupCreate(name=name, description=f"Grupo padrão para {name}"),
+            shard=DEFAULT_SHARD,
+        )
+        user_schema = schemas.UserCreate(name=name, email=email, password=password, group_id=group.id)
+        # A bcrypt hash in ADMIN_DEFAULT_USER skips the (slow) hashing on boot.
+        password_hash = password if pwd_context.identify(password) else None
+        crud.create_user(
+            db,
+            user_schema,
+            role=models.UserRole.SUPERADMIN,
+            is_active=True,
+            password_hash=password_hash,
+        )
+        logger.info("Created default superadmin user '%s'", email)
+
+
+def startup_tasks_done() -> bool:
+    return os.environ.get(STARTUP_DONE_ENV) == "1"
+
+
+def _ensure_default_admin_in_background(report: StartupReport) -> None:
+    try:
+        with report.phase("default_admin", background=True):
+            ensure_default_admin()
+    except Exception:
+        # Left undone: the next start tries again.
+        logger.exception("Could not create the default admin")
+        return
+    logger.info("Default admin ready in %.1f ms", report.phases["default_admin"])
+    os.environ[STARTUP_DONE_ENV] = "1"
+
+
+def run_startup_tasks(report: Optional[StartupReport] = None, *, defer_admin: bool = False) -> None:
+    """Schema check and default admin; must run once per deployment, not per worker.
+
+    With ``defer_admin`` the default admin is created in a background thread so a
+    missing admin (and its password hash) does not delay readiness; its phase and any
+    failure show up in the report once it finishes.
+    """
+    if startup_tasks_done():
+        return
+    report = report or StartupReport()
+    if not engines_loaded():
+        with report.phase("engines"):
+            load_engines()
+    with report.phase("schema"):
+        ensure_schema()
+    if defer_admin:
+        threading.Thread(
+            target=_ensure_default_admin_in_background, args=(report,), name="default-admin", daemon=True
+        ).start()
+        return
+    with report.phase("default_admin"):
+        ensure_default_admin()
+    os.environ[STARTUP_DONE_ENV] = "1"
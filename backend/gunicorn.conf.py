@@ -0,0 +1,41 @@
+"""Production launcher: gunicorn master with uvicorn workers, tuned from app.config.Settings.
+
+Run with ``gunicorn -c gunicorn.conf.py app.main:app``.
+"""
+import multiprocessing
+
+from app.config import get_settings
+from app.database import reset_engines
+from app.startup import StartupReport, run_startup_tasks
+
+settings = get_settings()
+
+
+def _worker_count() -> int:
+    if settings.web_concurrency:
+        return settings.web_concurrency
+    workers = max(int(multiprocessing.cpu_count() * settings.workers_per_core), 2)
+    if settings.max_workers:
+        workers = min(workers, settings.max_workers)
+    return workers
+
+
+bind = settings.server_bind
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = _worker_count()
+keepalive = settings.keepalive_seconds
+graceful_timeout = settings.graceful_timeout_seconds
+timeout = settings.worker_timeout_seconds
+preload_app = True
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    # Runs once in the master before any worker is forked, so schema checks and the
+    # default admin never race; workers see IFUTE_STARTUP_DONE and skip them.
+    report = StartupReport()
+    run_startup_tasks(report)
+    # Workers build their own engines; none of the master's (or its connections) is forked.
+    reset_engines()
+    server.log.info("Startup tasks done in %.1f ms; spawning %s workers", report.total_ms, workers)
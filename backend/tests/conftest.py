@@ -0,0 +1,86 @@
+import itertools
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+# Before app.database builds its engines, which read the URL on first use (settings are cached).
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='footy-tests-')}/test.db"
+os.environ.pop("DATABASE_SHARDS", None)
+os.environ.pop("DATABASE_REPLICAS", None)
+
+import pytest  # noqa: E402
+
+from app import crud, models, schemas  # noqa: E402
+from app.database import Base, SessionLocal, engine, ensure_schema  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    ensure_schema()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as connection:
+            for table in reversed(Base.metadata.sorted_tables):
+                connection.execute(table.delete())
+
+
+@pytest.fixture
+def group(db) -> models.Group:
+    return crud.create_group(db, schemas.GroupCreate(name="Pelada"))
+
+
+@pytest.fixture
+def make_user(db, group):
+    numbers = itertools.count(1)
+
+    def make(role: models.UserRole = models.UserRole.USER) -> models.User:
+        number = next(numbers)
+        return crud.create_user(
+            db,
+            schemas.UserCreate(
+                name=f"Jogador {number}",
+                email=f"jogador{number}@example.com",
+                password="secret123",
+                group_id=group.id,
+            ),
+            role=role,
+            # Skips bcrypt; nobody logs in here.
+            password_hash="not-a-hash",
+        )
+
+    return make
+
+
+@pytest.fixture
+def admin(make_user) -> models.User:
+    return make_user(models.UserRole.ADMIN)
+
+
+@pytest.fixture
+def make_game(db, admin):
+    def make(
+        convoked=(),
+        *,
+        max_players: int = 4,
+        scheduled_in: timedelta = timedelta(days=3),
+        deadline_in: timedelta = timedelta(days=1),
+    ) -> models.Game:
+        now = datetime.utcnow()
+        response = crud.create_game(
+            db,
+            schemas.GameCreate(
+                name="Pelada de quinta",
+                location="Quadra",
+                scheduled_at=now + scheduled_in,
+                max_players=max_players,
+                convocation_deadline=now + deadline_in,
+                convocation_user_ids=[user.id for user in convoked],
+            ),
+            admin,
+        )
+        return db.get(models.Game, response.id)
+
+    return make
@@ -0,0 +1,129 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import admission as admission_module
+from app.admission import ADMITTED, REJECTED, TIMED_OUT, AdmissionGate, AdmissionMiddleware, admission
+
+
+def test_gate_rejects_once_the_queue_is_full():
+    async def scenario():
+        gate = AdmissionGate("write", limit=1, queue_size=1)
+        assert await gate.acquire(1.0) == ADMITTED
+        queued = asyncio.create_task(gate.acquire(1.0))
+        await asyncio.sleep(0)
+        assert gate.waiting == 1
+
+        assert await gate.acquire(1.0) == REJECTED
+
+        gate.release()
+        assert await queued == ADMITTED
+        return gate.snapshot()
+
+    snapshot = asyncio.run(scenario())
+
+    assert snapshot["rejected"] == 1
+    assert snapshot["timed_out"] == 0
+    assert (snapshot["active"], snapshot["waiting"]) == (1, 0)
+
+
+def test_gate_gives_up_after_the_queue_timeout():
+    async def scenario():
+        gate = AdmissionGate("write", limit=1, queue_size=4)
+        assert await gate.acquire(1.0) == ADMITTED
+
+        assert await gate.acquire(0.05) == TIMED_OUT
+
+        gate.release()
+        assert await gate.acquire(0.05) == ADMITTED
+        return gate.snapshot()
+
+    snapshot = asyncio.run(scenario())
+
+    assert snapshot["timed_out"] == 1
+    assert (snapshot["active"], snapshot["waiting"]) == (1, 0)
+
+
+@pytest.fixture
+def gated(monkeypatch):
+    """AdmissionMiddleware around an app that holds each request until released."""
+    monkeypatch.setattr(
+        admission_module,
+        "get_settings",
+        lambda: SimpleNamespace(admission_queue_timeout_seconds=0.05, admission_retry_after_seconds=7),
+    )
+
+    def build(limit: int, queue_size: int):
+        monkeypatch.setattr(admission, "_gates", {"write": AdmissionGate("write", limit, queue_size)})
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        return AdmissionMiddleware(app), release
+
+    return build
+
+
+async def call(app, method: str = "POST", path: str = "/games") -> dict:
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app({"type": "http", "method": method, "path": path, "headers": []}, receive, send)
+    start = messages[0]
+    return {"status": start["status"], "headers": dict(start["headers"])}
+
+
+def test_full_queue_is_shed_with_429(gated):
+    async def scenario():
+        app, release = gated(limit=1, queue_size=0)
+        held = asyncio.create_task(call(app))
+        await asyncio.sleep(0)
+
+        shed = await call(app)
+
+        release.set()
+        return shed, await held, await call(app)
+
+    shed, held, after = asyncio.run(scenario())
+
+    assert shed["status"] == 429
+    assert shed["headers"][b"retry-after"] == b"7"
+    assert held["status"] == 200
+    assert after["status"] == 200
+    assert admission.gates["write"].snapshot()["rejected"] == 1
+
+
+def test_queue_timeout_is_shed_with_503(gated):
+    async def scenario():
+        app, release = gated(limit=1, queue_size=1)
+        held = asyncio.create_task(call(app))
+        await asyncio.sleep(0)
+
+        shed = await call(app)
+
+        release.set()
+        await held
+        return shed
+
+    shed = asyncio.run(scenario())
+
+    assert shed["status"] == 503
+    assert shed["headers"][b"retry-after"] == b"7"
+    assert admission.gates["write"].snapshot()["timed_out"] == 1
+
+
+@pytest.mark.parametrize("path", ["/health/admission", "/health/startup"])
+def test_health_reports_require_a_superadmin(path):
+    from app.main import app
+
+    assert TestClient(app).get(path).status_code == 401
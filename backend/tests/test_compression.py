@@ -0,0 +1,78 @@
+import asyncio
+import gzip
+
+import pytest
+
+from app.compression import CompressionMiddleware
+from app.config import get_settings
+
+LARGE = b"[" + b'{"name": "Pelada"},' * 200 + b"{}]"
+
+
+def respond(body: bytes, content_type: str, extra_headers=()):
+    async def app(scope, receive, send):
+        headers = [(b"content-type", content_type.encode()), *extra_headers]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    return CompressionMiddleware(app)
+
+
+def call(app, accept_encoding=None) -> dict:
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app({"type": "http", "method": "GET", "path": "/", "headers": headers}, receive, send))
+    start, body = messages
+    return {
+        "vary": [value for key, value in start["headers"] if key == b"vary"],
+        "encoding": dict(start["headers"]).get(b"content-encoding"),
+        "body": body["body"],
+    }
+
+
+def test_large_json_is_compressed_and_varies():
+    response = call(respond(LARGE, "application/json"), "gzip")
+
+    assert response["encoding"] == b"gzip"
+    assert gzip.decompress(response["body"]) == LARGE
+    assert response["vary"] == [b"Accept-Encoding"]
+
+
+@pytest.mark.parametrize("accept_encoding", [None, "identity", "gzip"])
+def test_compressible_types_vary_whatever_the_size_or_encoding(accept_encoding):
+    body = b'{"ok": true}'
+    assert len(body) < get_settings().compression_minimum_size
+
+    response = call(respond(body, "application/json"), accept_encoding)
+
+    assert response["encoding"] is None
+    assert response["body"] == body
+    assert response["vary"] == [b"Accept-Encoding"]
+
+
+def test_uncompressible_types_do_not_vary():
+    response = call(respond(LARGE, "image/png"), "gzip")
+
+    assert response["encoding"] is None
+    assert response["vary"] == []
+
+
+def test_existing_vary_is_not_repeated():
+    precompressed = gzip.compress(LARGE)
+    app = respond(
+        precompressed,
+        "application/json",
+        [(b"content-encoding", b"gzip"), (b"vary", b"Accept-Encoding")],
+    )
+
+    response = call(app, "gzip")
+
+    assert response["body"] == precompressed
+    assert response["vary"] == [b"Accept-Encoding"]
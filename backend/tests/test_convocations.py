@@ -0,0 +1,109 @@
+import pytest
+from fastapi import HTTPException
+
+from app import crud, models, schemas
+from tests.test_player_stats import assert_matches_rebuild
+
+Mode = schemas.ConvocationAssignMode
+
+
+def convocations(db, game: models.Game) -> dict:
+    db.expire_all()
+    return {
+        convocation.user_id: convocation.status
+        for convocation in db.query(models.Convocation).filter_by(game_id=game.id)
+    }
+
+
+def presences(db, game: models.Game) -> dict:
+    return {
+        presence.user_id: (presence.role, presence.status)
+        for presence in db.query(models.Presence).filter_by(game_id=game.id)
+    }
+
+
+def test_replace_keeps_answers_of_players_still_convoked(db, make_user, make_game):
+    kept, dropped, added = make_user(), make_user(), make_user()
+    game = make_game([kept, dropped])
+    crud.confirm_convocation(db, game.id, kept)
+    crud.confirm_convocation(db, game.id, dropped)
+
+    crud.assign_convocations(db, game, [kept.id, added.id], Mode.REPLACE)
+
+    assert convocations(db, game) == {
+        kept.id: models.ConvocationStatus.CONFIRMED,
+        added.id: models.ConvocationStatus.PENDING,
+    }
+    assert presences(db, game) == {kept.id: (models.PresenceRole.CONVOKED, models.PresenceStatus.CONFIRMED)}
+    assert_matches_rebuild(db)
+
+
+def test_add_only_inserts_new_players(db, make_user, make_game):
+    existing, added = make_user(), make_user()
+    game = make_game([existing])
+    crud.decline_convocation(db, game.id, existing)
+
+    crud.assign_convocations(db, game, [existing.id, added.id], Mode.ADD)
+
+    assert convocations(db, game) == {
+        existing.id: models.ConvocationStatus.DECLINED,
+        added.id: models.ConvocationStatus.PENDING,
+    }
+    assert_matches_rebuild(db)
+
+
+def test_remove_drops_presence_and_promotes_the_waitlist(db, make_user, make_game):
+    removed, stays, avulso, never_convoked = make_user(), make_user(), make_user(), make_user()
+    game = make_game([removed, stays], max_players=2)
+    crud.confirm_convocation(db, game.id, removed)
+    crud.join_as_avulso(db, game.id, avulso)
+    assert presences(db, game)[avulso.id][1] == models.PresenceStatus.WAITING
+
+    crud.assign_convocations(db, game, [removed.id, never_convoked.id], Mode.REMOVE)
+
+    assert convocations(db, game) == {stays.id: models.ConvocationStatus.PENDING}
+    assert presences(db, game) == {avulso.id: (models.PresenceRole.AVULSO, models.PresenceStatus.CONFIRMED)}
+    assert_matches_rebuild(db)
+
+
+def test_convoking_a_player_already_present_keeps_their_presence(db, make_user, make_game):
+    avulso = make_user()
+    game = make_game([])
+    crud.join_as_avulso(db, game.id, avulso)
+
+    crud.assign_convocations(db, game, [avulso.id], Mode.ADD)
+
+    assert convocations(db, game) == {avulso.id: models.ConvocationStatus.PENDING}
+    assert presences(db, game) == {avulso.id: (models.PresenceRole.AVULSO, models.PresenceStatus.CONFIRMED)}
+
+    # Replacing them out takes the presence with the convocation.
+    crud.assign_convocations(db, game, [], Mode.REPLACE)
+
+    assert convocations(db, game) == {}
+    assert presences(db, game) == {}
+    assert_matches_rebuild(db)
+
+
+def test_unchanged_list_does_not_touch_the_game(db, make_user, make_game):
+    player = make_user()
+    game = make_game([player])
+    version = game.version
+
+    crud.assign_convocations(db, game, [player.id], Mode.REPLACE)
+    crud.assign_convocations(db, game, [player.id], Mode.ADD)
+    crud.assign_convocations(db, game, [], Mode.REMOVE)
+
+    db.refresh(game)
+    assert game.version == version
+
+
+@pytest.mark.parametrize("mode", [Mode.REPLACE, Mode.ADD])
+def test_unknown_users_are_rejected(db, make_user, make_game, mode):
+    player = make_user()
+    game = make_game([player])
+
+    with pytest.raises(HTTPException) as error:
+        crud.assign_convocations(db, game, [player.id, 9999], mode)
+
+    assert error.value.status_code == 400
+    assert convocations(db, game) == {player.id: models.ConvocationStatus.PENDING}
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+from app import crud, models
+
+
+def stats(db) -> list:
+    db.expire_all()
+    return sorted(
+        (row.user_id, row.season, row.confirmed, row.declined, row.no_shows, row.promotions)
+        for row in db.query(models.PlayerStats)
+        if (row.confirmed, row.declined, row.no_shows, row.promotions) != (0, 0, 0, 0)
+    )
+
+
+def assert_matches_rebuild(db) -> list:
+    """The incremental counters must equal a full recount; returns them."""
+    incremental = stats(db)
+    crud.rebuild_player_stats(db)
+    assert stats(db) == incremental
+    return incremental
+
+
+def pass_deadline(db, game: models.Game) -> list:
+    game.convocation_deadline = datetime.utcnow() - timedelta(seconds=1)
+    db.commit()
+    return crud.process_convocation_deadline(db, game.id)
+
+
+def presence_status(db, game: models.Game, user: models.User):
+    presence = db.query(models.Presence).filter_by(game_id=game.id, user_id=user.id).first()
+    return presence.status if presence else None
+
+
+def test_confirm_and_decline_match_rebuild(db, make_user, make_game):
+    convoked = [make_user() for _ in range(3)]
+    avulso = make_user()
+    game = make_game(convoked, max_players=3)
+
+    crud.join_as_avulso(db, game.id, avulso)
+    assert presence_status(db, game, avulso) == models.PresenceStatus.WAITING
+    crud.confirm_convocation(db, game.id, convoked[0])
+    assert_matches_rebuild(db)
+
+    # The freed slot promotes the avulso.
+    promoted = crud.decline_convocation(db, game.id, convoked[1])
+    assert [presence.user_id for presence in promoted] == [avulso.id]
+    assert_matches_rebuild(db)
+
+    # Changing their minds: the declined player confirms and displaces the promoted avulso.
+    _, displaced = crud.confirm_convocation(db, game.id, convoked[1])
+    assert [presence.user_id for presence in displaced] == [avulso.id]
+    crud.decline_convocation(db, game.id, convoked[0])
+    season = game.scheduled_at.year
+    assert (convoked[0].id, season, 0, 1, 0, 0) in assert_matches_rebuild(db)
+
+
+def test_expire_and_promote_match_rebuild(db, make_user, make_game):
+    convoked = [make_user() for _ in range(2)]
+    avulsos = [make_user() for _ in range(2)]
+    game = make_game(convoked, max_players=2)
+    for avulso in avulsos:
+        crud.join_as_avulso(db, game.id, avulso)
+
+    promoted = pass_deadline(db, game)
+
+    assert sorted(presence.user_id for presence in promoted) == sorted(avulso.id for avulso in avulsos)
+    season = game.scheduled_at.year
+    counted = assert_matches_rebuild(db)
+    assert {(user.id, season, 0, 0, 1, 0) for user in convoked} <= set(counted)
+    assert {(user.id, season, 1, 0, 0, 1) for user in avulsos} <= set(counted)
+
+    # An expired player who confirms late takes a promoted avulso's place back.
+    crud.confirm_convocation(db, game.id, convoked[0])
+    assert_matches_rebuild(db)
+
+
+def test_remove_presence_and_delete_game_match_rebuild(db, admin, make_user, make_game):
+    convoked = make_user()
+    avulsos = [make_user() for _ in range(2)]
+    game = make_game([convoked], max_players=2)
+    for avulso in avulsos:
+        crud.join_as_avulso(db, game.id, avulso)
+    crud.confirm_convocation(db, game.id, convoked)
+
+    promoted = crud.remove_presence(db, game.id, admin, convoked.id)
+    assert [presence.user_id for presence in promoted] == [avulsos[1].id]
+    assert_matches_rebuild(db)
+
+    crud.remove_presence(db, game.id, avulsos[0])
+    assert_matches_rebuild(db)
+
+    crud.delete_game(db, db.get(models.Game, game.id))
+    assert assert_matches_rebuild(db) == []
@@ -0,0 +1,26 @@
+import time
+
+from app import replicas
+from app.replicas import ReadPins
+
+
+def test_pin_holds_until_its_deadline():
+    pins = ReadPins()
+    pins.pin(("default", "7"), time.time() + 60)
+    pins.pin(("default", "8"), time.time() - 1)
+
+    assert pins.pinned(("default", "7"))
+    assert not pins.pinned(("default", "8"))
+    # Same user id, other shard: another user.
+    assert not pins.pinned(("east", "7"))
+
+
+def test_expired_pins_are_swept_when_the_map_fills_up(monkeypatch):
+    monkeypatch.setattr(replicas, "PIN_SWEEP_SIZE", 3)
+    pins = ReadPins()
+    for user_id in range(3):
+        pins.pin(("default", str(user_id)), time.time() - 1)
+
+    pins.pin(("default", "live"), time.time() + 60)
+
+    assert list(pins._until) == [("default", "live")]
@@ -0,0 +1,42 @@
+from app import crud, database, models
+
+
+def found(db, group, query_text: str) -> list:
+    users, _ = crud.search_users(db, group.id, query_text)
+    return [user.id for user in users]
+
+
+def test_renaming_a_user_updates_search(db, group, make_user):
+    player = make_user()
+    assert player.search_name == "jogador 1 jogador1@example.com"
+
+    player.name = "José Antônio"
+    db.commit()
+
+    assert player.search_name == "jose antonio jogador1@example.com"
+    assert found(db, group, "antonio") == [player.id]
+    assert found(db, group, "jogador 1") == []
+
+
+def test_unrelated_updates_keep_search_name(db, make_user):
+    player = make_user()
+    player.search_name = "kept"
+    db.commit()
+
+    player.preferred_position = "goleiro"
+    db.commit()
+
+    assert player.search_name == "kept"
+
+
+def test_backfill_fills_every_missing_search_name(db, make_user):
+    players = [make_user() for _ in range(5)]
+    db.query(models.User).update({models.User.search_name: None}, synchronize_session=False)
+    db.commit()
+
+    database._backfill_search_names(database.SessionLocal, batch_size=2)
+
+    db.expire_all()
+    assert [player.search_name for player in players] == [
+        f"jogador {number} jogador{number}@example.com" for number in range(1, 6)
+    ]
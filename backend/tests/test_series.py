@@ -0,0 +1,107 @@
+import time
+from datetime import datetime, timedelta
+
+from app import crud, models, schemas
+from app.deadlines import DeadlineScheduler
+
+
+def create_series(db, owner, convoked=(), **fields) -> schemas.GameSeriesDetail:
+    payload = {
+        "name": "Pelada de terça",
+        "location": "Quadra",
+        "starts_at": datetime.utcnow() + timedelta(days=2),
+        "occurrences": 2,
+        "convocation_user_ids": [user.id for user in convoked],
+        **fields,
+    }
+    return crud.create_series(db, schemas.GameSeriesCreate(**payload), owner)
+
+
+def convocation_statuses(db, game_id: int) -> set:
+    db.expire_all()
+    return {status for (status,) in db.query(models.Convocation.status).filter_by(game_id=game_id)}
+
+
+def test_next_occurrence_of_an_empty_series_is_its_start(db, admin):
+    starts_at = datetime.utcnow() + timedelta(days=3)
+    series = models.GameSeries(
+        name="Pelada", location="Quadra", starts_at=starts_at, interval_weeks=1, owner_id=admin.id, group_id=admin.group_id
+    )
+    db.add(series)
+    db.flush()
+
+    assert crud._next_occurrence(db, series) == starts_at
+
+
+def test_next_occurrence_skips_dates_already_past(db, admin):
+    starts_at = datetime.utcnow() - timedelta(days=10)
+    series = models.GameSeries(
+        name="Pelada", location="Quadra", starts_at=starts_at, interval_weeks=1, owner_id=admin.id, group_id=admin.group_id
+    )
+    db.add(series)
+    db.flush()
+
+    assert crud._next_occurrence(db, series) == starts_at + timedelta(weeks=2)
+
+
+def test_generating_continues_after_the_last_game_in_interval_steps(db, admin):
+    starts_at = datetime.utcnow() + timedelta(days=2)
+    created = create_series(db, admin, starts_at=starts_at, interval_weeks=2, deadline_offset_hours=6)
+    series = crud.get_series(db, created.id)
+
+    assert [game.scheduled_at for game in created.games] == [starts_at, starts_at + timedelta(weeks=2)]
+    assert crud._next_occurrence(db, series) == starts_at + timedelta(weeks=4)
+
+    generated = crud.generate_series_games(db, series, schemas.GameSeriesGenerate(occurrences=2), admin)
+
+    assert [game.scheduled_at for game in generated] == [starts_at + timedelta(weeks=4), starts_at + timedelta(weeks=6)]
+    assert all(game.convocation_deadline == game.scheduled_at - timedelta(hours=6) for game in generated)
+    assert db.query(models.Game).filter_by(series_id=series.id).count() == 4
+
+
+def test_moving_the_deadline_reopens_expired_convocations(db, admin, make_user):
+    players = [make_user() for _ in range(2)]
+    # Deadline two days before a game in one day: already past.
+    created = create_series(db, admin, players, starts_at=datetime.utcnow() + timedelta(days=1), deadline_offset_hours=48)
+    game_id = created.games[0].id
+    crud.process_convocation_deadline(db, game_id)
+    assert convocation_statuses(db, game_id) == {models.ConvocationStatus.EXPIRED}
+    assert all(stats.no_shows == 1 for stats in db.query(models.PlayerStats))
+
+    crud.update_series(db, crud.get_series(db, created.id), schemas.GameSeriesUpdate(deadline_offset_hours=12))
+
+    game = db.get(models.Game, game_id)
+    assert convocation_statuses(db, game_id) == {models.ConvocationStatus.PENDING}
+    assert game.deadline_processed_at is None
+    assert game.convocation_deadline > datetime.utcnow()
+    assert all(stats.no_shows == 0 for stats in db.query(models.PlayerStats))
+    assert (game.convocation_deadline, game_id) in crud.pending_deadlines(db, datetime.utcnow() + timedelta(days=1))
+
+
+def test_resync_rearms_the_scheduler_for_a_moved_deadline(db, admin, make_user):
+    players = [make_user() for _ in range(2)]
+    # The game starts an hour and two seconds from now; with a one hour offset its
+    # deadline lands two seconds ahead.
+    starts_at = datetime.utcnow() + timedelta(hours=1, seconds=2)
+    created = create_series(db, admin, players, starts_at=starts_at, occurrences=1, deadline_offset_hours=48)
+    game_id = created.games[0].id
+    crud.process_convocation_deadline(db, game_id)
+
+    scheduler = DeadlineScheduler()
+    scheduler.start()
+    try:
+        # Let the first load (nothing pending) finish, so only resync() can pick the game up.
+        while not scheduler._resync_due:
+            time.sleep(0.01)
+        crud.update_series(db, crud.get_series(db, created.id), schemas.GameSeriesUpdate(deadline_offset_hours=1))
+        assert convocation_statuses(db, game_id) == {models.ConvocationStatus.PENDING}
+        scheduler.resync()
+
+        give_up = time.monotonic() + 10
+        while convocation_statuses(db, game_id) != {models.ConvocationStatus.EXPIRED} and time.monotonic() < give_up:
+            time.sleep(0.1)
+    finally:
+        scheduler.stop()
+
+    assert convocation_statuses(db, game_id) == {models.ConvocationStatus.EXPIRED}
+    assert db.get(models.Game, game_id).deadline_processed_at is not None
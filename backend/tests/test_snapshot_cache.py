@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+
+from app import models
+from app.snapshot_cache import SnapshotCache, async_snapshot_builds, snapshot_builds, snapshot_key
+
+READERS = 300
+
+
+class BuildFailed(Exception):
+    pass
+
+
+def game_key(version: int) -> tuple:
+    return snapshot_key(models.Game(id=7, version=version), "full")
+
+
+def run_threads(target, count: int = READERS) -> list:
+    """Start ``count`` threads at once (behind a barrier); return what each got back."""
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(index: int) -> None:
+        barrier.wait()
+        try:
+            results[index] = target(index)
+        except BaseException as exc:
+            results[index] = exc
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_readers_build_each_version_once():
+    cache = SnapshotCache(maxsize=16)
+    builds = Counter()
+
+    def build_for(key):
+        def build() -> bytes:
+            builds[key] += 1
+            # Long enough for every other reader to arrive while the build is in flight.
+            time.sleep(0.2)
+            return repr(key).encode()
+
+        return build
+
+    keys = [game_key(1), game_key(2)]
+    results = run_threads(lambda index: (keys[index % 2], cache.get_or_build(keys[index % 2], build_for(keys[index % 2]))))
+
+    assert builds == {keys[0]: 1, keys[1]: 1}
+    for key in keys:
+        payloads = {id(payload) for result_key, payload in results if result_key == key}
+        assert len(payloads) == 1
+        assert cache.get(key).body == repr(key).encode()
+    assert snapshot_builds.in_flight() == 0
+
+
+def test_builder_error_reaches_every_reader_and_is_not_cached():
+    cache = SnapshotCache(maxsize=16)
+    key = game_key(3)
+    calls = []
+
+    def failing_build() -> bytes:
+        calls.append(1)
+        time.sleep(0.2)
+        raise BuildFailed("database went away")
+
+    results = run_threads(lambda index: cache.get_or_build(key, failing_build))
+
+    assert len(calls) == 1
+    assert all(isinstance(result, BuildFailed) for result in results)
+    assert cache.get(key) is None
+    assert snapshot_builds.in_flight() == 0
+    assert cache.get_or_build(key, lambda: b"rebuilt").body == b"rebuilt"
+
+
+def test_concurrent_async_readers_build_each_version_once():
+    cache = SnapshotCache(maxsize=16)
+    builds = Counter()
+    keys = [game_key(4), game_key(5)]
+
+    def build_for(key):
+        async def build() -> bytes:
+            builds[key] += 1
+            await asyncio.sleep(0.05)
+            return repr(key).encode()
+
+        return build
+
+    async def readers():
+        return await asyncio.gather(
+            *(cache.aget_or_build(keys[index % 2], build_for(keys[index % 2])) for index in range(READERS))
+        )
+
+    results = asyncio.run(readers())
+
+    assert builds == {keys[0]: 1, keys[1]: 1}
+    assert len({id(payload) for payload in results[0::2]}) == 1
+    assert len({id(payload) for payload in results[1::2]}) == 1
+    assert results[0].body == repr(keys[0]).encode()
+    assert async_snapshot_builds.in_flight() == 0
+
+
+def test_async_builder_error_reaches_every_reader_and_is_not_cached():
+    cache = SnapshotCache(maxsize=16)
+    key = game_key(6)
+    calls = []
+
+    async def failing_build() -> bytes:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        raise BuildFailed("database went away")
+
+    async def readers():
+        return await asyncio.gather(
+            *(cache.aget_or_build(key, failing_build) for _ in range(READERS)), return_exceptions=True
+        )
+
+    results = asyncio.run(readers())
+
+    assert len(calls) == 1
+    assert all(isinstance(result, BuildFailed) for result in results)
+    assert cache.get(key) is None
+    assert async_snapshot_builds.in_flight() == 0
+
+    async def rebuilt() -> bytes:
+        return b"rebuilt"
+
+    assert asyncio.run(cache.aget_or_build(key, rebuilt)).body == b"rebuilt"
+
+
+def test_cancelled_reader_does_not_cancel_the_shared_build():
+    cache = SnapshotCache(maxsize=16)
+    key = game_key(8)
+    calls = []
+
+    async def build() -> bytes:
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return b"built"
+
+    async def readers():
+        tasks = [asyncio.create_task(cache.aget_or_build(key, build)) for _ in range(READERS)]
+        await asyncio.sleep(0)
+        tasks[1].cancel()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(readers())
+
+    assert len(calls) == 1
+    assert isinstance(results[1], asyncio.CancelledError)
+    assert all(result.body == b"built" for index, result in enumerate(results) if index != 1)
+
@@ -10,6 +10,7 @@ import ForgotPassword from './pages/ForgotPassword'
 import ResetPassword from './pages/ResetPassword'
 import ConfirmAccount from './pages/ConfirmAccount'
 import Profile from './pages/Profile'
+import AdminDashboard from './pages/AdminDashboard'
 import AdminUsers from './pages/AdminUsers'
 import AdminInvitations from './pages/AdminInvitations'
 import Groups from './pages/Groups'
@@ -54,6 +55,9 @@ export default function App() {
           )}
           {isAdmin && (
             <>
+              <Link className="block rounded px-3 py-2 hover:bg-gray-700 transition-colors" to="/admin">
+                Painel
+              </Link>
               <Link className="block rounded px-3 py-2 hover:bg-gray-700 transition-colors" to="/create">
                 Criar Jogo
               </Link>
@@ -110,6 +114,7 @@ export default function App() {
             <Route path="/confirm-account" element={<ConfirmAccount />} />
             <Route path="/profile" element={<Profile />} />
             <Route path="/groups" element={<Groups />} />
+            <Route path="/admin" element={<AdminDashboard />} />
             <Route path="/admin/users" element={<AdminUsers />} />
             <Route path="/admin/invitations" element={<AdminInvitations />} />
             <Route path="/invite-user" element={<AdminInvitations />} />
@@ -6,18 +6,37 @@ const api = axios.create({
   baseURL,
 })
 
+// After a write the backend asks for reads to skip its replicas for a few seconds;
+// shared across tabs so a list opened elsewhere still shows the change.
+const READ_PRIMARY_HEADER = 'x-read-primary-until'
+
+function rememberReadPrimary(response) {
+  const until = response?.headers?.[READ_PRIMARY_HEADER]
+  if (until) {
+    localStorage.setItem('ff_read_primary_until', until)
+  }
+}
+
 api.interceptors.request.use((config) => {
   const token = localStorage.getItem('ff_token')
+  config.headers = config.headers ?? {}
   if (token) {
-    config.headers = config.headers ?? {}
     config.headers.Authorization = `Bearer ${token}`
   }
+  const readPrimaryUntil = localStorage.getItem('ff_read_primary_until')
+  if (readPrimaryUntil && Number(readPrimaryUntil) > Date.now()) {
+    config.headers['X-Read-Primary-Until'] = readPrimaryUntil
+  }
   return config
 })
 
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    rememberReadPrimary(response)
+    return response
+  },
   (error) => {
+    rememberReadPrimary(error.response)
     if (error.response?.status === 401) {
       localStorage.removeItem('ff_token')
       window.dispatchEvent(new Event('footy:unauthorized'))
@@ -26,4 +45,11 @@ api.interceptors.response.use(
   },
 )
 
+// Retries of the same user action must reuse the key so the backend replays the
+// first response instead of running the mutation again.
+export function idempotencyHeaders() {
+  const key = window.crypto?.randomUUID?.() ?? `${Date.now()}-${Math.random().toString(36).slice(2)}`
+  return { headers: { 'Idempotency-Key': key } }
+}
+
 export default api
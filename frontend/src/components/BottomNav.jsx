@@ -7,6 +7,7 @@ const iconSets = {
     { emoji: '🧑', label: 'Perfil', to: '/profile' },
   ],
   admin: [
+    { emoji: '📊', label: 'Painel', to: '/admin' },
     { emoji: '📨', label: 'Convites', to: '/invite-user' },
     { emoji: '⚽', label: 'Partidas', to: '/games' },
     { emoji: '🧑', label: 'Perfil', to: '/profile' },
@@ -0,0 +1,153 @@
+import { useEffect, useState } from 'react'
+import { Link, useNavigate } from 'react-router-dom'
+import api from '../api'
+import { useAuth } from '../context/AuthContext'
+
+const activityLabels = {
+  confirmed: 'confirmou presença em',
+  declined: 'não vai em',
+  joined: 'se inscreveu como avulso em',
+  invitation_accepted: 'aceitou o convite',
+}
+
+function formatDate(value) {
+  return new Date(value).toLocaleString('pt-BR', { dateStyle: 'short', timeStyle: 'short' })
+}
+
+export default function AdminDashboard() {
+  const { user } = useAuth()
+  const navigate = useNavigate()
+  const [dashboard, setDashboard] = useState(null)
+  const [loading, setLoading] = useState(true)
+  const [error, setError] = useState('')
+  const [exporting, setExporting] = useState(false)
+  const [exportError, setExportError] = useState('')
+
+  useEffect(() => {
+    if (!user) {
+      navigate('/login')
+      return
+    }
+    if (user.role !== 'admin') {
+      navigate('/')
+    }
+  }, [user, navigate])
+
+  useEffect(() => {
+    // Uma única chamada traz membros, convites, próximas partidas e atividade recente.
+    const fetchDashboard = async () => {
+      try {
+        const response = await api.get('/admin/dashboard')
+        setDashboard(response.data)
+      } catch (err) {
+        setError(err?.response?.data?.detail || 'Não foi possível carregar o painel.')
+      } finally {
+        setLoading(false)
+      }
+    }
+
+    if (user?.role === 'admin') {
+      fetchDashboard()
+    }
+  }, [user])
+
+  const handleExport = async (format) => {
+    setExporting(true)
+    setExportError('')
+    try {
+      const response = await api.get('/admin/export', { params: { format }, responseType: 'blob' })
+      const filename =
+        response.headers['content-disposition']?.match(/filename="(.+)"/)?.[1] ?? `historico.${format}`
+      const url = URL.createObjectURL(response.data)
+      const link = document.createElement('a')
+      link.href = url
+      link.download = filename
+      link.click()
+      URL.revokeObjectURL(url)
+    } catch (err) {
+      setExportError('Não foi possível exportar o histórico.')
+    } finally {
+      setExporting(false)
+    }
+  }
+
+  if (loading) {
+    return (
+      <div className="container">
+        <p>Carregando painel...</p>
+      </div>
+    )
+  }
+
+  if (error || !dashboard) {
+    return (
+      <div className="container">
+        <p>{error}</p>
+      </div>
+    )
+  }
+
+  return (
+    <div className="container">
+      <div className="card">
+        <h1>Painel do grupo</h1>
+        <p>
+          <strong>{dashboard.member_count}</strong> membros · {dashboard.members_by_status.mensalista ?? 0} mensalistas ·{' '}
+          {dashboard.members_by_status.avulso ?? 0} avulsos
+        </p>
+        <p>
+          Convites: {dashboard.invitations.pending} pendentes · {dashboard.invitations.accepted} aceitos ·{' '}
+          {dashboard.invitations.expired} expirados
+        </p>
+        <div className="actions">
+          <button type="button" onClick={() => handleExport('csv')} disabled={exporting}>
+            {exporting ? 'Exportando...' : 'Exportar histórico (CSV)'}
+          </button>
+          <button type="button" onClick={() => handleExport('ndjson')} disabled={exporting}>
+            Exportar histórico (NDJSON)
+          </button>
+        </div>
+        {exportError && <p>{exportError}</p>}
+      </div>
+
+      <div className="card">
+        <h2>Próximas partidas</h2>
+        {dashboard.upcoming_games.length === 0 ? (
+          <p>Nenhuma partida agendada.</p>
+        ) : (
+          <ul className="player-list">
+            {dashboard.upcoming_games.map((game) => (
+              <li key={game.id}>
+                <Link to={`/games/${game.id}`}>
+                  <strong>{game.name}</strong> — {formatDate(game.scheduled_at)}
+                </Link>
+                <span>
+                  {game.confirmed}/{game.max_players} confirmados · {game.reserved_slots} reservadas ·{' '}
+                  {game.available_slots} disponíveis · {game.waiting} na fila
+                </span>
+              </li>
+            ))}
+          </ul>
+        )}
+      </div>
+
+      <div className="card">
+        <h2>Atividade recente</h2>
+        {dashboard.recent_activity.length === 0 ? (
+          <p>Nenhuma atividade ainda.</p>
+        ) : (
+          <ul className="player-list">
+            {dashboard.recent_activity.map((item, index) => (
+              <li key={`${item.kind}-${item.at}-${index}`}>
+                <span>
+                  {formatDate(item.at)} — <strong>{item.user_name}</strong> {activityLabels[item.kind] ?? item.kind}
+                  {item.game_name ? ` ${item.game_name}` : ''}
+                </span>
+              </li>
+            ))}
+          </ul>
+        )}
+      </div>
+    </div>
+  )
+}
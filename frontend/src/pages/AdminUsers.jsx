@@ -13,6 +13,8 @@ function formatStatus(status) {
   return status === 'mensalista' ? 'Mensalista' : 'Avulso'
 }
 
+const currentSeason = new Date().getFullYear()
+
 export default function AdminUsers() {
   const { user } = useAuth()
   const navigate = useNavigate()
@@ -22,6 +24,7 @@ export default function AdminUsers() {
   const [savingId, setSavingId] = useState(null)
   const [success, setSuccess] = useState('')
   const [pendingStatus, setPendingStatus] = useState({})
+  const [statsByUser, setStatsByUser] = useState({})
 
   useEffect(() => {
     if (!user) {
@@ -45,8 +48,19 @@ export default function AdminUsers() {
       }
     }
 
+    // O ranking já vem agregado do backend; uma chamada cobre todo o grupo.
+    const fetchStats = async () => {
+      try {
+        const response = await api.get('/stats/leaderboard', { params: { season: currentSeason, limit: 200 } })
+        setStatsByUser(Object.fromEntries(response.data.map((entry) => [entry.user.id, entry])))
+      } catch (err) {
+        setStatsByUser({})
+      }
+    }
+
     if (user?.role === 'admin') {
       fetchUsers()
+      fetchStats()
     }
   }, [user])
 
@@ -79,6 +93,33 @@ export default function AdminUsers() {
     }
   }
 
+  const pendingChanges = Object.entries(pendingStatus)
+    .filter(([userId, value]) => value && value !== users.find((item) => item.id === Number(userId))?.status)
+    .map(([userId, value]) => ({ user_id: Number(userId), status: value }))
+
+  const handleSaveAll = async () => {
+    if (pendingChanges.length === 0 || savingId) {
+      return
+    }
+    setSavingId('all')
+    setError('')
+    setSuccess('')
+    try {
+      const response = await api.patch('/admin/users/status', { changes: pendingChanges })
+      const updated = Object.fromEntries(
+        response.data.filter((item) => item.result === 'updated').map((item) => [item.user_id, item.status]),
+      )
+      setUsers((prev) => prev.map((item) => (updated[item.id] ? { ...item, status: updated[item.id] } : item)))
+      setPendingStatus({})
+      setSuccess(`${Object.keys(updated).length} status atualizado(s) com sucesso!`)
+    } catch (err) {
+      const detail = err?.response?.data?.detail || 'Não foi possível atualizar os status.'
+      setError(detail)
+    } finally {
+      setSavingId(null)
+    }
+  }
+
   if (loading) {
     return (
       <div className="container">
@@ -94,6 +135,9 @@ export default function AdminUsers() {
         <p>Defina quem é mensalista ou avulso. Apenas administradores podem alterar este status.</p>
         {error && <p>{error}</p>}
         {success && <p>{success}</p>}
+        <button className="primary-button" onClick={handleSaveAll} disabled={pendingChanges.length === 0 || savingId === 'all'}>
+          {savingId === 'all' ? 'Salvando...' : `Salvar todas as alterações (${pendingChanges.length})`}
+        </button>
         <div className="mt-4 grid grid-cols-1 gap-4 md:grid-cols-2">
           {sortedUsers.map((item) => (
             <div
@@ -109,6 +153,11 @@ export default function AdminUsers() {
                 <p className="font-semibold text-slate-900 truncate">{item.name}</p>
                 <p className="text-sm text-slate-600 truncate">{item.email}</p>
                 <p className="text-xs text-slate-500">Status atual: {formatStatus(item.status)}</p>
+                <p className="text-xs text-slate-500">
+                  {currentSeason}: {statsByUser[item.id]?.confirmed ?? 0} presenças · {statsByUser[item.id]?.declined ?? 0}{' '}
+                  recusas · {statsByUser[item.id]?.no_shows ?? 0} sem resposta · {statsByUser[item.id]?.promotions ?? 0} vindas da
+                  fila
+                </p>
               </div>
               <div className="flex flex-col items-end space-y-2">
                 <select
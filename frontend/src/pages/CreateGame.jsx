@@ -1,4 +1,4 @@
-import { useEffect, useMemo, useState } from 'react'
+import { useEffect, useState } from 'react'
 import { Link, useNavigate } from 'react-router-dom'
 import api from '../api'
 import { useAuth } from '../context/AuthContext'
@@ -11,50 +11,62 @@ const initialState = {
   convocation_deadline: '',
   auto_convocar_mensalistas: false,
   convocation_user_ids: [],
+  recurring: false,
+  occurrences: 4,
+  deadline_offset_hours: 24,
 }
 
 export default function CreateGame() {
   const { user } = useAuth()
   const navigate = useNavigate()
   const [form, setForm] = useState(initialState)
-  const [users, setUsers] = useState([])
+  const [search, setSearch] = useState('')
+  const [results, setResults] = useState([])
+  const [nextOffset, setNextOffset] = useState(null)
+  const [selectedUsers, setSelectedUsers] = useState([])
   const [loadingUsers, setLoadingUsers] = useState(false)
   const [submitting, setSubmitting] = useState(false)
   const [error, setError] = useState('')
 
   const isAdmin = user?.role === 'admin'
 
+  const fetchUsers = async (query, offset = 0) => {
+    setLoadingUsers(true)
+    try {
+      const response = await api.get('/users/search', { params: { q: query, limit: 20, offset } })
+      setResults((prev) => (offset ? [...prev, ...response.data.items] : response.data.items))
+      setNextOffset(response.data.next_offset)
+    } catch (err) {
+      setError('Não foi possível carregar a lista de jogadores.')
+    } finally {
+      setLoadingUsers(false)
+    }
+  }
+
   useEffect(() => {
     if (!isAdmin) return
-    const fetchUsers = async () => {
-      setLoadingUsers(true)
-      try {
-        const response = await api.get('/users')
-        setUsers(response.data)
-      } catch (err) {
-        setError('Não foi possível carregar a lista de jogadores.')
-      } finally {
-        setLoadingUsers(false)
-      }
-    }
+    // A busca roda no servidor; espera o usuário parar de digitar antes de consultar.
+    const timeout = setTimeout(() => fetchUsers(search), 250)
+    return () => clearTimeout(timeout)
+  }, [isAdmin, search])
 
-    fetchUsers()
-  }, [isAdmin])
+  const toggleUser = (player) => {
+    const selected = selectedUsers.some((item) => item.id === player.id)
+    const next = selected ? selectedUsers.filter((item) => item.id !== player.id) : [...selectedUsers, player]
+    setSelectedUsers(next)
+    setForm((prev) => ({ ...prev, convocation_user_ids: next.map((item) => item.id) }))
+  }
 
   const handleChange = (event) => {
     const { name, value, checked } = event.target
-    if (name === 'convocation_user_ids') {
-      const values = Array.from(event.target.selectedOptions).map((option) => Number(option.value))
-      setForm((prev) => ({ ...prev, convocation_user_ids: values }))
-      return
-    }
-    if (name === 'auto_convocar_mensalistas') {
-      setForm((prev) => ({ ...prev, auto_convocar_mensalistas: checked }))
+    if (name === 'auto_convocar_mensalistas' || name === 'recurring') {
+      setForm((prev) => ({ ...prev, [name]: checked }))
       return
     }
+    const numericFields = ['max_players', 'occurrences', 'deadline_offset_hours']
     setForm((prev) => ({
       ...prev,
-      [name]: name === 'max_players' ? Number(value) : value,
+      [name]: numericFields.includes(name) ? Number(value) : value,
     }))
   }
 
@@ -71,6 +83,21 @@ export default function CreateGame() {
     setError('')
 
     try {
+      if (form.recurring) {
+        // Séries geram todas as ocorrências (e convocações) numa única requisição.
+        await api.post('/series', {
+          name: form.name,
+          location: form.location,
+          starts_at: new Date(form.scheduled_at).toISOString(),
+          max_players: form.max_players,
+          deadline_offset_hours: form.deadline_offset_hours,
+          auto_convocar_mensalistas: form.auto_convocar_mensalistas,
+          occurrences: form.occurrences,
+          convocation_user_ids: form.convocation_user_ids,
+        })
+        navigate('/')
+        return
+      }
       const payload = {
         name: form.name,
         location: form.location,
@@ -93,8 +120,6 @@ export default function CreateGame() {
     }
   }
 
-  const sortedUsers = useMemo(() => users.slice().sort((a, b) => a.name.localeCompare(b.name)), [users])
-
   if (!isAdmin) {
     return (
       <div className="container">
@@ -135,17 +160,46 @@ export default function CreateGame() {
           </div>
 
           <div className="form-group">
-            <label htmlFor="convocation_deadline">Prazo para convocados (opcional)</label>
-            <input
-              id="convocation_deadline"
-              name="convocation_deadline"
-              type="datetime-local"
-              value={form.convocation_deadline}
-              onChange={handleChange}
-            />
-            <small>Deixe em branco para usar o prazo padrão configurado no backend.</small>
+            <label style={{ display: 'flex', alignItems: 'center', gap: '0.5rem' }}>
+              <input type="checkbox" name="recurring" checked={form.recurring} onChange={handleChange} />
+              Repetir toda semana
+            </label>
+            <small>Cria uma série com o mesmo dia da semana e horário da data escolhida.</small>
           </div>
 
+          {form.recurring ? (
+            <>
+              <div className="form-group">
+                <label htmlFor="occurrences">Quantidade de partidas a gerar</label>
+                <input id="occurrences" name="occurrences" type="number" min="1" max="52" value={form.occurrences} onChange={handleChange} />
+              </div>
+
+              <div className="form-group">
+                <label htmlFor="deadline_offset_hours">Prazo para convocados (horas antes do jogo)</label>
+                <input
+                  id="deadline_offset_hours"
+                  name="deadline_offset_hours"
+                  type="number"
+                  min="0"
+                  value={form.deadline_offset_hours}
+                  onChange={handleChange}
+                />
+              </div>
+            </>
+          ) : (
+            <div className="form-group">
+              <label htmlFor="convocation_deadline">Prazo para convocados (opcional)</label>
+              <input
+                id="convocation_deadline"
+                name="convocation_deadline"
+                type="datetime-local"
+                value={form.convocation_deadline}
+                onChange={handleChange}
+              />
+              <small>Deixe em branco para usar o prazo padrão configurado no backend.</small>
+            </div>
+          )}
+
           <div className="form-group">
             <label style={{ display: 'flex', alignItems: 'center', gap: '0.5rem' }}>
               <input
@@ -160,28 +214,44 @@ export default function CreateGame() {
           </div>
 
           <div className="form-group">
-            <label htmlFor="convocation_user_ids">Convocados</label>
-            <select
-              id="convocation_user_ids"
-              name="convocation_user_ids"
-              multiple
-              value={form.convocation_user_ids.map(String)}
-              onChange={handleChange}
-              size={Math.min(8, Math.max(sortedUsers.length, 4))}
-              disabled={loadingUsers}
-            >
-              {sortedUsers.map((player) => (
-                <option key={player.id} value={player.id}>
-                  {player.name} ({player.role})
-                </option>
+            <label htmlFor="convocation_search">Convocados</label>
+            <input
+              id="convocation_search"
+              type="search"
+              value={search}
+              onChange={(event) => setSearch(event.target.value)}
+              placeholder="Buscar por nome ou e-mail"
+            />
+            {selectedUsers.length > 0 && (
+              <p>
+                <small>Selecionados: {selectedUsers.map((player) => player.name).join(', ')}</small>
+              </p>
+            )}
+            <ul className="player-list">
+              {results.map((player) => (
+                <li key={player.id}>
+                  <label style={{ display: 'flex', alignItems: 'center', gap: '0.5rem' }}>
+                    <input
+                      type="checkbox"
+                      checked={form.convocation_user_ids.includes(player.id)}
+                      onChange={() => toggleUser(player)}
+                    />
+                    {player.name} ({player.role})
+                  </label>
+                </li>
               ))}
-            </select>
+            </ul>
+            {nextOffset !== null && (
+              <button type="button" className="secondary-button" onClick={() => fetchUsers(search, nextOffset)} disabled={loadingUsers}>
+                {loadingUsers ? 'Carregando...' : 'Mostrar mais'}
+              </button>
+            )}
           </div>
 
           {error && <p>{error}</p>}
 
           <button className="primary-button" type="submit" disabled={submitting}>
-            {submitting ? 'Criando...' : 'Criar partida'}
+            {submitting ? 'Criando...' : form.recurring ? 'Criar série' : 'Criar partida'}
           </button>
         </form>
       </div>
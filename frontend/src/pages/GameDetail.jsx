@@ -1,6 +1,6 @@
 import { useEffect, useMemo, useState } from 'react'
 import { useNavigate, useParams } from 'react-router-dom'
-import api from '../api'
+import api, { idempotencyHeaders } from '../api'
 import { useAuth } from '../context/AuthContext'
 import { resolveAvatar } from '../utils/avatar'
 
@@ -30,6 +30,16 @@ function renderPlayerEntry(user, { prefix, isSelf } = {}) {
   )
 }
 
+function hydrateCompactGame(data) {
+  const users = data.users ?? {}
+  const withUser = (entry) => ({ ...entry, user: { id: entry.user_id, ...users[entry.user_id] } })
+  return {
+    ...data,
+    convocations: data.convocations.map(withUser),
+    presences: data.presences.map(withUser),
+  }
+}
+
 export default function GameDetail() {
   const { id } = useParams()
   const navigate = useNavigate()
@@ -43,14 +53,32 @@ export default function GameDetail() {
   const [users, setUsers] = useState([])
   const [selectedConvocations, setSelectedConvocations] = useState([])
   const [updatingConvocations, setUpdatingConvocations] = useState(false)
+  const [teamCount, setTeamCount] = useState(2)
+  const [teams, setTeams] = useState(null)
+  const [drawingTeams, setDrawingTeams] = useState(false)
 
   const isAdmin = user?.role === 'admin'
 
+  const handleDrawTeams = async () => {
+    setDrawingTeams(true)
+    setActionError('')
+    try {
+      // O sorteio é determinístico por versão da lista, então repetir devolve os mesmos times.
+      const response = await api.get(`/games/${id}/teams`, { params: { teams: teamCount } })
+      setTeams(response.data)
+    } catch (err) {
+      setActionError(err?.response?.data?.detail || 'Não foi possível sortear os times.')
+    } finally {
+      setDrawingTeams(false)
+    }
+  }
+
   const fetchGame = async () => {
     try {
-      const response = await api.get(`/games/${id}`)
-      setGame(response.data)
-      setSelectedConvocations(response.data.convocations.map((c) => c.user.id))
+      const response = await api.get(`/games/${id}`, { params: { format: 'compact' } })
+      const detail = hydrateCompactGame(response.data)
+      setGame(detail)
+      setSelectedConvocations(detail.convocations.map((c) => c.user_id))
       setError('')
     } catch (err) {
       setError('Não foi possível carregar os detalhes da partida.')
@@ -131,7 +159,7 @@ export default function GameDetail() {
     setActionError('')
     setActionMessage('')
     try {
-      const response = await api.post(`/games/${id}/confirm`)
+      const response = await api.post(`/games/${id}/confirm`, null, idempotencyHeaders())
       const displaced = response.data?.displaced_waiting ?? []
       if (displaced && displaced.includes(user?.id)) {
         setActionMessage('Você voltou para a lista de espera, pois um convocado retomou a vaga.')
@@ -155,7 +183,7 @@ export default function GameDetail() {
     setActionError('')
     setActionMessage('')
     try {
-      await api.post(`/games/${id}/decline`)
+      await api.post(`/games/${id}/decline`, null, idempotencyHeaders())
       setActionMessage('Você informou que não poderá jogar.')
       fetchGame()
     } catch (err) {
@@ -172,7 +200,7 @@ export default function GameDetail() {
     setActionError('')
     setActionMessage('')
     try {
-      const response = await api.post(`/games/${id}/join`)
+      const response = await api.post(`/games/${id}/join`, null, idempotencyHeaders())
       const status = response.data.status
       setActionMessage(
         status === 'waiting'
@@ -239,6 +267,7 @@ export default function GameDetail() {
     confirmed: game.convocations.filter((c) => c.status === 'confirmed'),
     pending: game.convocations.filter((c) => c.status === 'pending'),
     declined: game.convocations.filter((c) => c.status === 'declined'),
+    expired: game.convocations.filter((c) => c.status === 'expired'),
   }
 
   return (
@@ -364,6 +393,16 @@ export default function GameDetail() {
             </ul>
           </>
         )}
+        {convocationsByStatus.expired.length > 0 && (
+          <>
+            <h3>Sem resposta no prazo</h3>
+            <ul className="player-list">
+              {convocationsByStatus.expired.map((conv) => (
+                <li key={conv.id}>{renderPlayerEntry(conv.user)}</li>
+              ))}
+            </ul>
+          </>
+        )}
       </div>
 
       <div className="card">
@@ -413,6 +452,38 @@ export default function GameDetail() {
         )}
       </div>
 
+      <div className="card">
+        <h2>Times</h2>
+        <p>Divide os confirmados em times equilibrados pela presença nas partidas e pela posição preferida.</p>
+        <div className="form-group">
+          <label htmlFor="teamCount">Quantidade de times</label>
+          <input
+            id="teamCount"
+            type="number"
+            min="2"
+            max="6"
+            value={teamCount}
+            onChange={(event) => setTeamCount(Number(event.target.value))}
+          />
+        </div>
+        <button className="primary-button" onClick={handleDrawTeams} disabled={drawingTeams}>
+          {drawingTeams ? 'Sorteando...' : 'Sortear times'}
+        </button>
+        {teams &&
+          teams.teams.map((team, index) => (
+            <div key={index}>
+              <h3>
+                Time {index + 1} <small>(força {team.rating.toFixed(1)})</small>
+              </h3>
+              <ul className="player-list">
+                {team.players.map((player) => (
+                  <li key={player.user.id}>{renderPlayerEntry(player.user, { isSelf: player.user.id === user?.id })}</li>
+                ))}
+              </ul>
+            </div>
+          ))}
+      </div>
+
       {isAdmin && (
         <div className="card">
           <h2>Gerenciar convocações</h2>
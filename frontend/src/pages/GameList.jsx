@@ -3,9 +3,20 @@ import { Link } from 'react-router-dom'
 import api from '../api'
 import { useAuth } from '../context/AuthContext'
 
+function describeMyStatus(entry) {
+  if (!entry) return null
+  if (entry.presence_status === 'confirmed') return 'Você está confirmado'
+  if (entry.presence_status === 'waiting') return `Você está na fila (${entry.waitlist_position}º)`
+  if (entry.convocation_status === 'pending') return 'Você foi convocado: confirme sua presença'
+  if (entry.convocation_status === 'declined') return 'Você informou que não vai'
+  if (entry.convocation_status === 'expired') return 'Sua convocação expirou'
+  return null
+}
+
 export default function GameList() {
   const { user, authLoading } = useAuth()
   const [games, setGames] = useState([])
+  const [myGames, setMyGames] = useState({})
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState('')
 
@@ -22,8 +33,10 @@ export default function GameList() {
       setLoading(true)
       setError('')
       try {
-        const response = await api.get('/games')
+        // A situação do usuário em cada jogo vem de uma única consulta, sem abrir cada partida.
+        const [response, mine] = await Promise.all([api.get('/games'), api.get('/users/me/games')])
         setGames(response.data)
+        setMyGames(Object.fromEntries(mine.data.map((entry) => [entry.game_id, entry])))
       } catch (err) {
         const message = err?.response?.data?.detail || 'Não foi possível carregar os jogos.'
         setError(message)
@@ -113,6 +126,9 @@ export default function GameList() {
               <p className="text-sm text-gray-700">
                 <strong>Vagas totais:</strong> {game.max_players}
               </p>
+              {describeMyStatus(myGames[game.id]) && (
+                <p className="text-sm font-semibold text-gray-900">{describeMyStatus(myGames[game.id])}</p>
+              )}
               <Link
                 className="mt-4 inline-flex items-center justify-center rounded bg-gray-900 px-4 py-2 text-sm font-semibold text-white hover:bg-gray-700 transition-colors"
                 to={`/games/${game.id}`}
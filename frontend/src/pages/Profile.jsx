@@ -1,5 +1,6 @@
 import { useEffect, useMemo, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
+import api from '../api'
 import { useAuth } from '../context/AuthContext'
 import { avatarPlaceholder, resolveAvatar } from '../utils/avatar'
 
@@ -23,6 +24,7 @@ export default function Profile() {
   const [message, setMessage] = useState('')
   const [error, setError] = useState('')
   const [uploading, setUploading] = useState(false)
+  const [seasons, setSeasons] = useState([])
 
   useEffect(() => {
     if (!user) {
@@ -34,6 +36,20 @@ export default function Profile() {
     setPreview(resolveAvatar(user, 160))
   }, [user])
 
+  useEffect(() => {
+    if (!user?.id) return
+    const fetchStats = async () => {
+      try {
+        const response = await api.get(`/users/${user.id}/stats`)
+        setSeasons(response.data)
+      } catch (err) {
+        setSeasons([])
+      }
+    }
+
+    fetchStats()
+  }, [user?.id])
+
   const statusLabel = useMemo(() => formatStatus(user?.status), [user?.status])
 
   const handleFileChange = (event) => {
@@ -99,6 +115,17 @@ export default function Profile() {
             )}
           </div>
         </div>
+        {seasons.length > 0 && (
+          <div style={{ marginTop: '1.5rem', textAlign: 'left' }}>
+            <h2 style={{ fontSize: '1.1rem' }}>Minhas temporadas</h2>
+            {seasons.map((season) => (
+              <p key={season.season} style={{ margin: '0.3rem 0', color: '#475569' }}>
+                <strong>{season.season}</strong>: {season.confirmed} presenças · {season.declined} recusas ·{' '}
+                {season.no_shows} sem resposta · {season.promotions} vindas da fila
+              </p>
+            ))}
+          </div>
+        )}
         <form onSubmit={handleUpload} style={{ marginTop: '1.5rem' }}>
           <div className="form-group">
             <label htmlFor="profilePhoto">Atualizar foto de perfil</label>